@@ -0,0 +1,83 @@
+"""Compare allocations of the old GetBitmapBits capture path and the
+reusable DIB-backed FrameBuffer path, using a synthetic frame source.
+
+Run from the repository root:
+    python bench/bench_capture_alloc.py --frames 200
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cogs.gdi_context import FrameBuffer
+
+
+def make_dib_source(width, height, seed=0):
+    """Synthetic stand-in for the DIB bits PrintWindow renders into"""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+
+
+def old_path(dib):
+    """GetBitmapBits copy -> frombuffer -> reshape -> cvtColor (allocates)"""
+    height, width = dib.shape[:2]
+    bmpstr = dib.tobytes()
+    img = np.frombuffer(bmpstr, dtype=np.uint8).reshape((height, width, 4))
+    return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+
+
+def run_case(name, capture, dib, frames):
+    # Warm-up so one-time buffer allocation is not counted as steady state
+    capture(dib)
+
+    tracemalloc.start()
+    start_current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame = capture(dib)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del frame
+
+    return {
+        'name': name,
+        'frames': frames,
+        'ms_per_frame': elapsed / frames * 1000,
+        'peak_bytes': peak - start_current,
+        'retained_bytes': current - start_current,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--width', type=int, default=1136)
+    parser.add_argument('--height', type=int, default=640)
+    args = parser.parse_args(argv)
+
+    dib = make_dib_source(args.width, args.height)
+    frame_buffer = FrameBuffer()
+
+    results = [
+        run_case('old GetBitmapBits path', old_path, dib, args.frames),
+        run_case('reused FrameBuffer path', frame_buffer.convert, dib, args.frames),
+    ]
+
+    print(f"Synthetic {args.width}x{args.height} BGRA frames, {args.frames} captures each\n")
+    print(f"{'path':<26}{'ms/frame':>10}{'peak KiB':>12}{'retained KiB':>14}")
+    for r in results:
+        print(f"{r['name']:<26}{r['ms_per_frame']:>10.3f}"
+              f"{r['peak_bytes'] / 1024:>12.1f}{r['retained_bytes'] / 1024:>14.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Grid classification throughput in-process vs. a DetectionPool of N
+worker processes, with several client threads submitting synthetic frames.
+
+Run from the repository root:
+    python bench/bench_detection_pool.py --clients 8 --workers 0 1 2 4
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'bench'))
+
+from bench_grid_matcher import load_cell_coords, load_templates, make_frames
+from cogs.detection_pool import DetectionPool
+from cogs.grid_matcher import GridMatcher
+
+
+def run_clients(classify, frames, clients, seconds):
+    """Each client thread classifies frames back to back for seconds"""
+    counts = [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    def client(index):
+        i = index
+        while time.perf_counter() < deadline:
+            classify(index, frames[i % len(frames)])
+            counts[index] += 1
+            i += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--frames', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    templates = load_templates(str(ROOT / 'cogs' / 'ref'))
+    cell_coords = load_cell_coords(str(ROOT / 'cogs' / 'coords.ini'))
+    frames = make_frames(templates, cell_coords, args.frames)
+    matcher = GridMatcher(templates, cell_coords)
+
+    results = []
+    for workers in args.workers:
+        if workers == 0:
+            rate = run_clients(lambda key, frame: matcher.classify_frame(frame),
+                               frames, args.clients, args.seconds)
+        else:
+            pool = DetectionPool(workers, templates, cell_coords)
+            try:
+                # Start the workers before timing
+                for key in range(args.clients):
+                    pool.classify_grid(key, frames[0])
+                rate = run_clients(pool.classify_grid, frames, args.clients, args.seconds)
+            finally:
+                pool.shutdown()
+        results.append({'workers': workers, 'frames_per_sec': rate})
+
+    print(f"{args.clients} client threads, {args.seconds:.0f}s per run, {os.cpu_count()} CPUs\n")
+    print(f"{'workers':>8}{'frames/s':>12}{'vs in-process':>15}")
+    baseline = results[0]['frames_per_sec']
+    for r in results:
+        label = 'in-process' if r['workers'] == 0 else str(r['workers'])
+        print(f"{label:>8}{r['frames_per_sec']:>12.1f}{r['frames_per_sec'] / baseline:>14.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    main()
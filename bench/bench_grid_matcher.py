@@ -0,0 +1,170 @@
+"""Compare the old per-template grid check with the precompiled GridMatcher
+over saved frames (or synthetic frames built from the reference templates).
+
+Run from the repository root:
+    python bench/bench_grid_matcher.py --frames-dir path/to/frames
+    python bench/bench_grid_matcher.py --synthetic 20
+    python bench/bench_grid_matcher.py --scale 0.5
+"""
+import argparse
+import configparser
+import os
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from cogs.capture_backend import clip_rect
+from cogs.grid_matcher import GRID_KEYS, GridMatcher
+
+TEMPLATE_FILES = {'ko': 'rr_ko.png', 'fail': 'rr_fail.png', 'froglet': 'rr_froglet.png'}
+
+
+def load_templates(ref_dir):
+    templates = {}
+    for key, filename in TEMPLATE_FILES.items():
+        with open(os.path.join(ref_dir, filename), 'rb') as f:
+            image = cv2.imdecode(np.frombuffer(f.read(), np.uint8), cv2.IMREAD_COLOR)
+        templates[key] = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return templates
+
+
+def load_cell_coords(config_path):
+    config = configparser.ConfigParser()
+    config.read(config_path, encoding='utf-8')
+    section = config['REALM RAID']
+    return {key: tuple(int(v) for v in section[f'click_{key}_1'].split(','))
+            for key in GRID_KEYS}
+
+
+def load_frames(frame_dir):
+    frames = []
+    for filename in sorted(os.listdir(frame_dir)):
+        path = os.path.join(frame_dir, filename)
+        ext = os.path.splitext(filename)[1].lower()
+        if ext == '.npy':
+            frame = np.load(path)
+        elif ext in ('.png', '.jpg', '.bmp'):
+            with open(path, 'rb') as f:
+                frame = cv2.imdecode(np.frombuffer(f.read(), np.uint8), cv2.IMREAD_COLOR)
+        else:
+            continue
+        if frame is not None:
+            frames.append(frame[:, :, :3])
+    return frames
+
+
+def make_frames(templates, cell_coords, count, width=1136, height=640, seed=0):
+    """Noise frames with a random template (or nothing) pasted on each cell"""
+    rng = np.random.default_rng(seed)
+    choices = [None] + list(templates)
+    frames = []
+    for _ in range(count):
+        frame = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        for x, y in cell_coords.values():
+            key = choices[rng.integers(len(choices))]
+            if key is None:
+                continue
+            template = templates[key]
+            th, tw = template.shape[:2]
+            x1, y1 = x - tw // 2, y - th // 2
+            if x1 < 0 or y1 < 0 or x1 + tw > width or y1 + th > height:
+                continue
+            frame[y1:y1 + th, x1:x1 + tw] = template[:, :, None]
+        frames.append(frame)
+    return frames
+
+
+def old_scan(frame, matcher):
+    """One region copy + cvtColor + matchTemplate per template, as before"""
+    h, w = frame.shape[:2]
+    states = {}
+    for key, (x, y) in matcher.cell_coords.items():
+        states[key] = 'available'
+        for template_key in matcher.priority:
+            template = matcher.templates[template_key]
+            rx, ry, rw, rh = matcher.search_rect(x, y, template)
+            x1, y1, x2, y2 = clip_rect(rx, ry, rw, rh, w, h)
+            region = frame[y1:y2, x1:x2].copy()
+            gray = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
+            th, tw = template.shape[:2]
+            if gray.shape[0] < th or gray.shape[1] < tw:
+                continue
+            result = cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, _ = cv2.minMaxLoc(result)
+            if max_val >= matcher.thresholds[template_key]:
+                states[key] = template_key
+                break
+    return states
+
+
+def matcher_scan(frame, matcher):
+    result = matcher.classify_frame(frame)
+    return {key: result.state(key) for key in matcher.cell_coords}
+
+
+def run_case(name, scan, frames, matcher, repeat):
+    states = [scan(frame, matcher) for frame in frames]   # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            scan(frame, matcher)
+    elapsed = time.perf_counter() - start
+    scans = repeat * len(frames)
+    return {'name': name, 'scans': scans, 'ms_per_scan': elapsed / scans * 1000}, states
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames-dir', help='Directory of saved PNG/NPY client frames')
+    parser.add_argument('--synthetic', type=int, default=20,
+                        help='Synthetic frames to generate when --frames-dir is not given')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=None,
+                        help='Also time a coarse-to-fine matcher at this scale for every template')
+    parser.add_argument('--ref', default=str(ROOT / 'cogs' / 'ref'))
+    parser.add_argument('--config', default=str(ROOT / 'cogs' / 'coords.ini'))
+    args = parser.parse_args(argv)
+
+    templates = load_templates(args.ref)
+    matcher = GridMatcher(templates, load_cell_coords(args.config))
+
+    if args.frames_dir:
+        frames = load_frames(args.frames_dir)
+        source = args.frames_dir
+    else:
+        frames = make_frames(templates, matcher.cell_coords, args.synthetic)
+        source = 'synthetic'
+    if not frames:
+        print(f"No frames found in {args.frames_dir}")
+        return []
+
+    old, old_states = run_case('per-template detect', old_scan, frames, matcher, args.repeat)
+    new, new_states = run_case('GridMatcher', matcher_scan, frames, matcher, args.repeat)
+    results = [old, new]
+    mismatches = {new['name']: sum(a != b for a, b in zip(old_states, new_states))}
+
+    if args.scale:
+        scaled_matcher = GridMatcher(templates, matcher.cell_coords,
+                                     scales={key: args.scale for key in templates})
+        scaled, scaled_states = run_case(f'GridMatcher x{args.scale:g}', matcher_scan,
+                                         frames, scaled_matcher, args.repeat)
+        results.append(scaled)
+        mismatches[scaled['name']] = sum(a != b for a, b in zip(old_states, scaled_states))
+
+    print(f"{len(frames)} frames ({source}), {args.repeat} passes each\n")
+    print(f"{'matcher':<22}{'ms/scan':>10}{'speed-up':>10}{'differing':>11}")
+    for r in results:
+        print(f"{r['name']:<22}{r['ms_per_scan']:>10.3f}"
+              f"{old['ms_per_scan'] / r['ms_per_scan']:>9.2f}x"
+              f"{mismatches.get(r['name'], 0):>11}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
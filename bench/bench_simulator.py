@@ -0,0 +1,127 @@
+"""End-to-end Realm Raid on N simulated clients: whole-page completion time
+and CPU per client, with no game window needed.
+
+Every client gets a SimulatedWindow (cogs/rr_simulator.py) and the real
+automation state machine plays it through an RR-All session until its
+tickets run out.
+
+Run from the repository root:
+    python bench/bench_simulator.py --clients 12 --speed 20 --tickets 9
+    python bench/bench_simulator.py --clients 12 --engine scheduler
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from cogs.mode_rr_all import RRAllSession
+from cogs.rr_simulator import SimulatorCaptureBackend, create_simulated_clients
+
+COORDS_PATH = str(ROOT / 'cogs' / 'coords.ini')
+REF_PATH = str(ROOT / 'cogs' / 'ref')
+
+CONFIG_INI = """[GLOBAL]
+width = 1136
+[REFERENCE]
+width = 1136
+height = 640
+"""
+
+
+class SimulatorSession(RRAllSession):
+    """Session over simulated windows: the window list never changes"""
+
+    def refresh_windows(self):
+        pass
+
+
+def run_session(args, config_path):
+    """Play every simulated client until its tickets run out
+
+    Returns:
+        tuple: (windows, session stats, wall seconds, CPU seconds)
+    """
+    clients = create_simulated_clients(
+        args.clients, COORDS_PATH, REF_PATH, speed=args.speed, tickets=args.tickets,
+        win_rate=args.win_rate, froglet_chance=args.froglet_chance, battle_time=args.battle_time
+    )
+    windows = [window for window, _ in clients]
+    backend = SimulatorCaptureBackend(windows, speed=args.speed)
+
+    session = SimulatorSession(
+        lambda message, tag='system': None, config_path, COORDS_PATH, REF_PATH, 'sim',
+        engine=args.engine, stagger=args.stagger, max_captures=args.max_captures,
+        capture_backend_factory=lambda: backend
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        session.start([window.hwnd for window in windows])
+        deadline = wall_start + args.timeout
+        while session.running_hwnds() and time.perf_counter() < deadline:
+            time.sleep(0.1)
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        stats = session.get_stats()
+        session.stop()
+        session.watcher.join()
+    return windows, stats, wall, cpu
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--engine', choices=('threads', 'scheduler'), default='threads')
+    parser.add_argument('--speed', type=float, default=20.0, help='simulation speed multiplier')
+    parser.add_argument('--tickets', type=int, default=9, help='battles per client')
+    parser.add_argument('--win-rate', type=float, default=0.8)
+    parser.add_argument('--froglet-chance', type=float, default=0.1)
+    parser.add_argument('--battle-time', type=float, default=8.0, help='simulated seconds per battle')
+    parser.add_argument('--stagger', type=float, default=1.0)
+    parser.add_argument('--max-captures', type=int, default=2)
+    parser.add_argument('--timeout', type=float, default=300.0, help='wall-clock limit in seconds')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, 'config.ini')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            f.write(CONFIG_INI)
+        windows, stats, wall, cpu = run_session(args, config_path)
+
+    pages = [seconds for window in windows for seconds in window.pages]
+    battles = sum(sum(window.battles.values()) for window in windows)
+    result = {
+        'clients': args.clients,
+        'engine': args.engine,
+        'wall_seconds': wall,
+        'battles': battles,
+        'pages': len(pages),
+        'page_sim_seconds_mean': statistics.mean(pages) if pages else None,
+        'page_sim_seconds_max': max(pages) if pages else None,
+        'cpu_seconds_per_client': cpu / args.clients,
+        'cpu_percent_per_client': 100.0 * cpu / wall / args.clients if wall else 0.0,
+        'cpu_peak_percent': stats['cpu']['peak'],
+    }
+
+    print(f"{args.clients} simulated clients ({args.engine}), speed {args.speed:g}x, "
+          f"{args.tickets} tickets each, {os.cpu_count()} CPUs\n")
+    print(f"  wall time:          {wall:.1f}s")
+    print(f"  battles / pages:    {battles} / {len(pages)}")
+    if pages:
+        print(f"  page completion:    mean {result['page_sim_seconds_mean']:.1f}s, "
+              f"max {result['page_sim_seconds_max']:.1f}s (simulated)")
+    print(f"  CPU per client:     {result['cpu_seconds_per_client']:.2f}s "
+          f"({result['cpu_percent_per_client']:.1f}% of one core)")
+    print(f"  CPU peak (process): {result['cpu_peak_percent']:.0f}%")
+    return result
+
+
+if __name__ == "__main__":
+    main()
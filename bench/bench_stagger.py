@@ -0,0 +1,111 @@
+"""Peak vs. average CPU of an RR-All session of N replay clients, launched
+all at once vs. with staggered phases and a concurrent-capture cap.
+
+Clients loop over synthetic grid frames, so each one keeps scanning,
+waiting and re-capturing like a live client that never finds a target.
+
+Run from the repository root:
+    python bench/bench_stagger.py --clients 12 --seconds 10 --stagger 1.0 --max-captures 2
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'bench'))
+
+from bench_grid_matcher import load_cell_coords, load_templates, make_frames
+from cogs.capture_backend import ReplayCaptureBackend
+from cogs.mode_rr_all import RRAllSession
+
+COORDS_PATH = str(ROOT / 'cogs' / 'coords.ini')
+REF_PATH = str(ROOT / 'cogs' / 'ref')
+
+CONFIG_INI = """[GLOBAL]
+width = 1136
+[REFERENCE]
+width = 1136
+height = 640
+"""
+
+
+class BenchSession(RRAllSession):
+    """Session over fake HWNDs: there is no window list to track"""
+
+    def refresh_windows(self):
+        pass
+
+
+def write_frames(frame_dir, count, frame_interval):
+    templates = load_templates(REF_PATH)
+    cell_coords = load_cell_coords(COORDS_PATH)
+    for index, frame in enumerate(make_frames(templates, cell_coords, count)):
+        np.save(os.path.join(frame_dir, f'{index * frame_interval:.3f}.npy'), frame)
+
+
+def run_case(args, frame_dir, config_path, engine, stagger, max_captures):
+    session = BenchSession(
+        lambda message, tag='system': None, config_path, COORDS_PATH, REF_PATH, 'bench',
+        engine=engine, stagger=stagger, max_captures=max_captures,
+        capture_backend_factory=lambda: ReplayCaptureBackend(frame_dir, loop=True)
+    )
+    session.cpu_monitor.interval = args.interval
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        session.start(list(range(1, args.clients + 1)))
+        time.sleep(args.seconds)
+        stats = session.get_stats()
+        session.stop()
+        session.watcher.join()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=12)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--engine', choices=('threads', 'scheduler'), default='threads')
+    parser.add_argument('--stagger', type=float, default=1.0)
+    parser.add_argument('--max-captures', type=int, default=2)
+    parser.add_argument('--interval', type=float, default=0.1,
+                        help='CPU sampling interval (shorter catches narrower spikes)')
+    args = parser.parse_args(argv)
+
+    cases = [('all at once', 0.0, 0), ('staggered', args.stagger, args.max_captures)]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        frame_dir = os.path.join(tmp, 'frames')
+        os.mkdir(frame_dir)
+        write_frames(frame_dir, 10, 0.5)
+        config_path = os.path.join(tmp, 'config.ini')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            f.write(CONFIG_INI)
+
+        for label, stagger, max_captures in cases:
+            stats = run_case(args, frame_dir, config_path, args.engine, stagger, max_captures)
+            results.append(dict(stats, case=label, stagger=stagger, max_captures=max_captures))
+
+    print(f"{args.clients} clients ({args.engine}), {args.seconds:.0f}s per case, "
+          f"CPU sampled every {args.interval * 1000:.0f}ms, {os.cpu_count()} CPUs\n")
+    print(f"{'case':>12}{'cpu avg %':>11}{'cpu peak %':>12}{'peak/avg':>10}"
+          f"{'captures':>10}{'max conc':>10}")
+    for r in results:
+        cpu, captures = r['cpu'], r['captures']
+        ratio = cpu['peak'] / cpu['avg'] if cpu['avg'] else 0.0
+        count = captures['captures'] if captures else '-'
+        concurrent = f"{captures['peak_active']}/{captures['max_concurrent']}" if captures else '-'
+        print(f"{r['case']:>12}{cpu['avg']:>11.1f}{cpu['peak']:>12.1f}{ratio:>10.2f}"
+              f"{count:>10}{concurrent:>10}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Compare fixed post-click sleeps with event-driven wait_for_probe() on
+recorded (synthetic) replay frames.
+
+Each trial replays a transition where the join button of cell 11 appears
+LATENCY seconds after the first capture, then measures how long the old
+fixed EXPANSION_WAIT and the new wait_for_probe() take to see it.
+
+Run from the repository root:
+    python bench/bench_wait_until.py --latency 0.15 0.3 0.6 --trials 3
+"""
+import argparse
+import configparser
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from cogs import mode_rr
+from cogs.capture_backend import ReplayCaptureBackend
+
+COORDS_PATH = str(ROOT / 'cogs' / 'coords.ini')
+REF_PATH = str(ROOT / 'cogs' / 'ref')
+
+# Post-click waits per match: expand, join, lobby return, plus a refresh +
+# confirm every page; used only to extrapolate per-page savings
+TRANSITIONS_PER_PAGE = 9 * 3 + 2
+
+CONFIG_INI = """[GLOBAL]
+width = 1136
+[REFERENCE]
+width = 1136
+height = 640
+"""
+
+
+def write_frames(frame_dir, coords_path, latency, width=1136, height=640):
+    """Background frame at t=0, join button drawn at t=latency"""
+    config = configparser.ConfigParser()
+    config.read(coords_path, encoding='utf-8')
+    section = config['REALM RAID']
+    x, y = (int(v) for v in section['click_11_2'].split(','))
+    hex_str = section['btn_color'].strip().lstrip('#')
+    r, g, b = (int(hex_str[i:i+2], 16) for i in (0, 2, 4))
+
+    background = np.full((height, width, 3), 40, dtype=np.uint8)
+    np.save(os.path.join(frame_dir, '0.000.npy'), background)
+
+    button = background.copy()
+    button[y - 20:y + 20, x - 40:x + 40] = (b, g, r)
+    np.save(os.path.join(frame_dir, f'{latency:.3f}.npy'), button)
+    # Hold the final state long enough for the fixed wait to finish
+    np.save(os.path.join(frame_dir, '60.000.npy'), button)
+
+
+def fixed_wait(automation, hwnd):
+    automation.drive(automation.interruptible_sleep(automation.EXPANSION_WAIT))
+    return automation.probe_label(hwnd, 'join_11') == 'btn'
+
+
+def event_wait(automation, hwnd):
+    met, _ = automation.drive(
+        automation.wait_for_probe(hwnd, 'join_11', ('btn',), automation.EXPANSION_WAIT)
+    )
+    return met
+
+
+def run_trial(wait, frame_dir, config_path, speed):
+    backend = ReplayCaptureBackend(frame_dir, speed=speed)
+    automation = mode_rr.RealmRaidAutomation(
+        lambda message, tag='system': None, config_path, COORDS_PATH,
+        1, REF_PATH, capture_backend=backend
+    )
+    automation.running = True
+    backend.replay_time()   # the click happens now
+    start = time.monotonic()
+    detected = wait(automation, 1)
+    return (time.monotonic() - start) * speed, detected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, nargs='+', default=[0.15, 0.3, 0.6],
+                        help='Seconds from click to the button appearing')
+    parser.add_argument('--trials', type=int, default=3)
+    parser.add_argument('--speed', type=float, default=1.0, help='Replay speed multiplier')
+    args = parser.parse_args(argv)
+
+    mode_rr._rr_stop_event.clear()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, 'config.ini')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            f.write(CONFIG_INI)
+
+        for latency in args.latency:
+            frame_dir = os.path.join(tmp, f'frames_{latency:.3f}')
+            os.makedirs(frame_dir)
+            write_frames(frame_dir, COORDS_PATH, latency)
+
+            row = {'latency': latency}
+            for name, wait in (('fixed', fixed_wait), ('event', event_wait)):
+                trials = [run_trial(wait, frame_dir, config_path, args.speed)
+                          for _ in range(args.trials)]
+                row[name] = sum(t for t, _ in trials) / len(trials)
+                row[f'{name}_detected'] = all(d for _, d in trials)
+            results.append(row)
+
+    print(f"\n{'latency s':>10}{'fixed s':>10}{'event s':>10}{'saved/page s':>14}{'detected':>10}")
+    for row in results:
+        saved = (row['fixed'] - row['event']) * TRANSITIONS_PER_PAGE
+        detected = row['fixed_detected'] and row['event_detected']
+        print(f"{row['latency']:>10.2f}{row['fixed']:>10.3f}{row['event']:>10.3f}"
+              f"{saved:>14.1f}{'yes' if detected else 'NO':>10}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""Benchmark suite: capture, detection and state-machine throughput as JSON.
+
+Micro benchmarks time one operation at a time and report ops/sec and
+p50/p99 latency; the macro benchmark plays N simulated clients under
+RR-All (see bench_simulator.py). Every benchmark runs in its own
+subprocess by default, so its peak RSS is its own. Inputs are synthetic
+and seeded, so runs on the same machine are comparable.
+
+Run from the repository root:
+    python bench/suite.py --output bench-results.json
+    python bench/suite.py --only color_matches check_initial_grid --in-process
+    python bench/suite.py --baseline bench-results.json --fail-on-regression
+"""
+import argparse
+import contextlib
+import ctypes
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'bench'))
+
+COORDS_PATH = str(ROOT / 'cogs' / 'coords.ini')
+REF_PATH = str(ROOT / 'cogs' / 'ref')
+
+CONFIG_INI = """[GLOBAL]
+width = 1136
+instance = Onmyoji
+[REFERENCE]
+width = 1136
+height = 640
+"""
+
+# Grid shown by the simulated client of the detection benchmarks
+GRID_LAYOUT = {'11': 'ko', '12': 'fail', '13': 'froglet', '21': 'available', '22': 'ko',
+               '23': 'available', '31': 'fail', '32': 'available', '33': 'ko'}
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process in bytes (None if unknown)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        pass
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    except (AttributeError, OSError):
+        pass
+    return None
+
+
+def measure(op, min_time, min_ops=20, warmup=3):
+    """Call op repeatedly for at least min_time seconds and min_ops calls
+
+    Returns:
+        dict: ops/sec and p50/p99/max latency in microseconds
+    """
+    for _ in range(warmup):
+        op()
+
+    latencies = []
+    start = time.perf_counter()
+    while len(latencies) < min_ops or time.perf_counter() - start < min_time:
+        t0 = time.perf_counter_ns()
+        op()
+        latencies.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - start
+
+    latencies_us = np.asarray(latencies) / 1000.0
+    p50, p99 = np.percentile(latencies_us, (50, 99))
+    return {
+        'ops': len(latencies),
+        'ops_per_sec': len(latencies) / elapsed,
+        'p50_us': float(p50),
+        'p99_us': float(p99),
+        'max_us': float(latencies_us.max()),
+    }
+
+
+@contextlib.contextmanager
+def quiet():
+    """Drop the automation's console output while timing"""
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+@contextlib.contextmanager
+def simulated_automation():
+    """A RealmRaidAutomation on one simulated client showing GRID_LAYOUT"""
+    from cogs.mode_rr import RealmRaidAutomation
+    from cogs.rr_simulator import create_simulated_clients
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, 'config.ini')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            f.write(CONFIG_INI)
+        (window, backend), = create_simulated_clients(1, COORDS_PATH, REF_PATH, layout_states=GRID_LAYOUT)
+        with quiet():
+            automation = RealmRaidAutomation(
+                lambda message, tag='system': None, config_path, COORDS_PATH,
+                window.hwnd, REF_PATH, capture_backend=backend
+            )
+        automation.running = True
+        yield automation, window.hwnd, config_path
+
+
+def bench_capture_convert(args):
+    """BGRA DIB bits → reusable BGR FrameBuffer, one 1136x640 frame per op"""
+    from cogs.gdi_context import FrameBuffer
+
+    dib = np.random.default_rng(0).integers(0, 256, size=(640, 1136, 4), dtype=np.uint8)
+    frame_buffer = FrameBuffer()
+    return measure(lambda: frame_buffer.convert(dib), args.min_time)
+
+
+def bench_detect_template_near_coord(args):
+    """Fresh region capture + template match around one grid cell"""
+    with simulated_automation() as (automation, hwnd, _):
+        x, y = automation.grid_positions['11']['coord_1']
+
+        def op():
+            automation.frame_cache.invalidate(hwnd)
+            matched, _ = automation.detect_template_near_coord(hwnd, x, y, 'ko')
+            assert matched
+
+        with quiet():
+            return measure(op, args.min_time)
+
+
+def bench_color_matches(args):
+    """Tolerance check of two RGB tuples"""
+    with simulated_automation() as (automation, _, _):
+        color = automation.color_btn
+        sample = tuple(c + 3 for c in color)
+        return measure(lambda: automation.color_matches(sample, color), args.min_time, min_ops=1000)
+
+
+def bench_check_initial_grid(args):
+    """Full 3x3 scan of a fresh frame"""
+    with simulated_automation() as (automation, hwnd, _):
+        def op():
+            assert automation.drive(automation.check_initial_grid(hwnd))
+
+        with quiet():
+            result = measure(op, args.min_time)
+        expected = sorted(key for key, state in GRID_LAYOUT.items() if state == 'ko')
+        assert sorted(automation.ko_matches) == expected, automation.ko_matches
+        return result
+
+
+def bench_config_load(args):
+    """Parse config.ini + coords.ini into coordinates, colors and probes"""
+    with simulated_automation() as (automation, _, _):
+        with quiet():
+            return measure(automation.load_config, args.min_time)
+
+
+def bench_window_enumeration(args):
+    """Enumerate the instance's windows the way a GUI refresh does (Windows only)"""
+    if not hasattr(ctypes, 'WinDLL'):
+        return {'skipped': "window enumeration needs Windows"}
+    from cogs.window_fetcher import WindowFetcher
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, 'config.ini')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            f.write(CONFIG_INI)
+        fetcher = WindowFetcher(config_path)
+        # A full desktop scan; cached lookups are dict reads and not worth timing
+        return measure(fetcher.refresh_windows, args.min_time)
+
+
+def bench_rr_all_simulated(args):
+    """N simulated clients under an RR-All session until their tickets run out"""
+    from bench_simulator import run_session
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, 'config.ini')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            f.write(CONFIG_INI)
+        options = argparse.Namespace(
+            clients=args.clients, engine=args.engine, speed=args.speed, tickets=9,
+            win_rate=0.8, froglet_chance=0.1, battle_time=8.0, stagger=1.0, max_captures=2,
+            timeout=300.0
+        )
+        windows, stats, wall, cpu = run_session(options, config_path)
+
+    battles = sum(sum(window.battles.values()) for window in windows)
+    pages = [seconds for window in windows for seconds in window.pages]
+    p50, p99 = np.percentile(pages, (50, 99)) if pages else (None, None)
+    return {
+        'clients': args.clients,
+        'engine': args.engine,
+        'speed': args.speed,
+        'ops': battles,
+        'ops_per_sec': battles / wall if wall else 0.0,
+        'wall_seconds': wall,
+        'pages': len(pages),
+        'page_p50_sim_seconds': None if p50 is None else float(p50),
+        'page_p99_sim_seconds': None if p99 is None else float(p99),
+        'cpu_seconds_per_client': cpu / args.clients,
+        'cpu_peak_percent': stats['cpu']['peak'],
+    }
+
+
+BENCHMARKS = {
+    'capture_convert': bench_capture_convert,
+    'detect_template_near_coord': bench_detect_template_near_coord,
+    'color_matches': bench_color_matches,
+    'check_initial_grid': bench_check_initial_grid,
+    'config_load': bench_config_load,
+    'window_enumeration': bench_window_enumeration,
+    'rr_all_simulated': bench_rr_all_simulated,
+}
+
+
+def run_benchmark(name, args):
+    """Run one benchmark in this process and add its peak RSS"""
+    try:
+        result = BENCHMARKS[name](args)
+    except Exception as e:
+        result = {'error': f"{type(e).__name__}: {e}"}
+    result['peak_rss_bytes'] = peak_rss_bytes()
+    return result
+
+
+def run_isolated(name, argv):
+    """Run one benchmark in a fresh interpreter and parse its JSON"""
+    command = [sys.executable, os.path.abspath(__file__), '--only', name, '--in-process', '--raw'] + argv
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'error': completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else
+                f"exit code {completed.returncode}", 'peak_rss_bytes': None}
+    return json.loads(completed.stdout)[name]
+
+
+def environment():
+    """Machine and library versions the numbers were taken on"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print ops/sec change vs. a previous run
+
+    Returns:
+        list: names of benchmarks more than tolerance percent slower
+    """
+    regressions = []
+    print(f"\n{'benchmark':<28}{'ops/sec':>12}{'baseline':>12}{'change':>9}")
+    for name, result in results.items():
+        old = baseline.get('benchmarks', {}).get(name, {})
+        new_rate, old_rate = result.get('ops_per_sec'), old.get('ops_per_sec')
+        if not new_rate or not old_rate:
+            continue
+        change = (new_rate / old_rate - 1.0) * 100
+        flag = '  REGRESSION' if change < -tolerance else ''
+        if flag:
+            regressions.append(name)
+        print(f"{name:<28}{new_rate:>12.1f}{old_rate:>12.1f}{change:>8.1f}%{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help='benchmarks to run')
+    parser.add_argument('--min-time', type=float, default=1.0, help='seconds per micro benchmark')
+    parser.add_argument('--clients', type=int, default=4, help='simulated clients (macro)')
+    parser.add_argument('--engine', choices=('threads', 'scheduler'), default='threads')
+    parser.add_argument('--speed', type=float, default=20.0, help='simulation speed (macro)')
+    parser.add_argument('--in-process', action='store_true',
+                        help='run every benchmark in this process (peak RSS becomes cumulative)')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--baseline', help='previous JSON report to compare ops/sec against')
+    parser.add_argument('--tolerance', type=float, default=10.0,
+                        help='percent slowdown vs. baseline counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--raw', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    names = args.only or list(BENCHMARKS)
+    passthrough = ['--min-time', str(args.min_time), '--clients', str(args.clients),
+                   '--engine', args.engine, '--speed', str(args.speed)]
+
+    results = {}
+    for name in names:
+        if not args.raw:
+            print(f"⏱ {name}...", file=sys.stderr)
+        results[name] = run_benchmark(name, args) if args.in_process else run_isolated(name, passthrough)
+
+    if args.raw:
+        print(json.dumps(results))
+        return results
+
+    report = {'environment': environment(), 'benchmarks': results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+import bisect
+import ctypes
+import os
+import re
+import threading
+import time
+from ctypes import wintypes
+import cv2
+import numpy as np
+
+from cogs.gdi_context import GdiCaptureContext, get_client_size
+
+# win32 is only needed by the live GDI backend; replay runs without it
+try:
+    import win32gui
+    import win32api
+    import win32con
+except ImportError:
+    win32gui = win32api = win32con = None
+
+
+def clip_rect(x, y, width, height, client_width, client_height):
+    """Clip a client rectangle to the client area
+
+    Returns:
+        tuple: (x1, y1, x2, y2) corners inside the client area
+    """
+    x1 = max(0, min(x, client_width))
+    y1 = max(0, min(y, client_height))
+    x2 = max(0, min(x + width, client_width))
+    y2 = max(0, min(y + height, client_height))
+    return x1, y1, x2, y2
+
+
+def sample_frame_pixels(frame, points):
+    """Read (x, y) client points from a BGR frame
+
+    Returns:
+        numpy.ndarray: (N, 3) uint8 RGB rows, or None if a point is outside the frame
+    """
+    if not points:
+        return np.empty((0, 3), dtype=np.uint8)
+    coords = np.asarray(points, dtype=np.intp)
+    xs, ys = coords[:, 0], coords[:, 1]
+    h, w = frame.shape[:2]
+    if xs.min() < 0 or ys.min() < 0 or xs.max() >= w or ys.max() >= h:
+        return None
+    return frame[ys, xs, ::-1].copy()
+
+
+class CaptureBackend:
+    """Interface between the automation and a source of client frames
+
+    Backends return BGR numpy images for capture_frame() and
+    capture_regions(), and RGB tuples for get_pixel(), all in client
+    coordinates. Regions are clipped to the client area.
+    """
+
+    name = 'base'
+    # Live backends talk to a real window (resize, IsWindow, ...)
+    is_live = True
+
+    def capture_frame(self, hwnd):
+        """Capture the full client area of hwnd as a BGR image (None on error)"""
+        raise NotImplementedError
+
+    def capture_regions(self, hwnd, rects):
+        """Capture several (x, y, width, height) client rectangles in one call
+
+        Returns:
+            list: One BGR image per rect, or None on error
+        """
+        frame = self.capture_frame(hwnd)
+        if frame is None:
+            return None
+        h, w = frame.shape[:2]
+        regions = []
+        for x, y, width, height in rects:
+            x1, y1, x2, y2 = clip_rect(x, y, width, height, w, h)
+            regions.append(frame[y1:y2, x1:x2])
+        return regions
+
+    def capture_region(self, hwnd, x, y, width, height):
+        """Capture one client rectangle as a BGR image (None on error)"""
+        regions = self.capture_regions(hwnd, [(x, y, width, height)])
+        return regions[0] if regions is not None else None
+
+    def get_pixels(self, hwnd, points, force_refresh=True):
+        """Read several (x, y) client pixels from one capture
+
+        Returns:
+            numpy.ndarray: (N, 3) uint8 RGB rows, or None on error
+        """
+        frame = self.capture_frame(hwnd)
+        if frame is None:
+            return None
+        return sample_frame_pixels(frame, points)
+
+    def refresh_points(self, hwnd, points):
+        """Ask the window to repaint around points before they are read
+
+        Returns:
+            float: Seconds to wait for the repaint before reading (0 = none)
+        """
+        return 0.0
+
+    def get_pixel(self, hwnd, x, y, force_refresh=True):
+        """Get one client pixel as an RGB tuple (None on error)"""
+        pixels = self.get_pixels(hwnd, [(x, y)], force_refresh)
+        if pixels is None:
+            return None
+        return tuple(int(c) for c in pixels[0])
+
+    def post_button(self, hwnd, x, y, down):
+        """Post a left button down (down=True) or up at client (x, y)"""
+        raise NotImplementedError
+
+    def post_click(self, hwnd, x, y, hold=0.05):
+        """Post a left click at client (x, y), holding the button for hold seconds
+
+        Blocks for the hold; callers that must not block post the two
+        halves through post_button() and wait in between themselves.
+        """
+        self.post_button(hwnd, x, y, True)
+        time.sleep(self.scale_delay(hold))
+        self.post_button(hwnd, x, y, False)
+
+    def is_window(self, hwnd):
+        """Check if hwnd still refers to a capturable window"""
+        return True
+
+    def scale_delay(self, seconds):
+        """Convert an automation delay to wall-clock seconds for this backend"""
+        return seconds
+
+    def release(self, hwnd=None):
+        """Release resources held for hwnd (or all windows if None)"""
+        pass
+
+
+class GdiCaptureBackend(CaptureBackend):
+    """Live capture from a game window through PrintWindow / BitBlt
+
+    Keeps one GdiCaptureContext per HWND so DCs and DIB sections survive
+    across calls; call release() when the automation for a window ends.
+    """
+
+    name = 'gdi'
+    # Seconds between PrintWindow re-checks of regions that BitBlt reads all black
+    PRINT_FALLBACK_INTERVAL = 2.0
+
+    def __init__(self):
+        if win32gui is None:
+            raise RuntimeError("GDI capture backend requires pywin32 (Windows only)")
+        self.user32 = ctypes.windll.user32
+        self._contexts = {}
+        self._contexts_lock = threading.Lock()
+
+    def get_context(self, hwnd):
+        """Get (or create) the persistent capture context for hwnd"""
+        with self._contexts_lock:
+            context = self._contexts.get(hwnd)
+            if context is None:
+                context = GdiCaptureContext(hwnd)
+                self._contexts[hwnd] = context
+            return context
+
+    def capture_frame(self, hwnd):
+        """Capture the entire window - NON-INTRUSIVE
+        
+        Returns a read-only view of a buffer that is reused by the next
+        capture of the same window; copy it if it must outlive that.
+        """
+        try:
+            context = self.get_context(hwnd)
+            with context.lock:
+                return context.capture()
+
+        except Exception as e:
+            print(f"  ❌ Error capturing full window: {e}")
+            self.release(hwnd)
+            return None
+
+    def capture_regions(self, hwnd, rects):
+        """BitBlt only the requested rectangles, batched through one DIB
+
+        BitBlt reads black from surfaces GDI cannot see (DirectX content,
+        occluded or just-restored windows). All-zero rectangles are re-read
+        from a PrintWindow(PW_RENDERFULLCONTENT) render, at most once per
+        PRINT_FALLBACK_INTERVAL so genuinely black regions stay cheap. Once
+        PrintWindow shows content BitBlt missed, the window's regions are
+        read through PrintWindow until its context is released.
+        """
+        try:
+            context = self.get_context(hwnd)
+            with context.lock:
+                client_width, client_height = get_client_size(hwnd)
+                clipped = [clip_rect(x, y, w, h, client_width, client_height)
+                           for x, y, w, h in rects]
+                if context.regions_via_print:
+                    return context.print_regions(clipped)
+
+                regions = context.capture_regions(clipped)
+                blank = [i for i, region in enumerate(regions) if region.size and not region.any()]
+                now = time.monotonic()
+                if blank and (context.blank_checked is None
+                              or now - context.blank_checked >= self.PRINT_FALLBACK_INTERVAL):
+                    context.blank_checked = now
+                    context.print_fallbacks += 1
+                    printed = context.print_regions([clipped[i] for i in blank])
+                    for i, region in zip(blank, printed):
+                        regions[i] = region
+                    if any(region.any() for region in printed):
+                        context.regions_via_print = True
+                        print(f"  ⚠️  BitBlt reads HWND={hwnd} blank - using PrintWindow for its regions")
+                return regions
+
+        except Exception as e:
+            print(f"  ❌ Error capturing regions: {e}")
+            self.release(hwnd)
+            return None
+
+    def get_pixels(self, hwnd, points, force_refresh=True):
+        """Get pixel colors from a window's client area using BitBlt
+
+        A forced refresh invalidates one rectangle around all points and waits
+        once for the repaint, so its cost is paid per batch, not per point.
+        """
+        if not points:
+            return np.empty((0, 3), dtype=np.uint8)
+
+        if force_refresh:
+            time.sleep(self.refresh_points(hwnd, points))
+
+        try:
+            context = self.get_context(hwnd)
+            with context.lock:
+                return context.read_pixels(points)
+        except Exception as e:
+            print(f"  ❌ Error reading pixels: {e}")
+            self.release(hwnd)
+            return None
+
+    def refresh_points(self, hwnd, points):
+        """Invalidate one rectangle around all points and force a repaint"""
+        if not points:
+            return 0.0
+        rect = wintypes.RECT()
+        rect.left = min(x for x, _ in points) - 5
+        rect.top = min(y for _, y in points) - 5
+        rect.right = max(x for x, _ in points) + 5
+        rect.bottom = max(y for _, y in points) + 5
+        self.user32.InvalidateRect(hwnd, ctypes.byref(rect), False)
+        self.user32.UpdateWindow(hwnd)
+        return 0.05
+
+    def post_button(self, hwnd, x, y, down):
+        """Send non-intrusive button message to window"""
+        lparam = win32api.MAKELONG(x, y)
+        if down:
+            win32gui.PostMessage(hwnd, win32con.WM_LBUTTONDOWN, win32con.MK_LBUTTON, lparam)
+        else:
+            win32gui.PostMessage(hwnd, win32con.WM_LBUTTONUP, 0, lparam)
+
+    def is_window(self, hwnd):
+        return bool(win32gui.IsWindow(hwnd))
+
+    def release(self, hwnd=None):
+        """Free the DCs and bitmaps held for hwnd (or for every window)"""
+        with self._contexts_lock:
+            if hwnd is None:
+                contexts = list(self._contexts.values())
+                self._contexts.clear()
+            else:
+                context = self._contexts.pop(hwnd, None)
+                contexts = [context] if context else []
+
+        for context in contexts:
+            with context.lock:
+                context.release()
+
+
+class ReplayCaptureBackend(CaptureBackend):
+    """Serve recorded frames from a directory instead of a live window
+
+    Frames are PNG or NPY files whose name ends in a timestamp in seconds,
+    e.g. ``0012.500.png`` or ``frame_12.5.npy``. Replay time starts at the
+    first capture and runs ``speed`` times faster than the wall clock; all
+    automation delays are shortened by the same factor, so the state machine
+    runs headless at faster-than-real-time speed. Clicks are recorded, not sent.
+    """
+
+    name = 'replay'
+    is_live = False
+    FRAME_EXTENSIONS = ('.png', '.npy')
+    _TIMESTAMP_RE = re.compile(r'(\d+(?:\.\d+)?)$')
+
+    def __init__(self, frame_dir, speed=1.0, loop=False):
+        """
+        Args:
+            frame_dir: Directory containing the recorded frames
+            speed: Replay speed multiplier (1.0 = real time)
+            loop: Restart from the first frame after the last one
+        """
+        if speed <= 0:
+            raise ValueError("Replay speed must be positive")
+
+        self.frame_dir = frame_dir
+        self.speed = speed
+        self.loop = loop
+        self.timestamps = []
+        self.paths = []
+        self._decoded = {}
+        self._start = None
+        self.clicks = []
+
+        self.load_index()
+
+    def load_index(self):
+        """Scan frame_dir and sort its frames by timestamp"""
+        if not os.path.isdir(self.frame_dir):
+            raise FileNotFoundError(f"Replay directory not found: {self.frame_dir}")
+
+        entries = []
+        for filename in os.listdir(self.frame_dir):
+            stem, ext = os.path.splitext(filename)
+            if ext.lower() not in self.FRAME_EXTENSIONS:
+                continue
+            match = self._TIMESTAMP_RE.search(stem)
+            if not match:
+                continue
+            entries.append((float(match.group(1)), os.path.join(self.frame_dir, filename)))
+
+        if not entries:
+            raise FileNotFoundError(f"No timestamped PNG/NPY frames in: {self.frame_dir}")
+
+        entries.sort()
+        base = entries[0][0]
+        self.timestamps = [ts - base for ts, _ in entries]
+        self.paths = [path for _, path in entries]
+        self._decoded.clear()
+
+    def replay_time(self):
+        """Seconds of recording elapsed since the first capture"""
+        if self._start is None:
+            self._start = time.monotonic()
+        elapsed = (time.monotonic() - self._start) * self.speed
+        duration = self.timestamps[-1]
+        if self.loop and duration > 0:
+            elapsed %= duration
+        return elapsed
+
+    def frame_index_at(self, replay_time):
+        """Index of the frame that is on screen at replay_time"""
+        return max(0, bisect.bisect_right(self.timestamps, replay_time) - 1)
+
+    def load_frame(self, index):
+        """Decode (and memoize) the frame at index as a BGR image"""
+        frame = self._decoded.get(index)
+        if frame is not None:
+            return frame
+
+        path = self.paths[index]
+        if path.lower().endswith('.npy'):
+            frame = np.load(path)
+        else:
+            # imdecode from a buffer so Unicode paths work (see template_registry.decode_grayscale)
+            with open(path, 'rb') as f:
+                frame = cv2.imdecode(np.frombuffer(f.read(), np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                raise ValueError(f"Failed to decode replay frame: {path}")
+
+        if frame.ndim == 3 and frame.shape[2] == 4:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+
+        self._decoded[index] = frame
+        return frame
+
+    def capture_frame(self, hwnd):
+        try:
+            # Copy so callers may treat the result like a fresh capture
+            return self.load_frame(self.frame_index_at(self.replay_time())).copy()
+        except Exception as e:
+            print(f"  ❌ Error loading replay frame: {e}")
+            return None
+
+    def get_pixels(self, hwnd, points, force_refresh=True):
+        try:
+            frame = self.load_frame(self.frame_index_at(self.replay_time()))
+        except Exception as e:
+            print(f"  ❌ Error loading replay frame: {e}")
+            return None
+        return sample_frame_pixels(frame, points)
+
+    def post_button(self, hwnd, x, y, down):
+        if down:
+            self.clicks.append((self.replay_time(), hwnd, x, y))
+
+    def scale_delay(self, seconds):
+        return seconds / self.speed
+
+
+CAPTURE_BACKENDS = {
+    GdiCaptureBackend.name: GdiCaptureBackend,
+    ReplayCaptureBackend.name: ReplayCaptureBackend,
+}
+
+
+def create_capture_backend(name='gdi', **kwargs):
+    """Create a capture backend by name
+
+    Args:
+        name: 'gdi' (live window) or 'replay' (recorded frames)
+        **kwargs: Passed to the backend constructor
+
+    Returns:
+        CaptureBackend: The new backend
+    """
+    backend_class = CAPTURE_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown capture backend: {name}")
+    return backend_class(**kwargs)
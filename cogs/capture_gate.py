@@ -0,0 +1,117 @@
+import threading
+import time
+
+from cogs.capture_backend import CaptureBackend
+
+
+class CaptureGate:
+    """Caps how many captures run at the same time across clients
+
+    PrintWindow / BitBlt on many game windows at once contend for the
+    compositor and spike the CPU; callers hold a slot only for the capture
+    itself, so waiting for a slot costs a few milliseconds at most.
+    """
+
+    def __init__(self, max_concurrent):
+        """
+        Args:
+            max_concurrent: Captures allowed in flight at once
+        """
+        self.max_concurrent = max_concurrent
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.peak_active = 0
+        self.captures = 0
+        self.waited = 0           # captures that found every slot taken
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+    def __enter__(self):
+        start = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            self._slots.acquire()
+            waited = time.perf_counter() - start
+            with self._lock:
+                self.waited += 1
+                self.wait_time += waited
+                self.max_wait = max(self.max_wait, waited)
+        with self._lock:
+            self.active += 1
+            self.captures += 1
+            self.peak_active = max(self.peak_active, self.active)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+        return False
+
+    def get_stats(self):
+        """Get gate counters
+
+        Returns:
+            dict: cap, peak concurrency, captures, waits and wait times in seconds
+        """
+        with self._lock:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'peak_active': self.peak_active,
+                'captures': self.captures,
+                'waited': self.waited,
+                'avg_wait': self.wait_time / self.waited if self.waited else 0.0,
+                'max_wait': self.max_wait
+            }
+
+
+class GatedCaptureBackend(CaptureBackend):
+    """Wraps another backend so its captures go through a CaptureGate
+
+    Only the transfer itself holds a slot; repaint waits before a forced
+    pixel read happen outside it. Everything else is passed through.
+    """
+
+    def __init__(self, backend, gate):
+        """
+        Args:
+            backend: CaptureBackend doing the actual work
+            gate: CaptureGate shared by every client
+        """
+        self.backend = backend
+        self.gate = gate
+        self.name = backend.name
+        self.is_live = backend.is_live
+
+    def __getattr__(self, attr):
+        # Backend-specific extras (e.g. the replay backend's clicks)
+        return getattr(self.backend, attr)
+
+    def capture_frame(self, hwnd):
+        with self.gate:
+            return self.backend.capture_frame(hwnd)
+
+    def capture_regions(self, hwnd, rects):
+        with self.gate:
+            return self.backend.capture_regions(hwnd, rects)
+
+    def get_pixels(self, hwnd, points, force_refresh=True):
+        if force_refresh and points:
+            time.sleep(self.backend.refresh_points(hwnd, points))
+        with self.gate:
+            return self.backend.get_pixels(hwnd, points, force_refresh=False)
+
+    def refresh_points(self, hwnd, points):
+        return self.backend.refresh_points(hwnd, points)
+
+    def post_button(self, hwnd, x, y, down):
+        self.backend.post_button(hwnd, x, y, down)
+
+    def is_window(self, hwnd):
+        return self.backend.is_window(hwnd)
+
+    def scale_delay(self, seconds):
+        return self.backend.scale_delay(seconds)
+
+    def release(self, hwnd=None):
+        self.backend.release(hwnd)
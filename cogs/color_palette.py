@@ -0,0 +1,86 @@
+import numpy as np
+
+
+class ColorPalette:
+    """Classifies sampled pixels against a set of labelled reference colors
+
+    A pixel matches a reference when every RGB channel is within that
+    reference's tolerance (same rule as RealmRaidAutomation.color_matches);
+    when several references match, the nearest one wins. All points are
+    classified against all references in one NumPy operation.
+    """
+
+    DEFAULT_TOLERANCE = 10
+
+    def __init__(self, colors, tolerances=None, default_tolerance=DEFAULT_TOLERANCE):
+        """
+        Args:
+            colors: dict of label → (r, g, b)
+            tolerances: dict of label → per-channel tolerance (optional)
+            default_tolerance: Tolerance for labels missing from tolerances
+        """
+        tolerances = tolerances or {}
+        self.labels = list(colors)
+        self.colors = np.array([colors[label] for label in self.labels], dtype=np.int16).reshape(-1, 3)
+        self.tolerances = np.array(
+            [tolerances.get(label, default_tolerance) for label in self.labels], dtype=np.int16
+        )
+
+    @classmethod
+    def from_config(cls, section):
+        """Build a palette from a coords.ini section
+
+        Every ``<label>_color = #RRGGBB`` key becomes a reference color.
+        ``<label>_tolerance`` overrides the tolerance of one color and
+        ``color_tolerance`` sets the default for the rest.
+        """
+        colors = {}
+        tolerances = {}
+        for key, value in section.items():
+            if key.endswith('_color'):
+                hex_str = value.strip().lstrip('#')
+                colors[key[:-len('_color')]] = tuple(int(hex_str[i:i+2], 16) for i in (0, 2, 4))
+            elif key.endswith('_tolerance') and key != 'color_tolerance':
+                tolerances[key[:-len('_tolerance')]] = int(value)
+
+        default_tolerance = int(section.get('color_tolerance', cls.DEFAULT_TOLERANCE))
+        return cls(colors, tolerances, default_tolerance)
+
+    def distances(self, samples):
+        """Per-channel max distance of every sample to every reference
+
+        Args:
+            samples: (N, 3) array-like of RGB values
+
+        Returns:
+            numpy.ndarray: (N, K) int16 distances, K = number of labels
+        """
+        samples = np.asarray(samples, dtype=np.int16).reshape(-1, 3)
+        return np.abs(samples[:, None, :] - self.colors[None, :, :]).max(axis=2)
+
+    def classify_indices(self, samples):
+        """Index of the nearest matching reference per sample (-1 = no match)"""
+        distances = self.distances(samples)
+        within = distances <= self.tolerances[None, :]
+        masked = np.where(within, distances, np.iinfo(np.int16).max)
+        nearest = masked.argmin(axis=1)
+        return np.where(within.any(axis=1), nearest, -1)
+
+    def classify(self, samples):
+        """Nearest matching label per sample
+
+        Returns:
+            list: label per sample, None where no reference is within tolerance
+        """
+        return [self.labels[i] if i >= 0 else None for i in self.classify_indices(samples)]
+
+    def classify_one(self, rgb):
+        """Label for a single RGB tuple (None if rgb is None or nothing matches)"""
+        if rgb is None:
+            return None
+        return self.classify([rgb])[0]
+
+    def matches(self, samples, label):
+        """Boolean mask of samples within tolerance of one label"""
+        i = self.labels.index(label)
+        return self.distances(samples)[:, i] <= self.tolerances[i]
@@ -1,16 +1,17 @@
 import pyautogui
-import win32gui
 import ctypes
 from ctypes import wintypes
 import keyboard
 from cogs.window_fetcher import WindowFetcher
+from cogs.capture_backend import GdiCaptureBackend
 
 class CoordinateFinder:
     """Utility class for finding client-relative mouse coordinates"""
     
-    def __init__(self, config_path, window_fetcher=None):
+    def __init__(self, config_path, window_fetcher=None, capture_backend=None):
         self.config_path = config_path
         self.window_fetcher = window_fetcher or WindowFetcher(config_path)
+        self.capture_backend = capture_backend or GdiCaptureBackend()
         self.hotkey_listening = False
         self.user32 = ctypes.windll.user32
         self.user32.SetThreadDpiAwarenessContext.argtypes = [ctypes.c_void_p]
@@ -35,23 +36,15 @@ class CoordinateFinder:
             if hwnd is not None:
                 # NEW METHOD: Read directly from window DC (works behind other windows)
                 # x, y are CLIENT coordinates
-                print(f"[COLOR] Using win32gui.GetPixel() - Window DC method")
+                print(f"[COLOR] Using {self.capture_backend.name} capture backend - Window DC method")
                 print(f"[COLOR] Reading from HWND {hwnd} at client coords ({x}, {y})")
                 
-                hdc = win32gui.GetDC(hwnd)
+                rgb_color = self.capture_backend.get_pixel(hwnd, x, y, force_refresh=False)
+                if rgb_color is None:
+                    print(f"[COLOR] ✗ Capture backend returned no color")
+                    return None, None
                 
-                # Get pixel color from window's device context
-                bgr_color = win32gui.GetPixel(hdc, x, y)
-                
-                # Cleanup
-                win32gui.ReleaseDC(hwnd, hdc)
-                
-                # Convert BGR to RGB
-                b = (bgr_color >> 16) & 0xFF
-                g = (bgr_color >> 8) & 0xFF
-                r = bgr_color & 0xFF
-                
-                rgb_color = (r, g, b)
+                r, g, b = rgb_color
                 hex_color = '#{:02X}{:02X}{:02X}'.format(r, g, b)
                 
                 print(f"[COLOR] ✓ Window DC result: {hex_color} RGB{rgb_color}")
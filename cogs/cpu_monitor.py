@@ -0,0 +1,66 @@
+import os
+import threading
+import time
+
+
+class CpuMonitor:
+    """Samples this process's CPU use on a background thread
+
+    Each sample is the process CPU time spent over the last interval as a
+    percentage of one core, so 12 clients pinning two cores read 200%.
+    The average covers the whole run; the peak is the busiest interval,
+    which is what staggered captures are meant to bring down. Worker
+    processes (DetectionPool) are not included.
+    """
+
+    def __init__(self, interval=0.5):
+        """
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.cpus = os.cpu_count() or 1
+        self.samples = []
+        self.peak = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._start_wall = None
+        self._start_cpu = None
+
+    def start(self):
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="CPU-Monitor")
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        last_wall, last_cpu = self._start_wall, self._start_cpu
+        while not self._stop_event.wait(self.interval):
+            wall, cpu = time.perf_counter(), time.process_time()
+            if wall > last_wall:
+                percent = 100.0 * (cpu - last_cpu) / (wall - last_wall)
+                self.samples.append(percent)
+                self.peak = max(self.peak, percent)
+            last_wall, last_cpu = wall, cpu
+
+    def get_stats(self):
+        """Get CPU use so far
+
+        Returns:
+            dict: average and peak percent of one core, sample count and CPU count
+        """
+        if self._start_wall is None:
+            return {'avg': 0.0, 'peak': 0.0, 'samples': 0, 'cpus': self.cpus}
+        elapsed = time.perf_counter() - self._start_wall
+        used = time.process_time() - self._start_cpu
+        return {
+            'avg': 100.0 * used / elapsed if elapsed > 0 else 0.0,
+            'peak': self.peak,
+            'samples': len(self.samples),
+            'cpus': self.cpus
+        }
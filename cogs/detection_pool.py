@@ -0,0 +1,205 @@
+import collections
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, util
+import numpy as np
+
+from cogs.grid_matcher import GRID_KEYS, GridMatcher, GridResult
+
+# Compact state codes sent back from the workers
+STATE_CODES = ('available', 'ko', 'fail', 'froglet')
+
+# Worker-process globals, set once by _init_worker
+_worker_matcher = None
+# shared memory name → SharedMemory, least recently used first
+_worker_segments = collections.OrderedDict()
+# Slots are replaced when a client's frame grows or the client leaves, so
+# only the most recently used mappings are kept open
+MAX_WORKER_SEGMENTS = 32
+
+
+def _init_worker(templates, cell_coords, thresholds, scales):
+    """Build the matcher once per worker process"""
+    global _worker_matcher
+    _worker_matcher = GridMatcher(templates, cell_coords, thresholds=thresholds, scales=scales)
+    # Pool workers leave through os._exit, which skips atexit; multiprocessing
+    # finalizers with an exit priority still run
+    util.Finalize(None, _close_segments, exitpriority=10)
+
+
+def _close_segments():
+    """Close every mapping this worker opened (the parent owns and unlinks them)"""
+    while _worker_segments:
+        _, segment = _worker_segments.popitem(last=False)
+        try:
+            segment.close()
+        except BufferError:
+            pass
+
+
+def _attach(name):
+    """Open (and keep open) a shared memory block created by the parent"""
+    segment = _worker_segments.get(name)
+    if segment is None:
+        # Pool workers share the parent's resource tracker, so attaching here
+        # does not make the block outlive (or die with) this worker
+        segment = shared_memory.SharedMemory(name=name)
+        _worker_segments[name] = segment
+        while len(_worker_segments) > MAX_WORKER_SEGMENTS:
+            _, stale = _worker_segments.popitem(last=False)
+            stale.close()
+    else:
+        _worker_segments.move_to_end(name)
+    return segment
+
+
+def _classify_shared(name, shape):
+    """Worker task: classify the grid of the frame in shared memory
+
+    Returns:
+        tuple: (state codes, confidences), one entry per GRID_KEYS cell
+    """
+    segment = _attach(name)
+    frame = np.ndarray(shape, dtype=np.uint8, buffer=segment.buf)
+    result = _worker_matcher.classify_frame(frame)
+    states = tuple(STATE_CODES.index(result.state(key)) for key in GRID_KEYS)
+    confidences = tuple(round(result.confidence(key), 4) for key in GRID_KEYS)
+    return states, confidences
+
+
+class DetectionRequest:
+    """A classification in flight: poll done(), then read result()"""
+
+    def __init__(self, future):
+        self.future = future
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        """
+        Returns:
+            GridResult: 3x3 states and confidences
+        """
+        states, confidences = self.future.result()
+        grid = GridResult()
+        for key_index, grid_key in enumerate(GRID_KEYS):
+            grid.set(grid_key, STATE_CODES[states[key_index]], confidences[key_index])
+        return grid
+
+
+class DetectionPool:
+    """Offloads grid classification to a pool of worker processes
+
+    Template matching holds the GIL in this process, so RR-All on many
+    clients is limited to one core. Each client gets a shared memory slot
+    sized to its frame; a classification copies the frame into the slot and
+    a worker process reads it in place and returns only the 3x3 grid states
+    and confidences. One request per client is in flight at a time, so a
+    slot is never overwritten while a worker reads it.
+
+    submit_async() returns at once, so step generators can yield until the
+    answer arrives and the single-threaded scheduler engine keeps driving
+    other clients meanwhile; submit() blocks and suits the threads engine.
+    """
+
+    def __init__(self, workers, templates, cell_coords, thresholds=None, scales=None):
+        """
+        Args:
+            workers: Number of worker processes
+            templates: dict of template key → grayscale template image
+            cell_coords: dict of grid key → (x, y) cell centre
+            thresholds: dict of template key → match threshold
+            scales: dict of template key → coarse-to-fine scale
+        """
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(dict(templates), dict(cell_coords), thresholds, scales)
+        )
+        self._slots = {}          # client key → (SharedMemory, threading.Lock)
+        self._slots_lock = threading.Lock()
+        self.requests = 0
+
+    @classmethod
+    def for_automation(cls, workers, automation):
+        """Build a pool matching a RealmRaidAutomation's templates and config"""
+        matcher = automation.grid_matcher
+        return cls(
+            workers, automation.templates, matcher.cell_coords,
+            thresholds=matcher.thresholds, scales=automation.template_scales
+        )
+
+    def _slot_lock(self, key):
+        with self._slots_lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = (None, threading.Lock())
+                self._slots[key] = slot
+            return slot[1]
+
+    def submit_async(self, key, frame):
+        """Copy frame into key's slot and start classifying it in a worker
+
+        The slot stays locked until the worker answers, so a second request
+        for the same client waits for the first.
+
+        Returns:
+            DetectionRequest
+        """
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        lock = self._slot_lock(key)
+
+        lock.acquire()
+        try:
+            segment = self._slots[key][0]
+            if segment is None or segment.size < frame.nbytes:
+                if segment is not None:
+                    segment.close()
+                    segment.unlink()
+                segment = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+                with self._slots_lock:
+                    self._slots[key] = (segment, lock)
+
+            view = np.ndarray(frame.shape, dtype=np.uint8, buffer=segment.buf)
+            view[...] = frame
+            del view
+
+            future = self.executor.submit(_classify_shared, segment.name, frame.shape)
+        except BaseException:
+            lock.release()
+            raise
+        future.add_done_callback(lambda _: lock.release())
+        self.requests += 1
+        return DetectionRequest(future)
+
+    def submit(self, key, frame):
+        """Classify frame in a worker and wait for the answer
+
+        The GIL is released while waiting, so other clients' threads keep
+        running.
+
+        Returns:
+            GridResult: 3x3 states and confidences
+        """
+        return self.submit_async(key, frame).result()
+
+    def classify_grid(self, key, frame):
+        """Classify the 3x3 grid of one client's frame in a worker"""
+        return self.submit(key, frame)
+
+    def release(self, key):
+        """Free the shared memory slot of one client"""
+        with self._slots_lock:
+            slot = self._slots.pop(key, None)
+        if slot and slot[0] is not None:
+            with slot[1]:
+                slot[0].close()
+                slot[0].unlink()
+
+    def shutdown(self):
+        """Stop the workers and free every slot"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        for key in list(self._slots):
+            self.release(key)
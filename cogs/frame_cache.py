@@ -0,0 +1,120 @@
+from cogs.capture_backend import clip_rect
+
+
+class FrameCache:
+    """Holds captured frames and regions per window until explicitly invalidated
+
+    Every detector and pixel probe in a scan tick reads the same frame instead
+    of triggering its own PrintWindow capture. The cache must be invalidated
+    whenever the screen is expected to change (after a click or a sleep).
+
+    Small regions can be cached instead of the full frame: they are served
+    from a cached full frame when there is one, otherwise captured through
+    region_func, which only transfers the requested rectangles.
+
+    The capture sources are plain callables taking an HWND, so the cache can
+    be fed from a fake source off Windows.
+    """
+
+    def __init__(self, capture_func, region_func=None):
+        """
+        Args:
+            capture_func: Callable(hwnd) -> BGR numpy image or None
+            region_func: Callable(hwnd, rects) -> list of BGR images or None,
+                where rects are (x, y, width, height) tuples
+        """
+        self.capture_func = capture_func
+        self.region_func = region_func
+        self._frames = {}
+        self._regions = {}   # hwnd → {(x, y, width, height): image}
+        self.captures = 0
+        self.captures_saved = 0
+
+    def get(self, hwnd):
+        """Return the cached frame for hwnd, capturing it on first use
+
+        The returned array is read-only because it is shared by every caller
+        until the next invalidate().
+        """
+        frame = self._frames.get(hwnd)
+        if frame is not None:
+            self.captures_saved += 1
+            return frame
+
+        frame = self.capture_func(hwnd)
+        self.captures += 1
+        if frame is None:
+            return None
+
+        frame.flags.writeable = False
+        self._frames[hwnd] = frame
+        return frame
+
+    def peek(self, hwnd):
+        """Return the cached frame for hwnd without capturing (None if stale)"""
+        return self._frames.get(hwnd)
+
+    def get_region(self, hwnd, x, y, width, height):
+        """Return one client rectangle, capturing only that rectangle if needed"""
+        frame = self._frames.get(hwnd)
+        if frame is not None:
+            self.captures_saved += 1
+            h, w = frame.shape[:2]
+            x1, y1, x2, y2 = clip_rect(x, y, width, height, w, h)
+            return frame[y1:y2, x1:x2]
+
+        if self.region_func is None:
+            frame = self.get(hwnd)
+            if frame is None:
+                return None
+            h, w = frame.shape[:2]
+            x1, y1, x2, y2 = clip_rect(x, y, width, height, w, h)
+            return frame[y1:y2, x1:x2]
+
+        rect = (x, y, width, height)
+        region = self._regions.get(hwnd, {}).get(rect)
+        if region is not None:
+            self.captures_saved += 1
+            return region
+
+        self.prefetch_regions(hwnd, [rect])
+        return self._regions.get(hwnd, {}).get(rect)
+
+    def prefetch_regions(self, hwnd, rects):
+        """Capture every rect not cached yet in a single region_func call"""
+        if self.region_func is None or hwnd in self._frames:
+            return
+
+        cached = self._regions.setdefault(hwnd, {})
+        missing = list(dict.fromkeys(rect for rect in rects if rect not in cached))
+        if not missing:
+            return
+
+        regions = self.region_func(hwnd, missing)
+        self.captures += 1
+        if regions is None:
+            return
+
+        for rect, region in zip(missing, regions):
+            region.flags.writeable = False
+            cached[rect] = region
+
+    def invalidate(self, hwnd=None):
+        """Drop the cached frame and regions for hwnd, or for every window if None"""
+        if hwnd is None:
+            self._frames.clear()
+            self._regions.clear()
+        else:
+            self._frames.pop(hwnd, None)
+            self._regions.pop(hwnd, None)
+
+    def get_stats(self):
+        """Get capture counters
+
+        Returns:
+            dict: captures performed and captures saved by reuse
+        """
+        return {
+            'captures': self.captures,
+            'captures_saved': self.captures_saved
+        }
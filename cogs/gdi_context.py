@@ -0,0 +1,302 @@
+import ctypes
+import threading
+from ctypes import wintypes
+import cv2
+import numpy as np
+
+SRCCOPY = 0x00CC0020
+CAPTUREBLT = 0x40000000
+DIB_RGB_COLORS = 0
+BI_RGB = 0
+PW_CLIENTONLY = 0x1
+PW_RENDERFULLCONTENT = 0x2
+
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ("biSize", wintypes.DWORD),
+        ("biWidth", wintypes.LONG),
+        ("biHeight", wintypes.LONG),
+        ("biPlanes", wintypes.WORD),
+        ("biBitCount", wintypes.WORD),
+        ("biCompression", wintypes.DWORD),
+        ("biSizeImage", wintypes.DWORD),
+        ("biXPelsPerMeter", wintypes.LONG),
+        ("biYPelsPerMeter", wintypes.LONG),
+        ("biClrUsed", wintypes.DWORD),
+        ("biClrImportant", wintypes.DWORD),
+    ]
+
+
+class BITMAPINFO(ctypes.Structure):
+    _fields_ = [
+        ("bmiHeader", BITMAPINFOHEADER),
+        ("bmiColors", wintypes.DWORD * 3),
+    ]
+
+
+def _load_gdi_api():
+    """Load private user32/gdi32 handles with 64-bit safe prototypes
+
+    Private WinDLL instances are used so these prototypes do not leak into
+    the ctypes.windll function objects shared with the rest of the app.
+    """
+    if not hasattr(ctypes, 'WinDLL'):
+        return None, None
+
+    user32 = ctypes.WinDLL('user32', use_last_error=True)
+    gdi32 = ctypes.WinDLL('gdi32', use_last_error=True)
+
+    user32.GetDC.argtypes = [wintypes.HWND]
+    user32.GetDC.restype = wintypes.HDC
+    user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+    user32.ReleaseDC.restype = ctypes.c_int
+    user32.GetClientRect.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.RECT)]
+    user32.GetClientRect.restype = wintypes.BOOL
+    user32.PrintWindow.argtypes = [wintypes.HWND, wintypes.HDC, wintypes.UINT]
+    user32.PrintWindow.restype = wintypes.BOOL
+
+    gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+    gdi32.CreateCompatibleDC.restype = wintypes.HDC
+    gdi32.CreateDIBSection.argtypes = [
+        wintypes.HDC, ctypes.POINTER(BITMAPINFO), wintypes.UINT,
+        ctypes.POINTER(ctypes.c_void_p), wintypes.HANDLE, wintypes.DWORD
+    ]
+    gdi32.CreateDIBSection.restype = wintypes.HBITMAP
+    gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+    gdi32.SelectObject.restype = wintypes.HGDIOBJ
+    gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+    gdi32.DeleteObject.restype = wintypes.BOOL
+    gdi32.DeleteDC.argtypes = [wintypes.HDC]
+    gdi32.DeleteDC.restype = wintypes.BOOL
+    gdi32.BitBlt.argtypes = [
+        wintypes.HDC, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+        wintypes.HDC, ctypes.c_int, ctypes.c_int, wintypes.DWORD
+    ]
+    gdi32.BitBlt.restype = wintypes.BOOL
+    gdi32.GdiFlush.argtypes = []
+    gdi32.GdiFlush.restype = wintypes.BOOL
+
+    return user32, gdi32
+
+
+_user32, _gdi32 = _load_gdi_api()
+
+
+def get_client_size(hwnd):
+    """Get the client area size of hwnd as (width, height)"""
+    rect = wintypes.RECT()
+    if not _user32.GetClientRect(hwnd, ctypes.byref(rect)):
+        return 0, 0
+    return rect.right - rect.left, rect.bottom - rect.top
+
+
+class FrameBuffer:
+    """Preallocated BGR destination reused for every capture of a window
+
+    convert() writes into the same array frame after frame and hands out a
+    read-only view of it, so steady-state capture allocates nothing. The
+    returned frame is only valid until the next convert() call.
+    """
+
+    def __init__(self):
+        self.array = None
+        self.frame = None
+
+    def convert(self, bgra):
+        """Convert a BGRA image into the buffer and return the read-only view"""
+        height, width = bgra.shape[:2]
+        if self.array is None or self.array.shape[:2] != (height, width):
+            self.array = np.empty((height, width, 3), dtype=np.uint8)
+            self.frame = self.array.view()
+            self.frame.flags.writeable = False
+
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=self.array)
+        return self.frame
+
+
+class DibSurface:
+    """A memory DC with a selected top-down 32bpp DIB section
+
+    ``array`` is a NumPy view directly onto the DIB bits (no copy).
+    """
+
+    def __init__(self, reference_dc, width, height):
+        self.width = width
+        self.height = height
+        self.dc = None
+        self.bitmap = None
+        self.bits = ctypes.c_void_p()
+        self.array = None
+        self._old_bitmap = None
+
+        self.dc = _gdi32.CreateCompatibleDC(reference_dc)
+        if not self.dc:
+            raise OSError("CreateCompatibleDC failed")
+
+        info = BITMAPINFO()
+        info.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        info.bmiHeader.biWidth = width
+        info.bmiHeader.biHeight = -height  # negative = top-down rows
+        info.bmiHeader.biPlanes = 1
+        info.bmiHeader.biBitCount = 32
+        info.bmiHeader.biCompression = BI_RGB
+
+        self.bitmap = _gdi32.CreateDIBSection(
+            self.dc, ctypes.byref(info), DIB_RGB_COLORS, ctypes.byref(self.bits), None, 0
+        )
+        if not self.bitmap or not self.bits:
+            self.release()
+            raise OSError("CreateDIBSection failed")
+
+        self._old_bitmap = _gdi32.SelectObject(self.dc, self.bitmap)
+
+        pixels = ctypes.cast(self.bits, ctypes.POINTER(ctypes.c_ubyte))
+        self.array = np.ctypeslib.as_array(pixels, shape=(height, width, 4))
+
+    def release(self):
+        # Drop the view first - its memory is freed with the bitmap
+        self.array = None
+        if self.dc and self._old_bitmap:
+            _gdi32.SelectObject(self.dc, self._old_bitmap)
+        if self.bitmap:
+            _gdi32.DeleteObject(self.bitmap)
+        if self.dc:
+            _gdi32.DeleteDC(self.dc)
+        self.dc = None
+        self.bitmap = None
+        self._old_bitmap = None
+        self.bits = ctypes.c_void_p()
+
+
+class GdiCaptureContext:
+    """GDI objects for one window, kept alive across captures
+
+    Holds the window DC, a full-client DIB surface for PrintWindow and a
+    region surface for ROI blits and pixel reads. The full surface
+    is rebuilt only when the client size changes and the region surface only
+    grows; everything is freed by release(). Frames are converted straight
+    from the DIB bits into a reused FrameBuffer.
+    """
+
+    def __init__(self, hwnd):
+        self.hwnd = hwnd
+        self.lock = threading.Lock()
+        self.window_dc = None
+        self.frame_surface = None
+        self.region_surface = None
+        self.frame_buffer = FrameBuffer()
+        self.rebuilds = 0
+        self.print_fallbacks = 0     # region reads redone through PrintWindow
+        self.regions_via_print = False   # BitBlt reads this window blank; use PrintWindow
+        self.blank_checked = None        # monotonic time of the last fallback check
+
+        self.window_dc = _user32.GetDC(hwnd)
+        if not self.window_dc:
+            raise OSError(f"GetDC failed for HWND {hwnd}")
+
+    def ensure_frame_surface(self):
+        """Return a DIB surface matching the current client size"""
+        width, height = get_client_size(self.hwnd)
+        if width <= 0 or height <= 0:
+            raise OSError(f"Window {self.hwnd} has an empty client area")
+
+        surface = self.frame_surface
+        if surface is None or surface.width != width or surface.height != height:
+            if surface is not None:
+                surface.release()
+                self.rebuilds += 1
+            self.frame_surface = DibSurface(self.window_dc, width, height)
+        return self.frame_surface
+
+    def print_window(self):
+        """Render the window into the frame surface and return the surface"""
+        surface = self.ensure_frame_surface()
+        if not _user32.PrintWindow(self.hwnd, surface.dc, PW_CLIENTONLY | PW_RENDERFULLCONTENT):
+            raise OSError(f"PrintWindow failed for HWND {self.hwnd}")
+        _gdi32.GdiFlush()
+        return surface
+
+    def capture(self):
+        """Capture the client area into the reused BGR buffer (read-only view)"""
+        surface = self.print_window()
+        return self.frame_buffer.convert(surface.array)
+
+    def ensure_region_surface(self, width, height):
+        """Return a DIB surface at least width x height (grow-only)"""
+        surface = self.region_surface
+        if surface is None or surface.width < width or surface.height < height:
+            if surface is not None:
+                width = max(width, surface.width)
+                height = max(height, surface.height)
+                surface.release()
+            self.region_surface = DibSurface(self.window_dc, width, height)
+        return self.region_surface
+
+    def capture_regions(self, corners):
+        """BitBlt each (x1, y1, x2, y2) client rectangle into a stacked strip
+
+        Only the requested pixels are transferred. Each rectangle gets its own
+        row band in the region surface and is converted to a separate BGR image.
+        """
+        sizes = [(max(0, x2 - x1), max(0, y2 - y1)) for x1, y1, x2, y2 in corners]
+        strip_width = max((w for w, _ in sizes), default=0)
+        strip_height = sum(h for _, h in sizes)
+        if strip_width == 0 or strip_height == 0:
+            return [np.empty((h, w, 3), dtype=np.uint8) for w, h in sizes]
+
+        surface = self.ensure_region_surface(strip_width, strip_height)
+
+        offset = 0
+        for (x1, y1, _, _), (w, h) in zip(corners, sizes):
+            if w and h and not _gdi32.BitBlt(surface.dc, 0, offset, w, h,
+                                            self.window_dc, x1, y1, SRCCOPY | CAPTUREBLT):
+                raise OSError(f"BitBlt failed for region at ({x1},{y1})")
+            offset += h
+        _gdi32.GdiFlush()
+
+        regions = []
+        offset = 0
+        for w, h in sizes:
+            if w and h:
+                regions.append(cv2.cvtColor(surface.array[offset:offset + h, :w], cv2.COLOR_BGRA2BGR))
+            else:
+                regions.append(np.empty((h, w, 3), dtype=np.uint8))
+            offset += h
+        return regions
+
+    def print_regions(self, corners):
+        """Cut each (x1, y1, x2, y2) client rectangle from a PrintWindow render
+
+        Reads the frame surface directly, so the FrameBuffer behind frames
+        returned by capture() is left untouched.
+        """
+        surface = self.print_window()
+        return [cv2.cvtColor(surface.array[y1:y2, x1:x2], cv2.COLOR_BGRA2BGR)
+                if x2 > x1 and y2 > y1 else np.empty((max(0, y2 - y1), max(0, x2 - x1), 3), dtype=np.uint8)
+                for x1, y1, x2, y2 in corners]
+
+    def read_pixels(self, points):
+        """BitBlt each (x, y) client pixel into one row of the region surface
+
+        Returns:
+            numpy.ndarray: (N, 3) uint8 RGB rows
+        """
+        surface = self.ensure_region_surface(len(points), 1)
+        for i, (x, y) in enumerate(points):
+            if not _gdi32.BitBlt(surface.dc, i, 0, 1, 1, self.window_dc, x, y, SRCCOPY | CAPTUREBLT):
+                raise OSError(f"BitBlt failed at ({x},{y})")
+        _gdi32.GdiFlush()
+        # BGRA → RGB
+        return surface.array[0, :len(points), 2::-1].copy()
+
+    def release(self):
+        if self.frame_surface is not None:
+            self.frame_surface.release()
+            self.frame_surface = None
+        if self.region_surface is not None:
+            self.region_surface.release()
+            self.region_surface = None
+        if self.window_dc:
+            _user32.ReleaseDC(self.hwnd, self.window_dc)
+            self.window_dc = None
@@ -0,0 +1,128 @@
+import atexit
+import ctypes
+import threading
+from ctypes import wintypes
+
+_windll = getattr(ctypes, 'windll', None)
+_user32 = _windll.user32 if _windll else None
+
+
+def read_geometry(hwnd):
+    """Fingerprint of a window's size in the calling thread's DPI context
+
+    Returns:
+        tuple: (client_w, client_h, window_w, window_h, dpi), or None off Windows
+    """
+    if _user32 is None:
+        return None
+    client = wintypes.RECT()
+    window = wintypes.RECT()
+    _user32.GetClientRect(hwnd, ctypes.byref(client))
+    _user32.GetWindowRect(hwnd, ctypes.byref(window))
+    try:
+        dpi = _user32.GetDpiForWindow(hwnd)   # Windows 10 1607+
+    except AttributeError:
+        dpi = 96
+    return (client.right - client.left, client.bottom - client.top,
+            window.right - window.left, window.bottom - window.top, dpi)
+
+
+class GeometryCache:
+    """Last verified geometry and pending size restores, per HWND
+
+    After a run brings a window to the reference size it stores the
+    window's fingerprint (client and window size plus DPI). The next run
+    on that window compares a fresh fingerprint against it and skips the
+    resize and the render wait when nothing changed.
+
+    Restores at the end of a run can be deferred (opt-in via restore_grace
+    in config.ini): schedule_restore() runs the restore after a grace
+    period unless a new run claims the window first, so back-to-back runs
+    do not shrink and regrow every client.
+    Pending restores are run at once on interpreter exit.
+    """
+
+    def __init__(self):
+        self.verified = {}
+        self.pending = {}
+        self._lock = threading.Lock()
+
+    def remember(self, hwnd, fingerprint):
+        """Record the fingerprint a run verified for hwnd"""
+        with self._lock:
+            if fingerprint is None:
+                self.verified.pop(hwnd, None)
+            else:
+                self.verified[hwnd] = fingerprint
+
+    def is_verified(self, hwnd, fingerprint):
+        return fingerprint is not None and self.verified.get(hwnd) == fingerprint
+
+    def forget(self, hwnd):
+        with self._lock:
+            self.verified.pop(hwnd, None)
+
+    def schedule_restore(self, hwnd, delay, restore):
+        """Run restore() after delay seconds unless cancel_restore(hwnd) comes first"""
+        timer = threading.Timer(delay, self._run_restore, args=(hwnd,))
+        timer.daemon = True
+        with self._lock:
+            previous = self.pending.pop(hwnd, None)
+            self.pending[hwnd] = (timer, restore)
+        if previous:
+            previous[0].cancel()
+        timer.start()
+
+    def cancel_restore(self, hwnd):
+        """Drop a pending restore of hwnd
+
+        Returns:
+            bool: True if a restore was pending
+        """
+        with self._lock:
+            pending = self.pending.pop(hwnd, None)
+        if pending:
+            pending[0].cancel()
+        return pending is not None
+
+    def _run_restore(self, hwnd):
+        with self._lock:
+            pending = self.pending.pop(hwnd, None)
+        if not pending:
+            return
+        # Restores compare against config widths in virtual 96-DPI pixels,
+        # like the automation threads that scheduled them
+        try:
+            ctypes.windll.user32.SetThreadDpiAwarenessContext(ctypes.c_void_p(-1))
+        except Exception:
+            pass
+        try:
+            pending[1]()
+        except Exception as e:
+            print(f"⚠️  Deferred restore of HWND={hwnd} failed: {e}")
+
+    def flush(self):
+        """Run every pending restore now"""
+        with self._lock:
+            hwnds = list(self.pending)
+        for hwnd in hwnds:
+            with self._lock:
+                pending = self.pending.get(hwnd)
+            if pending:
+                pending[0].cancel()
+                self._run_restore(hwnd)
+
+
+_geometry_cache = None
+_geometry_cache_lock = threading.Lock()
+
+
+def get_geometry_cache():
+    """The process-wide GeometryCache"""
+    global _geometry_cache
+    if _geometry_cache is None:
+        with _geometry_cache_lock:
+            if _geometry_cache is None:
+                _geometry_cache = GeometryCache()
+                atexit.register(_geometry_cache.flush)
+    return _geometry_cache
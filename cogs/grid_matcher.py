@@ -0,0 +1,233 @@
+import cv2
+import numpy as np
+
+from cogs.capture_backend import clip_rect
+
+GRID_KEYS = ['11', '12', '13', '21', '22', '23', '31', '32', '33']
+
+
+class ScaledTemplate:
+    """Grayscale template with an optional coarse-to-fine matching scale
+
+    With scale < 1 the search region and template are first matched
+    downscaled by that factor; the full-resolution template is then matched
+    only in a small window around the best coarse candidate. scale = 1.0
+    matches at full resolution, exactly like a plain matchTemplate.
+    """
+
+    # Coarse templates smaller than this are too blurry to locate anything
+    MIN_COARSE_SIZE = 6
+
+    def __init__(self, image, scale=1.0):
+        """
+        Args:
+            image: Grayscale template image
+            scale: Coarse matching scale (e.g. 0.5 or 0.25; 1.0 = off)
+        """
+        self.image = image
+        self.height, self.width = image.shape[:2]
+        self.scale = 1.0
+        self.coarse = None
+
+        if 0 < scale < 1:
+            coarse_w = int(round(self.width * scale))
+            coarse_h = int(round(self.height * scale))
+            if min(coarse_w, coarse_h) >= self.MIN_COARSE_SIZE:
+                self.scale = scale
+                self.coarse = cv2.resize(image, (coarse_w, coarse_h), interpolation=cv2.INTER_AREA)
+
+    @property
+    def shape(self):
+        return self.image.shape
+
+    def match(self, region_gray):
+        """Best TM_CCOEFF_NORMED score of the template inside region_gray
+
+        Returns:
+            tuple: (max_val, (x, y)) with the top-left of the best match in
+            region coordinates; (0.0, None) if the region is too small
+        """
+        rh, rw = region_gray.shape[:2]
+        if rh < self.height or rw < self.width:
+            return 0.0, None
+
+        if self.coarse is None:
+            return self._match_full(region_gray, 0, 0)
+
+        small = cv2.resize(region_gray, (int(rw * self.scale), int(rh * self.scale)),
+                           interpolation=cv2.INTER_AREA)
+        ch, cw = self.coarse.shape[:2]
+        if small.shape[0] < ch or small.shape[1] < cw:
+            return self._match_full(region_gray, 0, 0)
+
+        result = cv2.matchTemplate(small, self.coarse, cv2.TM_CCOEFF_NORMED)
+        _, _, _, (cx, cy) = cv2.minMaxLoc(result)
+
+        # Confirm at full resolution within one coarse pixel (plus rounding)
+        pad = int(np.ceil(1 / self.scale)) + 1
+        x1 = max(0, int(cx / self.scale) - pad)
+        y1 = max(0, int(cy / self.scale) - pad)
+        x2 = min(rw, int(cx / self.scale) + self.width + pad)
+        y2 = min(rh, int(cy / self.scale) + self.height + pad)
+        return self._match_full(region_gray[y1:y2, x1:x2], x1, y1)
+
+    def _match_full(self, region_gray, offset_x, offset_y):
+        result = cv2.matchTemplate(region_gray, self.image, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, (x, y) = cv2.minMaxLoc(result)
+        return max_val, (x + offset_x, y + offset_y)
+
+
+class GridResult:
+    """State of the 3x3 Realm Raid grid
+
+    ``states`` and ``confidences`` are 3x3 arrays indexed [row-1][col-1].
+    A cell state is the first template that matched in priority order
+    ('ko', 'fail', 'froglet') or 'available'; its confidence is that
+    template's score (or the best score seen when nothing matched).
+    """
+
+    def __init__(self):
+        self.states = np.full((3, 3), 'available', dtype=object)
+        self.confidences = np.zeros((3, 3), dtype=np.float32)
+
+    @staticmethod
+    def _index(key):
+        return int(key[0]) - 1, int(key[1]) - 1
+
+    def set(self, key, state, confidence):
+        row, col = self._index(key)
+        self.states[row, col] = state
+        self.confidences[row, col] = confidence
+
+    def state(self, key):
+        row, col = self._index(key)
+        return self.states[row, col]
+
+    def confidence(self, key):
+        row, col = self._index(key)
+        return float(self.confidences[row, col])
+
+    def keys_with(self, state):
+        """Grid keys (in reading order) whose state equals state"""
+        return [key for key in GRID_KEYS if self.state(key) == state]
+
+
+class GridMatcher:
+    """Classifies the nine grid cells against the templates
+
+    Built once from the loaded grayscale templates and shared by
+    check_initial_grid and the detection pool workers. Each cell gets one
+    search box covering every template's search area, so a scan captures
+    and converts each cell to grayscale once, then matches each template
+    in priority order, stopping at the first match. The matchTemplate
+    work is the same as matching template by template. Templates with a
+    scale below 1 are matched coarse-to-fine (see ScaledTemplate).
+    """
+
+    PRIORITY = ('ko', 'fail', 'froglet')
+    DEFAULT_THRESHOLDS = {'ko': 0.75, 'fail': 0.85, 'froglet': 0.75}
+
+    def __init__(self, templates, cell_coords, thresholds=None, priority=PRIORITY,
+                 search_radius=100, scales=None):
+        """
+        Args:
+            templates: dict of template key → grayscale template image
+            cell_coords: dict of grid key ('11'..'33') → (x, y) cell centre
+            thresholds: dict of template key → match threshold
+            priority: Template keys in the order they are tried per cell
+            search_radius: Half-size of the search box around each cell
+            scales: dict of template key → coarse-to-fine scale (1.0 = off)
+        """
+        scales = scales or {}
+        self.templates = templates
+        self.scaled = {key: ScaledTemplate(image, scales.get(key, 1.0))
+                       for key, image in templates.items()}
+        self.cell_coords = dict(cell_coords)
+        self.thresholds = dict(self.DEFAULT_THRESHOLDS)
+        self.thresholds.update(thresholds or {})
+        self.priority = [key for key in priority if key in templates]
+        self.search_radius = search_radius
+
+        # Per cell: union search box plus each template's own box inside it
+        self.cell_rects = {}
+        self.template_rects = {}
+        for key, (x, y) in self.cell_coords.items():
+            rects = {t: self.search_rect(x, y, templates[t]) for t in self.priority}
+            x1 = min(r[0] for r in rects.values())
+            y1 = min(r[1] for r in rects.values())
+            x2 = max(r[0] + r[2] for r in rects.values())
+            y2 = max(r[1] + r[3] for r in rects.values())
+            self.cell_rects[key] = (x1, y1, x2 - x1, y2 - y1)
+            self.template_rects[key] = rects
+
+    def search_rect(self, x, y, template):
+        """(x, y, width, height) search box for template around (x, y)"""
+        th, tw = template.shape[:2]
+        capture_w = max(tw + 40, self.search_radius * 2)
+        capture_h = max(th + 40, self.search_radius * 2)
+        return x - capture_w // 2, y - capture_h // 2, capture_w, capture_h
+
+    def rects(self):
+        """Cell search boxes in grid order, for batched region capture"""
+        return [self.cell_rects[key] for key in self.cell_coords]
+
+    def _template_view(self, cell_gray, origin, rect):
+        """Slice a template's search box out of a cell region captured at origin"""
+        ox, oy = origin
+        x, y, w, h = rect
+        x1 = max(0, x) - ox
+        y1 = max(0, y) - oy
+        x2 = max(0, x + w) - ox
+        y2 = max(0, y + h) - oy
+        return cell_gray[max(0, y1):max(0, y2), max(0, x1):max(0, x2)]
+
+    def match_cell(self, key, cell_gray, origin):
+        """Classify one cell region (grayscale, captured with top-left at origin)
+
+        Returns:
+            tuple: (state, confidence)
+        """
+        best = 0.0
+        for template_key in self.priority:
+            region = self._template_view(cell_gray, origin, self.template_rects[key][template_key])
+            max_val, _ = self.scaled[template_key].match(region)
+            if max_val >= self.thresholds[template_key]:
+                return template_key, max_val
+            best = max(best, max_val)
+        return 'available', best
+
+    def classify_regions(self, regions):
+        """Classify cells from regions captured at self.rects()
+
+        Args:
+            regions: BGR or grayscale images, one per cell in rects() order
+
+        Returns:
+            GridResult: 3x3 states and confidences
+        """
+        result = GridResult()
+        for key, region in zip(self.cell_coords, regions):
+            if region is None or region.size == 0:
+                continue
+            gray = region if region.ndim == 2 else cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
+            x, y, _, _ = self.cell_rects[key]
+            state, confidence = self.match_cell(key, gray, (max(0, x), max(0, y)))
+            result.set(key, state, confidence)
+        return result
+
+    def classify_frame(self, frame):
+        """Classify all cells from one full client frame
+
+        Args:
+            frame: BGR or grayscale client image; only the cell search boxes
+                are converted to grayscale, once each
+
+        Returns:
+            GridResult: 3x3 states and confidences
+        """
+        h, w = frame.shape[:2]
+        regions = []
+        for x, y, width, height in self.rects():
+            x1, y1, x2, y2 = clip_rect(x, y, width, height, w, h)
+            regions.append(frame[y1:y2, x1:x2])
+        return self.classify_regions(regions)
@@ -0,0 +1,148 @@
+import collections
+import itertools
+import threading
+import time
+
+# Event kinds written by the automation
+MATCH = 'match'        # value: match duration in seconds
+CAPTURE = 'capture'    # value: 1 per capture call
+DETECT = 'detect'      # value: grid scan latency in seconds
+SLEEP = 'sleep'        # value: seconds the client asked to sleep
+
+
+class MetricsRing:
+    """Bounded ring of (seq, time, hwnd, kind, value) events
+
+    Writers never lock: each push takes the next sequence number from an
+    itertools.count (atomic in CPython) and stores one tuple into its slot,
+    a single list assignment. The reader copies the slots and keeps the
+    events newer than its cursor, so a slow reader never blocks a writer;
+    if it falls more than capacity events behind, the oldest are
+    overwritten and reported as dropped. An event whose slot is still being
+    written while the reader copies may be skipped; that is fine for
+    display figures.
+    """
+
+    def __init__(self, capacity=8192):
+        """
+        Args:
+            capacity: Events kept before the oldest are overwritten
+        """
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._counter = itertools.count()
+
+    def push(self, hwnd, kind, value=1):
+        """Record one event (safe from any thread, never blocks)"""
+        seq = next(self._counter)
+        self._slots[seq % self.capacity] = (seq, time.monotonic(), hwnd, kind, value)
+
+    def read(self, cursor=0):
+        """Events with seq >= cursor, oldest first
+
+        Returns:
+            tuple: (events, next cursor, events lost to overwriting)
+        """
+        events = sorted(event for event in list(self._slots) if event is not None and event[0] >= cursor)
+        if not events:
+            return [], cursor, 0
+        return events, events[-1][0] + 1, events[0][0] - cursor
+
+
+_metrics_ring = None
+_metrics_ring_lock = threading.Lock()
+
+
+def get_metrics_ring():
+    """The process-wide MetricsRing every automation writes to"""
+    global _metrics_ring
+    if _metrics_ring is None:
+        with _metrics_ring_lock:
+            if _metrics_ring is None:
+                _metrics_ring = MetricsRing()
+    return _metrics_ring
+
+
+class ClientMetrics:
+    """Rolling per-client figures built from ring events"""
+
+    RECENT = 20            # matches / scans averaged
+    RATE_WINDOW = 5.0      # seconds of captures counted for fps
+
+    def __init__(self, hwnd, now):
+        self.hwnd = hwnd
+        self.first_seen = now
+        self.last_seen = now
+        self.matches = 0
+        self.match_durations = collections.deque(maxlen=self.RECENT)
+        self.detect_latencies = collections.deque(maxlen=self.RECENT)
+        self.captures = collections.deque()
+        self.sleep_seconds = 0.0
+
+    def add(self, timestamp, kind, value):
+        self.last_seen = timestamp
+        if kind == MATCH:
+            self.matches += 1
+            self.match_durations.append(value)
+        elif kind == CAPTURE:
+            self.captures.append(timestamp)
+        elif kind == DETECT:
+            self.detect_latencies.append(value)
+        elif kind == SLEEP:
+            self.sleep_seconds += value
+
+    def row(self, now):
+        """Display figures for this client"""
+        while self.captures and self.captures[0] < now - self.RATE_WINDOW:
+            self.captures.popleft()
+        elapsed = max(now - self.first_seen, 1e-6)
+        return {
+            'hwnd': self.hwnd,
+            'matches': self.matches,
+            'matches_per_hour': self.matches * 3600.0 / elapsed,
+            'avg_match_s': (sum(self.match_durations) / len(self.match_durations)
+                            if self.match_durations else 0.0),
+            'capture_fps': len(self.captures) / min(self.RATE_WINDOW, elapsed),
+            'detect_ms': (sum(self.detect_latencies) / len(self.detect_latencies) * 1000
+                          if self.detect_latencies else 0.0),
+            'sleep_pct': min(100.0, 100.0 * self.sleep_seconds / elapsed),
+            'idle_s': now - self.last_seen,
+        }
+
+
+class MetricsAggregator:
+    """Reader side of a MetricsRing: turns events into per-client rows
+
+    Meant to be polled from one thread (the Tk loop) with update().
+    """
+
+    def __init__(self, ring=None):
+        self.ring = ring or get_metrics_ring()
+        self.cursor = 0
+        self.dropped = 0
+        self.clients = {}
+
+    def update(self):
+        """Consume new events
+
+        Returns:
+            int: Number of events read
+        """
+        events, self.cursor, dropped = self.ring.read(self.cursor)
+        self.dropped += dropped
+        for _, timestamp, hwnd, kind, value in events:
+            client = self.clients.get(hwnd)
+            if client is None:
+                client = self.clients[hwnd] = ClientMetrics(hwnd, timestamp)
+            client.add(timestamp, kind, value)
+        return len(events)
+
+    def rows(self):
+        """Per-client figures, one dict per client seen so far"""
+        now = time.monotonic()
+        return [client.row(now) for client in self.clients.values()]
+
+    def reset(self):
+        """Forget every client (events already read stay consumed)"""
+        self.clients.clear()
+        self.dropped = 0
@@ -3,14 +3,21 @@ import time
 import configparser
 import ctypes
 from ctypes import wintypes
-import win32gui
-import win32ui
-import win32api
-import win32con
 import cv2
 import numpy as np
 import os
-from ctypes import windll
+from cogs.frame_cache import FrameCache
+from cogs.capture_backend import GdiCaptureBackend
+from cogs.pixel_sampler import PixelSampler
+from cogs.color_palette import ColorPalette
+from cogs.grid_matcher import GridMatcher
+from cogs.template_registry import get_template_registry
+from cogs.region_watch import region_signature, signatures_differ
+from cogs.timing_profile import TimingProfile, client_key
+from cogs.stage_timer import StageTimer
+from cogs import metrics_ring
+from cogs.geometry_cache import get_geometry_cache, read_geometry
+from cogs.resize_engine import ResizeEngine
 
 # Global control flags
 _rr_running = False
@@ -18,12 +25,15 @@ _rr_thread = None
 _rr_automation_instance = None
 _rr_stop_event = threading.Event()
 
-# Windows API setup
-user32 = ctypes.windll.user32
-gdi32 = ctypes.windll.gdi32
+# Windows API setup (absent off Windows, where only replay backends run)
+_windll = getattr(ctypes, 'windll', None)
+user32 = _windll.user32 if _windll else None
+gdi32 = _windll.gdi32 if _windll else None
 
 class RealmRaidAutomation:
     # ==================== TIMING CONFIGURATION ====================
+    # Waits that follow a click are upper bounds: wait_for_probe() returns
+    # as soon as the expected state is on screen
     CLICK_DELAY = 0.05
     EXPANSION_WAIT = 1.0
     JOIN_WAIT = 1.0
@@ -40,21 +50,45 @@ class RealmRaidAutomation:
     FROGLET_CLICK_DELAY = 0.2
     FROGLET_CLICK_COUNT = 3
     FROGLET_LOAD_TIME = 2.0
+    WAIT_POLL_INTERVAL = 0.05
+    # Unchanged polls between forced repaints of a watched region
+    WAIT_REFRESH_POLLS = 10
+    DETECTION_POLL_INTERVAL = 0.005
+    PROBE_WATCH_RADIUS = 8
+    # After a resize, frames are compared until the UI stops changing
+    # (bounded by the fixed 2s wait this replaced)
+    RENDER_STABLE_INTERVAL = 0.1
+    RENDER_STABLE_FRAMES = 3
+    RENDER_STABLE_TIMEOUT = 2.0
     # ==============================================================
     
-    def __init__(self, log_func, config_path, coords_path, target_hwnd, ref_path):
+    # Learned transition latencies, stored next to config.ini
+    TIMING_PROFILE_FILE = 'timing_profile.json'
+    # Transitions where a timeout means "slow client", so it counts as a sample
+    # (a join or confirm that never changes means no tickets / cooldown instead)
+    TIMEOUT_SAMPLE_TRANSITIONS = ('expand', 'lobby_return', 'refresh')
+    
+    def __init__(self, log_func, config_path, coords_path, target_hwnd, ref_path, capture_backend=None,
+                 stop_event=None):
         """
         Args:
             log_func: Logging function
             config_path: Path to config.ini
             coords_path: Path to coords.ini
             target_hwnd: The HWND of the specific window to automate (integer)
+            capture_backend: CaptureBackend to read frames from (defaults to live GDI)
+            stop_event: threading.Event that stops this instance (defaults to the
+                single-RR event; RR-All passes one event per window)
         """
         self.log_func = log_func
         self.config_path = config_path
         self.coords_path = coords_path
         self.target_hwnd = target_hwnd
         self.ref_path = ref_path
+        self.capture_backend = capture_backend or GdiCaptureBackend()
+        self.stop_event = stop_event or _rr_stop_event
+        # Optional DetectionPool (set by RR-All) that classifies frames in worker processes
+        self.detection_pool = None
         self.running = False
         
         # Initialize templates dict FIRST
@@ -63,6 +97,11 @@ class RealmRaidAutomation:
         # Load configuration
         self.load_config()
         
+        # Per-stage latency histograms (no-ops unless [GLOBAL] stage_timing = true)
+        self.timer = StageTimer(self.stage_timing)
+        # Live per-client figures for the GUI metrics tab (lock-free writes)
+        self.metrics = metrics_ring.get_metrics_ring()
+        
         # Match tracking
         self.ko_matches = []
         self.fail_matches = []
@@ -78,9 +117,32 @@ class RealmRaidAutomation:
         self.original_window_width = None
         self.original_window_height = None
         self.hwnd_for_resize = None
+        # Verified sizes and deferred restores shared by every run
+        self.geometry = get_geometry_cache()
+        self.resize_engine = None
+        
+        # One capture per scan tick, shared by all detectors and pixel probes
+        self.frame_cache = FrameCache(self.capture_full_window, self.capture_regions)
+        
+        # Named probe points read in batches (one refresh wait per batch)
+        self.pixel_sampler = PixelSampler(self.capture_backend, self.probe_points)
+        
+        # Per-client wait budgets learned from previous runs
+        profile_key = client_key(target_hwnd) if self.capture_backend.is_live else self.capture_backend.name
+        self.timing = TimingProfile(
+            os.path.join(os.path.dirname(os.path.abspath(config_path)), self.TIMING_PROFILE_FILE),
+            profile_key
+        )
         
         # Load template images
         self.load_templates()
+        
+        # Grid classifier built once from the loaded templates
+        self.grid_matcher = GridMatcher(
+            self.templates,
+            {key: pos['coord_1'] for key, pos in self.grid_positions.items()},
+            scales=self.template_scales
+        )
     
     def log(self, message, tag='system'):
         """Log to both GUI and console"""
@@ -88,7 +150,7 @@ class RealmRaidAutomation:
         self.log_func(message, tag)
     
     def load_templates(self):
-        """Load template images for detection - UNICODE PATH SAFE"""
+        """Load template images for detection from the shared template registry"""
         template_dir = self.ref_path
         
         print(f"\n📂 Loading template images from: {template_dir}")
@@ -113,6 +175,8 @@ class RealmRaidAutomation:
         }
         
         missing_files = []
+        registry = get_template_registry()
+        decoded = 0
         
         for key, filename in templates.items():
             filepath = os.path.join(template_dir, filename)
@@ -123,33 +187,14 @@ class RealmRaidAutomation:
                 continue
             
             try:
-                # UNICODE-SAFE IMAGE LOADING
-                # cv2.imread() fails silently with non-ASCII paths (Chinese, etc.)
-                # Use numpy buffer method instead
-                print(f"\n  Loading '{key}' ({filename})...")
-                
-                # Read file as binary (Python handles Unicode paths correctly)
-                with open(filepath, 'rb') as f:
-                    file_data = f.read()
-                
-                print(f"    ✓ Read {len(file_data)} bytes from disk")
-                
-                # Convert to numpy array
-                np_arr = np.frombuffer(file_data, np.uint8)
-                
-                # Decode with OpenCV (works because using buffer, not path)
-                template = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-                
-                if template is None:
-                    print(f"    ❌ cv2.imdecode() returned None")
-                    print(f"    File may be corrupted or not a valid PNG")
-                    self.log(f"ERROR: Failed to decode template: {filepath}", 'error')
-                    raise ValueError(f"Failed to decode template: {filepath}")
-                
-                # Convert to grayscale for template matching
-                self.templates[key] = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-                h, w = self.templates[key].shape[:2]
-                print(f"    ✓ Loaded successfully: {w}x{h} pixels")
+                # Decoded once per process and shared read-only by every
+                # instance; re-decoded only when the file changes on disk
+                loads_before = registry.loads
+                self.templates[key] = registry.get(filepath)
+                if registry.loads > loads_before:
+                    decoded += 1
+                    h, w = self.templates[key].shape[:2]
+                    print(f"  ✓ Decoded '{key}' ({filename}): {w}x{h} pixels")
                 
             except Exception as e:
                 print(f"  ❌ Error loading {filepath}")
@@ -167,62 +212,41 @@ class RealmRaidAutomation:
             self.log(f"ERROR: {error_msg}", 'error')
             raise FileNotFoundError(error_msg)
         
-        print(f"\n✅ Successfully loaded {len(self.templates)} template images")
+        print(f"✅ {len(self.templates)} template images ready "
+              f"({decoded} decoded, {len(self.templates) - decoded} shared)")
         self.log(f"Loaded {len(self.templates)} template images", 'success')
     
     def capture_full_window(self, hwnd):
-        """Capture the entire window - NON-INTRUSIVE"""
-        try:
-            left, top, right, bot = win32gui.GetClientRect(hwnd)
-            width = right - left
-            height = bot - top
-            
-            hwnd_dc = win32gui.GetWindowDC(hwnd)
-            mfc_dc = win32ui.CreateDCFromHandle(hwnd_dc)
-            save_dc = mfc_dc.CreateCompatibleDC()
-            
-            bitmap = win32ui.CreateBitmap()
-            bitmap.CreateCompatibleBitmap(mfc_dc, width, height)
-            save_dc.SelectObject(bitmap)
-            
-            result = windll.user32.PrintWindow(hwnd, save_dc.GetSafeHdc(), 3)
-            
-            bmpstr = bitmap.GetBitmapBits(True)
-            img = np.frombuffer(bmpstr, dtype=np.uint8).reshape((height, width, 4))
-            
-            win32gui.DeleteObject(bitmap.GetHandle())
-            save_dc.DeleteDC()
-            mfc_dc.DeleteDC()
-            win32gui.ReleaseDC(hwnd, hwnd_dc)
-            
-            img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-            return img
-            
-        except Exception as e:
-            print(f"  ❌ Error capturing full window: {e}")
-            return None
+        """Capture the entire window through the capture backend"""
+        self.metrics.push(hwnd, metrics_ring.CAPTURE)
+        with self.timer.stage('capture_full_window'):
+            return self.capture_backend.capture_frame(hwnd)
+    
+    def capture_regions(self, hwnd, rects):
+        """Capture several client rectangles through the capture backend"""
+        self.metrics.push(hwnd, metrics_ring.CAPTURE)
+        with self.timer.stage('capture_regions'):
+            return self.capture_backend.capture_regions(hwnd, rects)
     
     def capture_window_region(self, hwnd, x, y, width, height):
-        """Capture a specific region of the window"""
+        """Capture a specific region of the window (only that rectangle is transferred)"""
         try:
-            full_img = self.capture_full_window(hwnd)
-            if full_img is None:
-                return None
-            
-            h, w = full_img.shape[:2]
-            
-            x1 = max(0, min(x, w))
-            y1 = max(0, min(y, h))
-            x2 = max(0, min(x + width, w))
-            y2 = max(0, min(y + height, h))
-            
-            region = full_img[y1:y2, x1:x2]
-            return region
+            return self.frame_cache.get_region(hwnd, x, y, width, height)
             
         except Exception as e:
             print(f"  ❌ Error capturing region: {e}")
             return None
     
+    def template_search_rect(self, x, y, template_key, search_radius=100):
+        """Get the (x, y, width, height) capture box used to find a template near a coordinate"""
+        th, tw = self.templates[template_key].shape[:2]
+        
+        capture_w = max(tw + 40, search_radius * 2)
+        capture_h = max(th + 40, search_radius * 2)
+        capture_x = x - capture_w // 2
+        capture_y = y - capture_h // 2
+        return capture_x, capture_y, capture_w, capture_h
+    
     def detect_template_near_coord(self, hwnd, x, y, template_key, search_radius=100, threshold=0.75):
         """Detect if a template matches near a coordinate"""
         try:
@@ -230,47 +254,165 @@ class RealmRaidAutomation:
             if template is None:
                 print(f"  ❌ Template '{template_key}' not loaded")
                 return False, 0.0
-            
-            th, tw = template.shape[:2]
-            
-            capture_w = max(tw + 40, search_radius * 2)
-            capture_h = max(th + 40, search_radius * 2)
-            capture_x = x - capture_w // 2
-            capture_y = y - capture_h // 2
-            
+        
+            capture_x, capture_y, capture_w, capture_h = self.template_search_rect(x, y, template_key, search_radius)
+        
             region = self.capture_window_region(hwnd, capture_x, capture_y, capture_w, capture_h)
             if region is None:
                 return False, 0.0
-            
+        
             region_gray = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
-            
-            result = cv2.matchTemplate(region_gray, template, cv2.TM_CCOEFF_NORMED)
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-            
+        
+            max_val, max_loc = self.grid_matcher.scaled[template_key].match(region_gray)
+        
             matched = max_val >= threshold
-            
+        
             if matched:
                 print(f"    ✓ '{template_key}' matched (confidence: {max_val:.3f})")
             else:
                 print(f"    ○ '{template_key}' not matched (confidence: {max_val:.3f} < {threshold})")
-            
+        
             return matched, max_val
-            
+        
         except Exception as e:
             print(f"  ❌ Error in template detection: {e}")
             return False, 0.0
     
+    def drive(self, steps):
+        """Run a step generator on the calling thread
+        
+        State-machine methods are generators that yield the wall-clock
+        seconds they want to sleep. This driver sleeps with
+        threading.Event.wait() so Stop takes effect immediately; the
+        single-threaded scheduler (cogs/rr_scheduler.py) drives the same
+        generators for many clients at once.
+        
+        Returns:
+            The generator's return value
+        """
+        try:
+            delay = next(steps)
+            while True:
+                # wait() returns True if the event was set (stop requested)
+                if self.stop_event.wait(delay) and self.running:
+                    print(f"[STOP] Stop detected in sleep!")
+                    self.running = False
+                delay = steps.send(None)
+        except StopIteration as done:
+            return done.value
+    
     def interruptible_sleep(self, seconds):
-        """Sleep that can be interrupted by stop signal.
-        Uses threading.Event.wait() so Stop takes effect immediately."""
-        # wait() returns True if the event was set (stop requested),
-        # False if the timeout elapsed normally.
-        if _rr_stop_event.wait(seconds):
-            print(f"[STOP] Stop detected in sleep!")
-            return False
-        if not self.running:
-            return False
-        return True
+        """Sleep that can be interrupted by stop signal (step generator)
+        
+        Returns:
+            bool: False if the automation was stopped while sleeping
+        """
+        # The screen is expected to change while we sleep
+        self.frame_cache.invalidate()
+        delay = self.capture_backend.scale_delay(seconds)
+        self.metrics.push(self.target_hwnd, metrics_ring.SLEEP, delay)
+        with self.timer.stage('interruptible_sleep'):
+            yield delay
+        return self.running
+    
+    def wait_until_region(self, hwnd, rect, predicate, timeout):
+        """Poll a client rectangle until predicate(region) returns a truthy value (step generator)
+        
+        The rectangle is re-captured every WAIT_POLL_INTERVAL, but predicate
+        only runs when the region's downsampled signature moved since it last
+        ran, so an unchanged screen costs one small blit per poll. The region
+        is repainted before the first read and again after every
+        WAIT_REFRESH_POLLS unchanged polls, so an occluded or just-restored
+        client cannot keep serving a stale surface.
+        
+        Returns:
+            The predicate's value, or None on timeout or stop
+        """
+        deadline = time.monotonic() + self.capture_backend.scale_delay(timeout)
+        poll = self.capture_backend.scale_delay(self.WAIT_POLL_INTERVAL)
+        x, y, width, height = rect
+        corners = [(x, y), (x + width - 1, y + height - 1)]
+        checked = None
+        unchanged = self.WAIT_REFRESH_POLLS
+        
+        while self.running:
+            if unchanged >= self.WAIT_REFRESH_POLLS:
+                unchanged = 0
+                repaint = self.capture_backend.refresh_points(hwnd, corners)
+                if repaint:
+                    self.metrics.push(hwnd, metrics_ring.SLEEP, repaint)
+                    yield repaint
+                    if not self.running:
+                        break
+            
+            with self.timer.stage('wait_poll'):
+                self.frame_cache.invalidate(hwnd)
+                region = self.frame_cache.get_region(hwnd, *rect)
+                result = None
+                unchanged += 1
+                if region is not None and region.size:
+                    signature = region_signature(region)
+                    if signatures_differ(checked, signature):
+                        checked = signature
+                        unchanged = 0
+                        result = predicate(region)
+            if result:
+                return result
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            delay = min(poll, remaining)
+            self.metrics.push(hwnd, metrics_ring.SLEEP, delay)
+            yield delay
+        return None
+    
+    def probe_rect(self, name):
+        """Small (x, y, width, height) box centred on a probe point"""
+        x, y = self.probe_points[name]
+        r = self.PROBE_WATCH_RADIUS
+        return x - r, y - r, 2 * r + 1, 2 * r + 1
+    
+    def wait_for_probe(self, hwnd, name, labels, timeout, present=True, transition=None):
+        """Wait until a probe's color label is (or is no longer) one of labels (step generator)
+        
+        Args:
+            hwnd: Window handle
+            name: Probe point name
+            labels: Palette labels to wait for
+            timeout: Upper bound in automation seconds (one of the constants above)
+            present: Wait for the label to be in labels (True) or to leave them (False)
+            transition: TimingProfile transition name; its learned budget
+                replaces timeout and the observed latency is recorded
+        
+        Returns:
+            tuple: (condition met, last label seen); check self.running for stop
+        """
+        if transition:
+            timeout = self.timing.budget(transition, timeout)
+        
+        px, py = self.probe_points[name]
+        x, y, _, _ = self.probe_rect(name)
+        offset_x, offset_y = px - max(0, x), py - max(0, y)
+        seen = {'label': None}
+        
+        def probe_condition(region):
+            if offset_y >= region.shape[0] or offset_x >= region.shape[1]:
+                return False
+            b, g, r = region[offset_y, offset_x]
+            seen['label'] = self.palette.classify_one((int(r), int(g), int(b)))
+            return (seen['label'] in labels) == present
+        
+        start = time.monotonic()
+        met = bool((yield from self.wait_until_region(hwnd, self.probe_rect(name), probe_condition, timeout)))
+        elapsed = time.monotonic() - start
+        print(f"   ⏱ {name}: {seen['label']} after {elapsed:.2f}s"
+              f"{'' if met else f' (timeout {timeout:.2f}s)'}")
+        
+        if transition and self.running and (met or transition in self.TIMEOUT_SAMPLE_TRANSITIONS):
+            # Store automation seconds so replay speed does not skew the profile
+            self.timing.record(transition, elapsed / self.capture_backend.scale_delay(1.0))
+        return met, seen['label']
     
     def load_config(self):
         """Load coordinates and colors from coords.ini"""
@@ -283,6 +425,10 @@ class RealmRaidAutomation:
         
         global_section = config['GLOBAL']
         self.target_restore_width = int(global_section.get('width', self.reference_width))
+        self.stage_timing = global_section.getboolean('stage_timing', False)
+        # Seconds a finished run waits before restoring the window size, so a
+        # run restarted on the same window meanwhile can skip the resize
+        self.restore_grace = global_section.getfloat('restore_grace', 0.0)
         
         print(f"\n📐 Reference Resolution: {self.reference_width}x{self.reference_height}")
         print(f"📐 Restore Target Width: {self.target_restore_width}")
@@ -301,6 +447,17 @@ class RealmRaidAutomation:
         self.color_fail = self.hex_to_rgb(rr['fail_color'])
         self.color_success = self.hex_to_rgb(rr['success_color'])
         
+        # Every *_color key, classified in one vectorized pass per sample batch
+        self.palette = ColorPalette.from_config(rr)
+        
+        # Coarse-to-fine matching scale per template (1.0 = full resolution only)
+        self.template_scales = {
+            key: float(rr.get(f'{key}_scale', 1.0)) for key in ('ko', 'fail', 'froglet')
+        }
+        scaled = {key: scale for key, scale in self.template_scales.items() if scale != 1.0}
+        if scaled:
+            print(f"🔎 Coarse-to-fine template scales: {scaled}")
+        
         self.grid_positions = {}
         for row in range(1, 4):
             for col in range(1, 4):
@@ -317,6 +474,15 @@ class RealmRaidAutomation:
         solo = cfg['SOLO']
         self.coord_froglet_click = self.parse_coord(solo['click_solo'])
         print(f"📍 Froglet click coordinate: {self.coord_froglet_click}")
+        
+        # Pixel probe points sampled by the state machine
+        self.probe_points = {
+            'check_end': self.coord_check_end,
+            'click_refresh': self.coord_click_refresh,
+            'click_confirm': self.coord_click_confirm,
+        }
+        for key, coords in self.grid_positions.items():
+            self.probe_points[f'join_{key}'] = coords['coord_2']
     
     def hex_to_rgb(self, hex_str):
         """Convert hex color string to RGB tuple"""
@@ -328,61 +494,74 @@ class RealmRaidAutomation:
         parts = coord_str.split(',')
         return (int(parts[0].strip()), int(parts[1].strip()))
     
-    def get_pixel_color(self, hwnd, client_x, client_y, force_refresh=True):
-        """Get pixel color from a window's client area using BitBlt"""
-        CAPTUREBLT = 0x40000000
-
-        if force_refresh:
-            rect = wintypes.RECT()
-            rect.left = client_x - 5
-            rect.top = client_y - 5
-            rect.right = client_x + 5
-            rect.bottom = client_y + 5
-            user32.InvalidateRect(hwnd, ctypes.byref(rect), False)
-            user32.UpdateWindow(hwnd)
-            time.sleep(0.05)
-
-        hdc_window = user32.GetDC(hwnd)
-        if not hdc_window:
-            self.log("Failed to get DC for window", "error")
-            return None
-
-        hdc_mem = gdi32.CreateCompatibleDC(hdc_window)
-        if not hdc_mem:
-            user32.ReleaseDC(hwnd, hdc_window)
-            self.log("Failed to create compatible DC", "error")
-            return None
-
-        hbm = gdi32.CreateCompatibleBitmap(hdc_window, 1, 1)
-        if not hbm:
-            gdi32.DeleteDC(hdc_mem)
-            user32.ReleaseDC(hwnd, hdc_window)
-            self.log("Failed to create compatible bitmap", "error")
+    def sample_probes(self, hwnd, names, force_refresh=True):
+        """Read several named probe points with one capture
+        
+        Reads from the cached frame instead when one is still valid.
+        
+        Returns:
+            PixelSamples: colors per probe name, or None on error
+        """
+        with self.timer.stage('sample_probes'):
+            frame = self.frame_cache.peek(hwnd)
+            samples = None
+            if frame is not None:
+                samples = self.pixel_sampler.sample_frame(frame, names)
+                if samples is not None:
+                    self.frame_cache.captures_saved += 1
+            
+            source = 'Cached' if samples is not None else self.capture_backend.name
+            if samples is None:
+                samples = self.pixel_sampler.sample(hwnd, names, force_refresh)
+        if samples is None:
+            self.log(f"Failed to read probe pixels: {', '.join(names)}", "error")
             return None
-
-        gdi32.SelectObject(hdc_mem, hbm)
-
-        success = gdi32.BitBlt(
-            hdc_mem, 0, 0, 1, 1, 
-            hdc_window, client_x, client_y, 
-            win32con.SRCCOPY | CAPTUREBLT
-        )
         
-        if not success:
-            self.log(f"BitBlt failed at ({client_x},{client_y})", "error")
-
-        pixel = gdi32.GetPixel(hdc_mem, 0, 0)
-        r = pixel & 0xFF
-        g = (pixel >> 8) & 0xFF
-        b = (pixel >> 16) & 0xFF
-        rgb = (r, g, b)
-
-        gdi32.DeleteObject(hbm)
-        gdi32.DeleteDC(hdc_mem)
-        user32.ReleaseDC(hwnd, hdc_window)
-
-        print(f"  🎨 BitBlt color: client({client_x},{client_y}) → RGB{rgb}")
-        return rgb
+        for name in samples.names:
+            x, y = self.pixel_sampler.probes[name]
+            print(f"  🎨 {source} color: {name} client({x},{y}) → RGB{samples[name]}")
+        return samples
+    
+    def probe_color(self, hwnd, name, force_refresh=True):
+        """Read a single named probe point as an RGB tuple (None on error)"""
+        samples = self.sample_probes(hwnd, [name], force_refresh)
+        return samples[name] if samples is not None else None
+    
+    def probe_label(self, hwnd, name, force_refresh=True):
+        """Classify a single named probe point against the palette
+        
+        Returns:
+            str: palette label ('btn', 'cd', 'fail', ...) or None if nothing matches
+        """
+        return self.probe_labels(hwnd, [name], force_refresh)[0]
+    
+    def probe_labels(self, hwnd, names, force_refresh=True):
+        """Read and classify several named probe points with one capture
+        
+        Returns:
+            list: palette label (or None) per name
+        """
+        samples = self.sample_probes(hwnd, names, force_refresh)
+        if samples is None:
+            return [None] * len(names)
+        return self.palette.classify(samples.colors)
+    
+    def fresh_probe_label(self, hwnd, name):
+        """Repaint around a probe, wait for it without blocking, then classify it (step generator)
+        
+        Returns:
+            str: palette label or None (see probe_label)
+        """
+        delay = self.capture_backend.refresh_points(hwnd, [self.pixel_sampler.probes[name]])
+        if delay:
+            yield delay
+        return self.probe_label(hwnd, name, force_refresh=False)
+    
+    def get_pixel_color(self, hwnd, client_x, client_y, force_refresh=True):
+        """Get pixel color at an arbitrary client coordinate (see sample_probes)"""
+        name = f"{client_x},{client_y}"
+        self.pixel_sampler.add_probe(name, (client_x, client_y))
+        return self.probe_color(hwnd, name, force_refresh)
     
     def color_matches(self, color1, color2, tolerance=10):
         """Check if two colors match within tolerance"""
@@ -412,16 +591,89 @@ class RealmRaidAutomation:
         height = rect.bottom - rect.top
         return width, height
     
+    def get_geometry_fingerprint(self, hwnd):
+        """(client_w, client_h, window_w, window_h, dpi, reference_w, reference_h)
+        
+        The reference size is part of the fingerprint so a changed
+        reference.ini never matches a geometry verified for the old one.
+        """
+        geometry = read_geometry(hwnd)
+        if geometry is None:
+            return None
+        return geometry + (self.reference_width, self.reference_height)
+    
+    def wait_for_render_stable(self, hwnd):
+        """Wait until consecutive frames of the client look the same (step generator)
+        
+        Returns:
+            bool: True if the UI settled before RENDER_STABLE_TIMEOUT; check
+            self.running for stop
+        """
+        deadline = time.monotonic() + self.capture_backend.scale_delay(self.RENDER_STABLE_TIMEOUT)
+        interval = self.capture_backend.scale_delay(self.RENDER_STABLE_INTERVAL)
+        expected = (self.reference_height, self.reference_width)
+        previous = None
+        stable = 0
+        while self.running and time.monotonic() < deadline:
+            frame = self.capture_backend.capture_frame(hwnd)
+            if frame is not None and frame.shape[:2] == expected:
+                signature = region_signature(frame, size=16)
+                if previous is not None and not signatures_differ(previous, signature):
+                    stable += 1
+                    if stable >= self.RENDER_STABLE_FRAMES - 1:
+                        return True
+                else:
+                    stable = 0
+                previous = signature
+            self.metrics.push(hwnd, metrics_ring.SLEEP, interval)
+            yield interval
+        return False
+    
+    def get_resize_engine(self):
+        if self.resize_engine is None:
+            self.resize_engine = ResizeEngine(timeout=self.RENDER_STABLE_TIMEOUT)
+        return self.resize_engine
+    
+    def resize_client(self, hwnd, client_width, client_height):
+        """Resize hwnd to a CLIENT size and block until the size settles
+        
+        Only for the restore at the end of a run; inside the run use
+        get_resize_engine().resize_steps() so Stop stays responsive.
+        
+        Returns:
+            ResizeResult: see cogs.resize_engine
+        """
+        return self.get_resize_engine().resize([hwnd], client_width, client_height)[0]
+    
     def resize_window_to_reference(self, hwnd):
-        """Resize window to reference resolution if needed"""
+        """Resize window to reference resolution if needed (step generator)
+        
+        Returns:
+            bool: False if the resize failed or the run was stopped
+        """
         self.hwnd_for_resize = hwnd
         
+        # A restore left pending by the previous run on this window is not needed
+        if self.geometry.cancel_restore(hwnd):
+            print(f"↩️  Cancelled pending size restore from the previous run")
+        
         current_window_width, current_window_height = self.get_window_outer_size(hwnd)
         current_client_width, current_client_height = self.get_window_size(hwnd)
         
         self.original_window_width = current_window_width
         self.original_window_height = current_window_height
         
+        fingerprint = self.get_geometry_fingerprint(hwnd)
+        if self.geometry.is_verified(hwnd, fingerprint):
+            print(f"✓ Geometry unchanged since last verified run "
+                  f"(CLIENT {current_client_width}x{current_client_height}, DPI {fingerprint[4]}) - skipping resize")
+            self.log("Client size unchanged since last run, skipping resize", 'success')
+            return True
+        
+        # Forget the old fingerprint until this run verifies a new one
+        self.geometry.forget(hwnd)
+        reference = (self.reference_width, self.reference_height)
+        
         print(f"\n📐 Window Size Check:")
         print(f"   Current WINDOW size:  {current_window_width}x{current_window_height}")
         print(f"   Current CLIENT size:  {current_client_width}x{current_client_height}")
@@ -432,27 +684,12 @@ class RealmRaidAutomation:
             print(f"\n⚠️  Client width mismatch detected!")
             self.log(f"Client width is {current_client_width}, resizing to {self.reference_width}", 'system')
             
-            # Calculate border sizes
-            border_width = current_window_width - current_client_width
-            border_height = current_window_height - current_client_height
-            
-            # Calculate target WINDOW size to achieve reference CLIENT size
-            target_window_width = self.reference_width + border_width
-            target_window_height = self.reference_height + border_height
-            
-            window_rect = wintypes.RECT()
-            user32.GetWindowRect(hwnd, ctypes.byref(window_rect))
-            
-            success = user32.SetWindowPos(
-                hwnd, 0,
-                window_rect.left, window_rect.top,
-                target_window_width, target_window_height,
-                0x0004
-            )
+            results = yield from self.get_resize_engine().resize_steps([hwnd], *reference)
+            result = results[0]
+            if not self.running:
+                return False
             
-            if success:
-                time.sleep(0.5)
-                
+            if result.issued and not result.error:
                 new_window_width, new_window_height = self.get_window_outer_size(hwnd)
                 new_client_width, new_client_height = self.get_window_size(hwnd)
                 
@@ -462,32 +699,58 @@ class RealmRaidAutomation:
                 self.log(f"Window resized to CLIENT {new_client_width}x{new_client_height}", 'success')
                 
                 print(f"\n⏳ Waiting for game to re-render UI...")
-                self.log("Waiting 1 second for game UI to stabilize", 'system')
-                time.sleep(1.0)
-                
                 user32.InvalidateRect(hwnd, None, True)
                 user32.UpdateWindow(hwnd)
                 gdi32.GdiFlush()
-                time.sleep(0.5)
                 
-                self.log("Game UI re-render complete", 'success')
+                render_start = time.monotonic()
+                rendered = yield from self.wait_for_render_stable(hwnd)
+                if not self.running:
+                    return False
+                if rendered:
+                    self.log(f"Game UI re-render complete ({time.monotonic() - render_start:.1f}s)", 'success')
+                else:
+                    self.log("Game UI still changing, continuing anyway", 'system')
+                
+                # Only a settled, exact, fully re-rendered size may skip the next check
+                if result.settled and result.exact and rendered:
+                    self.geometry.remember(hwnd, self.get_geometry_fingerprint(hwnd))
             else:
-                print(f"\n✗ Failed to resize window")
+                print(f"\n✗ Failed to resize window: {result.error}")
                 self.log("Failed to resize window", 'error')
                 return False
         else:
             print(f"✓ Client width is correct")
             self.log("Client size matches reference resolution", 'success')
+            if (current_client_width, current_client_height) == reference:
+                self.geometry.remember(hwnd, fingerprint)
         
         return True
     
     def restore_window_size(self):
-        """Restore window to target CLIENT width from config.ini"""
+        """Restore window to target CLIENT width from config.ini
+        
+        Restores right away by default. Setting restore_grace > 0 in
+        config.ini opts in to a deferred restore, so a run restarted on the
+        same window within the grace period skips both resizes.
+        """
         if not self.hwnd_for_resize or not self.original_window_width:
             print(f"\n⚠️  No window resize data available")
             return
         
+        if self.restore_grace > 0:
+            self.geometry.schedule_restore(self.hwnd_for_resize, self.restore_grace, self.restore_window_size_now)
+            print(f"\n⏳ Window size restore in {self.restore_grace:g}s (skipped if a run restarts on this window)")
+            return
+        
+        self.restore_window_size_now()
+    
+    def restore_window_size_now(self):
+        """Resize the window back to the target CLIENT width right away"""
         hwnd = self.hwnd_for_resize
+        if not self.capture_backend.is_window(hwnd):
+            print(f"\n⚠️  Window HWND={hwnd} is gone, nothing to restore")
+            return
         
         print(f"\n🔄 RESTORING WINDOW SIZE")
         
@@ -523,19 +786,11 @@ class RealmRaidAutomation:
         
         self.log(f"Restoring CLIENT to {self.target_restore_width}x{target_client_height}", 'system')
         
-        window_rect = wintypes.RECT()
-        user32.GetWindowRect(hwnd, ctypes.byref(window_rect))
+        result = self.resize_client(hwnd, self.target_restore_width, target_client_height)
+        # The window has left the size the last run verified
+        self.geometry.forget(hwnd)
         
-        success = user32.SetWindowPos(
-            hwnd, 0,
-            window_rect.left, window_rect.top,
-            target_window_width, target_window_height,
-            0x0004
-        )
-        
-        if success:
-            time.sleep(0.3)
-            
+        if result.issued and not result.error:
             # Verify CLIENT size
             new_client_width, new_client_height = self.get_window_size(hwnd)
             new_window_width, new_window_height = self.get_window_outer_size(hwnd)
@@ -554,7 +809,11 @@ class RealmRaidAutomation:
             self.log("Failed to restore window size", 'error')
     
     def check_initial_grid(self, hwnd):
-        """Check all 9 grid positions using hybrid image detection"""
+        """Check all 9 grid positions using hybrid image detection (step generator)
+        
+        With a DetectionPool the scan runs in a worker process and this
+        yields until it answers, so other clients on the scheduler keep going.
+        """
         print("\n" + "="*60)
         print("🔍 HYBRID GRID STATE CHECK")
         print("="*60)
@@ -565,45 +824,67 @@ class RealmRaidAutomation:
         self.froglet_matches = []
         self.available_matches = []
         
-        print(f"\nDetection settings:")
-        print(f"  • KO threshold: 0.75")
-        print(f"  • Fail threshold: 0.85 (stricter)")
-        print(f"  • Froglet threshold: 0.75\n")
+        if not self.running:
+            print(f"[STOP] Stop detected during grid check")
+            return False
         
-        for key in ['11', '12', '13', '21', '22', '23', '31', '32', '33']:
-            if not self.running:
-                print(f"[STOP] Stop detected during grid check")
+        thresholds = self.grid_matcher.thresholds
+        print(f"\nDetection settings:")
+        print(f"  • KO threshold: {thresholds['ko']}")
+        print(f"  • Fail threshold: {thresholds['fail']} (stricter)")
+        print(f"  • Froglet threshold: {thresholds['froglet']}\n")
+        
+        # Start the scan from fresh pixels: blit every cell's search box in one
+        # batched capture, then classify all nine cells in a single pass
+        self.frame_cache.invalidate(hwnd)
+        captures_before = self.frame_cache.captures
+        saved_before = self.frame_cache.captures_saved
+        scan_start = time.perf_counter()
+        
+        if self.detection_pool is not None:
+            # One full frame through shared memory; matching runs in a worker process
+            frame = self.frame_cache.get(hwnd)
+            if frame is None:
+                self.log("Failed to capture frame for grid check", 'error')
                 return False
+            request = self.detection_pool.submit_async(hwnd, frame)
+            while not request.done():
+                yield self.DETECTION_POLL_INTERVAL
+            grid = request.result()
+        else:
+            rects = self.grid_matcher.rects()
+            self.frame_cache.prefetch_regions(hwnd, rects)
+            regions = [self.frame_cache.get_region(hwnd, *rect) for rect in rects]
+            with self.timer.stage('grid_match'):
+                grid = self.grid_matcher.classify_regions(regions)
+        
+        scan_ms = (time.perf_counter() - scan_start) * 1000
+        self.timer.record('grid_scan', scan_ms / 1000)
+        self.metrics.push(hwnd, metrics_ring.DETECT, scan_ms / 1000)
+        
+        for key in self.grid_matcher.cell_coords:
+            x, y = self.grid_positions[key]['coord_1']
+            state = grid.state(key)
+            print(f"\n📍 Position {key}: around ({x:4d}, {y:4d}) → {state} "
+                  f"(confidence: {grid.confidence(key):.3f})")
             
-            coord = self.grid_positions[key]['coord_1']
-            x, y = coord
-            print(f"\n📍 Position {key}: Checking around ({x:4d}, {y:4d})")
-            
-            is_ko, ko_conf = self.detect_template_near_coord(hwnd, x, y, 'ko', threshold=0.75)
-            if is_ko:
+            if state == 'ko':
                 self.ko_matches.append(key)
                 print(f"   ✓ KO - Match completed")
                 self.log(f"Position {key}: KO (completed)", 'success')
-                continue
-            
-            is_fail, fail_conf = self.detect_template_near_coord(hwnd, x, y, 'fail', threshold=0.85)
-            if is_fail:
+            elif state == 'fail':
                 self.fail_matches.append(key)
                 print(f"   ✗ FAIL - Match attempted but failed")
                 self.log(f"Position {key}: FAIL (attempted)", 'error')
-                continue
-            
-            is_froglet, froglet_conf = self.detect_template_near_coord(hwnd, x, y, 'froglet', threshold=0.75)
-            if is_froglet:
+            elif state == 'froglet':
                 self.froglet_matches.append(key)
                 self.available_matches.append(key)
                 print(f"   🐸 FROGLET - Available (needs extra clicks)")
                 self.log(f"Position {key}: FROGLET (needs extra clicks)", 'system')
-                continue
-            
-            self.available_matches.append(key)
-            print(f"   ✓ AVAILABLE - Normal active match")
-            self.log(f"Position {key}: AVAILABLE (normal)", 'success')
+            else:
+                self.available_matches.append(key)
+                print(f"   ✓ AVAILABLE - Normal active match")
+                self.log(f"Position {key}: AVAILABLE (normal)", 'success')
         
         total_ko = len(self.ko_matches)
         total_fail = len(self.fail_matches)
@@ -621,6 +902,9 @@ class RealmRaidAutomation:
         print(f"  • Available: {total_available} - {self.available_matches if self.available_matches else 'None'}")
         print(f"    └─ Normal: {total_normal_available}, Froglet: {total_froglet}")
         print(f"  • Run position: {run_position}/9")
+        print(f"  • Frame captures: {self.frame_cache.captures - captures_before} "
+              f"(saved {self.frame_cache.captures_saved - saved_before})")
+        print(f"  • Scan time: {scan_ms:.1f} ms")
         print("-"*60)
         
         self.log(f"Grid check complete:", 'system')
@@ -632,7 +916,23 @@ class RealmRaidAutomation:
         return True
     
     def process_single_match(self, hwnd, position_key):
-        """Process a single match from start to completion"""
+        """Process a single match from start to completion (step generator)
+        
+        Each step's wall time is recorded as a 'match.<step>' stage; the
+        duration of a finished match goes to the metrics ring.
+        """
+        stages = self.timer.sequence('match')
+        start = time.monotonic()
+        try:
+            result = yield from self.match_steps(hwnd, position_key, stages)
+        finally:
+            stages.close()
+        if result is True:
+            self.metrics.push(hwnd, metrics_ring.MATCH, time.monotonic() - start)
+        return result
+    
+    def match_steps(self, hwnd, position_key, stages):
+        """Steps of process_single_match (step generator)"""
         print(f"\n{'='*60}")
         print(f"🎮 PROCESSING MATCH: Position {position_key}")
         print(f"{'='*60}")
@@ -640,6 +940,7 @@ class RealmRaidAutomation:
         
         coord_1 = self.grid_positions[position_key]['coord_1']
         coord_2 = self.grid_positions[position_key]['coord_2']
+        join_probe = f'join_{position_key}'
         
         is_froglet = position_key in self.froglet_matches
         
@@ -651,18 +952,19 @@ class RealmRaidAutomation:
         
         # Step 1: Expand match
         print(f"\n🔹 STEP 1: Expanding match")
+        stages.enter('expand')
         for attempt in range(self.max_retries):
             if not self.running:
                 return False
             
-            self.send_click(hwnd, coord_1[0], coord_1[1])
+            yield from self.send_click(hwnd, coord_1[0], coord_1[1])
             
-            if not self.interruptible_sleep(self.EXPANSION_WAIT):
+            expanded, _ = yield from self.wait_for_probe(hwnd, join_probe, ('btn',), self.EXPANSION_WAIT,
+                                              transition='expand')
+            if not self.running:
                 return False
             
-            color = self.get_pixel_color(hwnd, coord_2[0], coord_2[1])
-            
-            if self.color_matches(color, self.color_btn):
+            if expanded:
                 print(f"     ✓ Match expanded!")
                 self.log(f"Match expanded successfully", 'success')
                 break
@@ -673,26 +975,27 @@ class RealmRaidAutomation:
         
         # Step 2: Join match
         print(f"\n🔹 STEP 2: Joining match")
+        stages.enter('join')
         for attempt in range(self.max_retries):
             if not self.running:
                 return False
             
-            self.send_click(hwnd, coord_2[0], coord_2[1])
+            yield from self.send_click(hwnd, coord_2[0], coord_2[1])
             
-            if not self.interruptible_sleep(self.JOIN_WAIT):
+            joined, _ = yield from self.wait_for_probe(hwnd, join_probe, ('btn',), self.JOIN_WAIT,
+                                            present=False, transition='join')
+            if not self.running:
                 return False
             
-            color = self.get_pixel_color(hwnd, coord_2[0], coord_2[1])
-            
-            if self.color_matches(color, self.color_btn):
+            if not joined:
                 if attempt == self.max_retries - 1:
                     print(f"     ✗ ENTRY COUNT EXHAUSTED")
                     
                     # Click coord_1 to collapse expanded window before stopping
                     print(f"\n🔹 Collapsing expanded match before stopping")
                     self.log("Collapsing expanded match window", 'system')
-                    self.send_click(hwnd, coord_1[0], coord_1[1])
-                    time.sleep(0.5)  # Brief wait for collapse animation
+                    yield from self.send_click(hwnd, coord_1[0], coord_1[1])
+                    yield self.capture_backend.scale_delay(0.5)  # Brief wait for collapse animation
                     
                     self.log("Entry count exhausted - stopping automation", 'error')
                     return "ENTRY_EXHAUSTED"
@@ -704,15 +1007,17 @@ class RealmRaidAutomation:
         # Step 2.5: Wait for loading screen to finish (for froglet matches)
         if is_froglet:
             print(f"\n🔹 STEP 2.5: Froglet Match - Waiting for loading screen")
+            stages.enter('froglet_loading')
             self.log(f"Froglet match detected - waiting 3s for loading screen", 'system')
             
-            if not self.interruptible_sleep(3.0):
+            if not (yield from self.interruptible_sleep(3.0)):
                 return False
             
             print(f"     ✓ Loading screen buffer complete")
         
         # Step 3: Wait for match completion (with continuous froglet clicks if needed)
         print(f"\n🔹 STEP 3: Waiting for match to complete")
+        stages.enter('battle')
         if is_froglet:
             print(f"   🐸 Froglet mode: Will click continuously every {self.FROGLET_CLICK_DELAY}s")
         
@@ -722,8 +1027,9 @@ class RealmRaidAutomation:
         froglet_click_count = 0
         
         froglet_x, froglet_y = self.coord_froglet_click if is_froglet else (None, None)
+        match_timeout = self.capture_backend.scale_delay(self.match_timeout)
         
-        while time.time() - start_time < self.match_timeout:
+        while time.time() - start_time < match_timeout:
             if not self.running:
                 return False
             
@@ -731,30 +1037,31 @@ class RealmRaidAutomation:
             if is_froglet:
                 froglet_click_count += 1
                 print(f"   🐸 Froglet click #{froglet_click_count}")
-                self.send_click(hwnd, froglet_x, froglet_y)
+                yield from self.send_click(hwnd, froglet_x, froglet_y)
                 
                 # Use shorter sleep interval for froglet (FROGLET_CLICK_DELAY)
-                if not self.interruptible_sleep(self.FROGLET_CLICK_DELAY):
+                if not (yield from self.interruptible_sleep(self.FROGLET_CLICK_DELAY)):
                     return False
+                
+                label = yield from self.fresh_probe_label(hwnd, 'check_end')
             else:
-                # Normal matches use longer check interval
-                if not self.interruptible_sleep(self.MATCH_CHECK_INTERVAL):
+                # Normal matches watch the end probe for up to one check interval
+                _, label = yield from self.wait_for_probe(hwnd, 'check_end', ('fail', 'success'),
+                                               self.MATCH_CHECK_INTERVAL)
+                if not self.running:
                     return False
             
             check_count += 1
             elapsed = int(time.time() - start_time)
             
-            # Check for match end every check
-            color = self.get_pixel_color(hwnd, self.coord_check_end[0], self.coord_check_end[1])
-            
-            if self.color_matches(color, self.color_fail) or self.color_matches(color, self.color_success):
-                result = "fail" if self.color_matches(color, self.color_fail) else "success"
+            if label in ('fail', 'success'):
+                result = label
                 print(f"     {'✗' if result == 'fail' else '✓'} Match {result.upper()} (after {elapsed}s)")
                 if is_froglet:
                     print(f"     Total froglet clicks: {froglet_click_count}")
                     self.log(f"Froglet match completed after {froglet_click_count} clicks", 'success')
                 self.log(f"Match ended: {result}", 'error' if result == 'fail' else 'success')
-                self.send_click(hwnd, self.coord_click_end[0], self.coord_click_end[1])
+                yield from self.send_click(hwnd, self.coord_click_end[0], self.coord_click_end[1])
                 match_ended = True
                 self.total_complete += 1
                 break
@@ -767,7 +1074,8 @@ class RealmRaidAutomation:
             return False
         
         # Step 4: Return to lobby
-        if not self.wait_for_lobby_return(hwnd):
+        stages.enter('lobby_return')
+        if not (yield from self.wait_for_lobby_return(hwnd)):
             return False
         
         print(f"{'='*60}\n")
@@ -775,7 +1083,15 @@ class RealmRaidAutomation:
 
 
     def run(self):
-        """Main automation loop"""
+        """Main automation loop on the calling thread"""
+        self.drive(self.run_steps())
+    
+    def run_steps(self):
+        """Main automation loop (step generator, see drive())"""
+        # Stopped before the first step (e.g. during an RR-All start stagger)
+        if self.stop_event.is_set():
+            self.running = False
+            return
         self.running = True
         # Use DPI-unaware context so all Win32 calls (GetClientRect, SetWindowPos,
         # PrintWindow, WM_LBUTTONDOWN) operate in the game's 96-DPI virtual space.
@@ -796,9 +1112,8 @@ class RealmRaidAutomation:
         self.log(f"Using target HWND: {hwnd}", 'system')
         
         # Verify the window still exists
-        import win32gui
         try:
-            if not win32gui.IsWindow(hwnd):
+            if not self.capture_backend.is_window(hwnd):
                 self.log("Target window no longer exists!", 'error')
                 self.running = False
                 return
@@ -807,31 +1122,46 @@ class RealmRaidAutomation:
             self.running = False
             return
 
-        if not self.resize_window_to_reference(hwnd):
-            self.log("Window resize failed", 'error')
+        # Recorded frames are already at reference size - nothing to resize
+        if self.capture_backend.is_live and not (yield from self.resize_window_to_reference(hwnd)):
+            if self.running:
+                self.log("Window resize failed", 'error')
+            else:
+                # Stopped mid-resize: the window may already be at the reference size
+                self.restore_window_size()
             self.running = False
             return
         
+        defaults = {
+            'expand': self.EXPANSION_WAIT,
+            'join': self.JOIN_WAIT,
+            'lobby_return': self.REFRESH_BUTTON_CHECK_INTERVAL,
+            'refresh': self.REFRESH_CLICK_WAIT,
+            'confirm': self.CONFIRM_CLICK_WAIT,
+        }
+        budgets = ', '.join(f"{t} {self.timing.budget(t, d):.2f}s" for t, d in defaults.items())
+        print(f"⏱ Wait budgets ({self.timing.key}): {budgets}")
+        
         try:
             while self.running:
                 if not self.running:
                     break
                 
                 self.log("Starting new page scan...", 'system')
-                if not self.check_initial_grid(hwnd):
+                if not (yield from self.check_initial_grid(hwnd)):
                     break
                 
                 self.log(f"Found {len(self.available_matches)} available matches", 'system')
                 
                 if not self.available_matches:
                     if self.fail_matches:
-                        if not self.refresh_page_if_needed(hwnd):
+                        if not (yield from self.refresh_page_if_needed(hwnd)):
                             break
                         
-                        if not self.interruptible_sleep(self.PAGE_CYCLE_WAIT):
+                        if not (yield from self.interruptible_sleep(self.PAGE_CYCLE_WAIT)):
                             break
                         
-                        if not self.check_initial_grid(hwnd):
+                        if not (yield from self.check_initial_grid(hwnd)):
                             break
                         
                         if not self.available_matches:
@@ -847,7 +1177,7 @@ class RealmRaidAutomation:
                     
                     self.log(f"Match {idx}/{len(self.available_matches)}: Position {position}", 'control')
                     
-                    result = self.process_single_match(hwnd, position)
+                    result = yield from self.process_single_match(hwnd, position)
                     
                     if result == "ENTRY_EXHAUSTED":
                         # Stop flag already set in process_single_match
@@ -864,7 +1194,7 @@ class RealmRaidAutomation:
                 
                 if self.running:
                     if self.fail_matches:
-                        if not self.refresh_page_if_needed(hwnd):
+                        if not (yield from self.refresh_page_if_needed(hwnd)):
                             break
                 
                 self.ko_matches = []
@@ -873,7 +1203,7 @@ class RealmRaidAutomation:
                 self.available_matches = []
                 
                 if self.running:
-                    if not self.interruptible_sleep(self.PAGE_CYCLE_WAIT):
+                    if not (yield from self.interruptible_sleep(self.PAGE_CYCLE_WAIT)):
                         break
                 
         except Exception as e:
@@ -884,21 +1214,45 @@ class RealmRaidAutomation:
             # Only restore window once
             self.restore_window_size()
             
+            # Free the DCs and bitmaps kept alive for this window
+            self.capture_backend.release(hwnd)
+            if self.detection_pool is not None:
+                self.detection_pool.release(hwnd)
+            
             self.running = False
 
             # Single final log message
             print("\n" + "="*60)
             print(f"[END] Realm Raid automation stopped - Total matches: {self.total_complete}")
+            stats = self.frame_cache.get_stats()
+            print(f"[END] Frame captures: {stats['captures']} (saved {stats['captures_saved']})")
+            sampler_stats = self.pixel_sampler.get_stats()
+            print(f"[END] Pixel batches: {sampler_stats['batches']} ({sampler_stats['points_read']} points)")
+            self.save_timing_profile()
+            self.timer.dump(f"Stage timings (HWND={hwnd})")
             print("="*60)
             self.log(f"Realm Raid automation stopped - Total matches: {self.total_complete}", 'system')
     
+    def save_timing_profile(self):
+        """Persist learned transition latencies and print their percentiles"""
+        for transition in self.timing.TRANSITIONS:
+            stats = self.timing.percentiles(transition)
+            if stats:
+                print(f"[END] {transition}: p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s "
+                      f"({stats['count']} samples)")
+        try:
+            self.timing.save()
+        except Exception as e:
+            print(f"[END] Could not save timing profile: {e}")
+    
     def send_click(self, hwnd, x, y):
-        """Send non-intrusive click to window"""
+        """Send non-intrusive click to window (step generator: yields the button hold)"""
         try:
-            lparam = win32api.MAKELONG(x, y)
-            win32gui.PostMessage(hwnd, win32con.WM_LBUTTONDOWN, win32con.MK_LBUTTON, lparam)
-            time.sleep(self.CLICK_DELAY)
-            win32gui.PostMessage(hwnd, win32con.WM_LBUTTONUP, 0, lparam)
+            with self.timer.stage('send_click'):
+                self.capture_backend.post_button(hwnd, x, y, True)
+                yield self.capture_backend.scale_delay(self.CLICK_DELAY)
+                self.capture_backend.post_button(hwnd, x, y, False)
+            self.frame_cache.invalidate(hwnd)
             return True
         except Exception as e:
             self.log(f"Error sending click: {e}", 'error')
@@ -914,7 +1268,7 @@ class RealmRaidAutomation:
         )
     
     def wait_for_lobby_return(self, hwnd):
-        """Wait for return to lobby"""
+        """Wait for return to lobby (step generator)"""
         print(f"\n🔹 Returning to lobby...")
         self.log("Waiting for return to lobby", 'system')
         
@@ -923,94 +1277,105 @@ class RealmRaidAutomation:
             if not self.running:
                 return False
             
-            color = self.get_pixel_color(hwnd, self.coord_click_refresh[0], self.coord_click_refresh[1])
+            label = yield from self.fresh_probe_label(hwnd, 'click_refresh')
             
-            if self.color_matches(color, self.color_btn) or self.color_matches(color, self.color_cd):
+            if label in ('btn', 'cd'):
                 self.log("Successfully returned to lobby", 'success')
                 return True
             else:
-                self.send_click(hwnd, self.coord_click_end[0], self.coord_click_end[1])
+                yield from self.send_click(hwnd, self.coord_click_end[0], self.coord_click_end[1])
                 
-                if not self.interruptible_sleep(self.REFRESH_BUTTON_CHECK_INTERVAL):
+                returned, _ = yield from self.wait_for_probe(hwnd, 'click_refresh', ('btn', 'cd'),
+                                                  self.REFRESH_BUTTON_CHECK_INTERVAL,
+                                                  transition='lobby_return')
+                if not self.running:
                     return False
+                if returned:
+                    self.log("Successfully returned to lobby", 'success')
+                    return True
         
         self.log("Failed to return to lobby", 'error')
         return False
     
     def refresh_page_if_needed(self, hwnd):
-        """Check if refresh needed based on Fail matches"""
+        """Check if refresh needed based on Fail matches (step generator)"""
         if not self.fail_matches:
             self.log("No Fail matches - skipping refresh check", 'system')
             return True
         
         self.log(f"Fail matches detected: {self.fail_matches}", 'system')
         
-        color = self.get_pixel_color(hwnd, self.coord_click_refresh[0], self.coord_click_refresh[1])
+        label = yield from self.fresh_probe_label(hwnd, 'click_refresh')
         
-        if self.color_matches(color, self.color_btn):
+        if label == 'btn':
             self.log("Clicking refresh button", 'control')
-            self.send_click(hwnd, self.coord_click_refresh[0], self.coord_click_refresh[1])
+            yield from self.send_click(hwnd, self.coord_click_refresh[0], self.coord_click_refresh[1])
             
-            if not self.interruptible_sleep(self.REFRESH_CLICK_WAIT):
+            # Confirm dialog usually appears well before REFRESH_CLICK_WAIT
+            yield from self.wait_for_probe(hwnd, 'click_confirm', ('btn', 'cd'), self.REFRESH_CLICK_WAIT,
+                                transition='refresh')
+            if not self.running:
                 return False
             
-            return self.handle_confirm_button(hwnd)
+            return (yield from self.handle_confirm_button(hwnd))
             
-        elif self.color_matches(color, self.color_cd):
+        elif label == 'cd':
             self.log("Refresh on cooldown - waiting", 'system')
-            return self.wait_for_confirm_cooldown(hwnd)
+            return (yield from self.wait_for_confirm_cooldown(hwnd))
         else:
             self.log("Page may have auto-refreshed", 'system')
             return True
     
     def handle_confirm_button(self, hwnd):
-        """Click confirm button with retry"""
+        """Click confirm button with retry (step generator)"""
         for attempt in range(self.max_retries):
             if not self.running:
                 return False
             
-            color = self.get_pixel_color(hwnd, self.coord_click_confirm[0], self.coord_click_confirm[1])
+            label = yield from self.fresh_probe_label(hwnd, 'click_confirm')
             
-            if self.color_matches(color, self.color_btn):
-                self.send_click(hwnd, self.coord_click_confirm[0], self.coord_click_confirm[1])
+            if label == 'btn':
+                yield from self.send_click(hwnd, self.coord_click_confirm[0], self.coord_click_confirm[1])
                 
-                if not self.interruptible_sleep(self.CONFIRM_CLICK_WAIT):
+                refreshed, _ = yield from self.wait_for_probe(hwnd, 'click_confirm', ('btn',),
+                                                   self.CONFIRM_CLICK_WAIT, present=False,
+                                                   transition='confirm')
+                if not self.running:
                     return False
                 
-                verify_color = self.get_pixel_color(hwnd, self.coord_click_confirm[0], self.coord_click_confirm[1])
-                
-                if not self.color_matches(verify_color, self.color_btn):
+                if refreshed:
                     self.log("Page refreshed successfully", 'success')
                     return True
                     
-            elif self.color_matches(color, self.color_cd):
-                return self.wait_for_confirm_cooldown(hwnd)
+            elif label == 'cd':
+                return (yield from self.wait_for_confirm_cooldown(hwnd))
         
         return True
     
     def wait_for_confirm_cooldown(self, hwnd):
-        """Wait for confirm button cooldown"""
+        """Wait for confirm button cooldown (step generator)"""
         self.log("Waiting for confirm cooldown...", 'system')
         
         while self.running:
-            color = self.get_pixel_color(hwnd, self.coord_click_confirm[0], self.coord_click_confirm[1])
+            label = yield from self.fresh_probe_label(hwnd, 'click_confirm')
             
-            if self.color_matches(color, self.color_btn):
-                self.send_click(hwnd, self.coord_click_confirm[0], self.coord_click_confirm[1])
+            if label == 'btn':
+                yield from self.send_click(hwnd, self.coord_click_confirm[0], self.coord_click_confirm[1])
                 
-                if not self.interruptible_sleep(self.CONFIRM_CLICK_WAIT):
+                refreshed, _ = yield from self.wait_for_probe(hwnd, 'click_confirm', ('btn',),
+                                                   self.CONFIRM_CLICK_WAIT, present=False,
+                                                   transition='confirm')
+                if not self.running:
                     return False
                 
-                verify_color = self.get_pixel_color(hwnd, self.coord_click_confirm[0], self.coord_click_confirm[1])
-                
-                if not self.color_matches(verify_color, self.color_btn):
+                if refreshed:
                     self.log("Page refreshed successfully", 'success')
                     return True
                     
-                if not self.interruptible_sleep(self.CONFIRM_COOLDOWN_CHECK_INTERVAL):
+                if not (yield from self.interruptible_sleep(self.CONFIRM_COOLDOWN_CHECK_INTERVAL)):
                     return False
             else:
-                if not self.interruptible_sleep(self.CONFIRM_COOLDOWN_CHECK_INTERVAL):
+                if not (yield from self.interruptible_sleep(self.CONFIRM_COOLDOWN_CHECK_INTERVAL)):
                     return False
         
         return False
@@ -1020,7 +1385,21 @@ def is_rr_running():
     return _rr_running
 
 
-def run_rr_mode(log_func, config_path, coords_path, target_hwnd, ref_path):
+def get_rr_stage_snapshot():
+    """Per-stage timing summaries of the running Realm Raid instance (empty if none)"""
+    if _rr_automation_instance is None:
+        return {}
+    return _rr_automation_instance.timer.snapshot()
+
+
+def rr_target_hwnd():
+    """HWND driven by single Realm Raid mode, or None when it is not running"""
+    if _rr_running and _rr_automation_instance:
+        return _rr_automation_instance.target_hwnd
+    return None
+
+
+def run_rr_mode(log_func, config_path, coords_path, target_hwnd, ref_path, capture_backend=None):
     """Start Realm Raid mode with the specified target window
 
     Args:
@@ -1028,6 +1407,7 @@ def run_rr_mode(log_func, config_path, coords_path, target_hwnd, ref_path):
         config_path: Path to config.ini
         coords_path: Path to coords.ini
         target_hwnd: The HWND of the window to automate (integer)
+        capture_backend: CaptureBackend override (defaults to live GDI)
     """
     global _rr_running, _rr_thread, _rr_automation_instance
 
@@ -1042,7 +1422,8 @@ def run_rr_mode(log_func, config_path, coords_path, target_hwnd, ref_path):
         config_path, 
         coords_path, 
         target_hwnd,
-        ref_path
+        ref_path,
+        capture_backend
     )
     
     def thread_target():
@@ -1,87 +1,363 @@
 import threading
 import configparser
-import pygetwindow as gw
-from cogs.mode_rr import RealmRaidAutomation, _rr_stop_event
+from cogs.mode_rr import RealmRaidAutomation, rr_target_hwnd
+from cogs.rr_scheduler import StepScheduler
+from cogs.detection_pool import DetectionPool
+from cogs.capture_backend import GdiCaptureBackend
+from cogs.capture_gate import CaptureGate, GatedCaptureBackend
+from cogs.cpu_monitor import CpuMonitor
+from cogs.window_registry import get_window_registry
 
-_rr_all_running = False
-_rr_all_instances = {}   # hwnd → RealmRaidAutomation
-_rr_all_threads = {}     # hwnd → Thread
+_rr_all_session = None
 
+# 'threads': one OS thread per window; 'scheduler': every window on one thread
+RR_ALL_ENGINES = ('threads', 'scheduler')
 
-def run_rr_all_mode(log_func, config_path, coords_path, ref_path):
-    global _rr_all_running, _rr_all_instances, _rr_all_threads
 
-    if _rr_all_running:
+class RRAllClient:
+    """One window driven by an RR-All session"""
+
+    def __init__(self, hwnd, automation, stop_event):
+        self.hwnd = hwnd
+        self.automation = automation
+        self.stop_event = stop_event
+        self.thread = None       # threads engine only
+        self.finished = threading.Event()
+
+
+class RRAllSession:
+    """Realm Raid on every window of the configured instance
+
+    Owns one stop event per HWND, so a single client can be stopped without
+    touching the others (or a single-RR run on another window). A watcher
+    thread checks the cached window registry: new windows get a client of their own,
+    closed windows are stopped and dropped. Windows whose client finished or
+    was stopped are not restarted automatically; add_client() does that.
+
+    Clients launched together start stagger seconds apart in total (phase
+    offsets of stagger / N), so their resize, capture and detection ticks
+    do not all land at the same instant, and at most max_captures captures
+    run at once across clients.
+    """
+
+    WINDOW_POLL_INTERVAL = 2.0
+
+    def __init__(self, log_func, config_path, coords_path, ref_path, instance_name,
+                 engine='threads', detection_workers=0, stagger=1.0, max_captures=2,
+                 capture_backend_factory=None):
+        """
+        Args:
+            log_func: Logging function
+            config_path: Path to config.ini
+            coords_path: Path to coords.ini
+            ref_path: Template directory
+            instance_name: Window title to match
+            engine: 'threads' or 'scheduler'
+            detection_workers: Worker processes for grid classification (0 = in-process)
+            stagger: Seconds over which the start of the first clients is spread
+            max_captures: Captures allowed in flight at once (0 = no cap)
+            capture_backend_factory: Callable returning a CaptureBackend per
+                client (defaults to live GDI)
+        """
+        self.log_func = log_func
+        self.config_path = config_path
+        self.coords_path = coords_path
+        self.ref_path = ref_path
+        self.instance_name = instance_name
+        self.engine = engine
+        self.detection_workers = detection_workers
+        self.stagger = stagger
+        self.gate = CaptureGate(max_captures) if max_captures > 0 else None
+        self.capture_backend_factory = capture_backend_factory or GdiCaptureBackend
+        self.cpu_monitor = CpuMonitor()
+
+        self.stop_event = threading.Event()   # whole session
+        self.clients = {}                     # hwnd → RRAllClient
+        self.closed = []                      # clients whose window closed, joined at shutdown
+        self.seen = set()                     # every HWND ever started
+        self.lock = threading.RLock()
+        self.pool = None
+        self.scheduler = None
+        self.watcher = None
+
+    def start(self, hwnds):
+        """Start clients for hwnds and the window watcher"""
+        if self.engine == 'scheduler':
+            self.scheduler = StepScheduler(self.stop_event, name="RR-All-Scheduler", persistent=True)
+            self.scheduler.start()
+
+        self.cpu_monitor.start()
+        for index, hwnd in enumerate(hwnds):
+            self.add_client(hwnd, delay=index * self.stagger / len(hwnds))
+
+        self.watcher = threading.Thread(target=self._watch, daemon=True, name="RR-All-Watcher")
+        self.watcher.start()
+
+    def add_client(self, hwnd, delay=0.0):
+        """Start automation on one window (no-op if it is already running)
+
+        Args:
+            hwnd: Window handle
+            delay: Seconds to wait before the first step (phase offset)
+        """
+        with self.lock:
+            client = self.clients.get(hwnd)
+            if client is not None and not client.finished.is_set():
+                return False
+            if hwnd == rr_target_hwnd():
+                self.log_func(f"HWND={hwnd} is already driven by Realm Raid - skipped", "system")
+                return False
+
+            stop_event = threading.Event()
+            capture_backend = self.capture_backend_factory()
+            if self.gate is not None:
+                capture_backend = GatedCaptureBackend(capture_backend, self.gate)
+            automation = RealmRaidAutomation(
+                self.log_func, self.config_path, self.coords_path, hwnd, self.ref_path,
+                capture_backend=capture_backend, stop_event=stop_event
+            )
+            if self.detection_workers > 0:
+                if self.pool is None:
+                    self.pool = DetectionPool.for_automation(self.detection_workers, automation)
+                    self.log_func(f"Grid detection offloaded to {self.detection_workers} worker process(es)", "system")
+                automation.detection_pool = self.pool
+
+            client = RRAllClient(hwnd, automation, stop_event)
+            self.clients[hwnd] = client
+            self.seen.add(hwnd)
+
+        self.log_func(f"Launching automation for HWND={hwnd} (+{delay:.2f}s)", "system")
+        if self.scheduler is not None:
+            self.scheduler.add(
+                hwnd, automation.run_steps(),
+                on_stop=lambda: (setattr(automation, 'running', False), stop_event.set()),
+                on_done=client.finished.set,
+                delay=delay,
+                stop_event=stop_event
+            )
+        else:
+            def thread_target():
+                if not stop_event.wait(delay):
+                    automation.run()
+                client.finished.set()
+
+            client.thread = threading.Thread(target=thread_target, daemon=True, name=f"RR-All-{hwnd}")
+            client.thread.start()
+        return True
+
+    def stop_client(self, hwnd):
+        """Stop automation on one window; the others keep running"""
+        with self.lock:
+            client = self.clients.get(hwnd)
+        if client is None or client.finished.is_set():
+            return False
+
+        client.automation.running = False
+        client.stop_event.set()
+        if self.scheduler is not None:
+            self.scheduler.wake(hwnd)
+        self.log_func(f"Stopping automation for HWND={hwnd}", "system")
+        return True
+
+    def stop(self):
+        """Stop every client and the session"""
+        self.stop_event.set()
+        with self.lock:
+            hwnds = list(self.clients)
+        for hwnd in hwnds:
+            self.stop_client(hwnd)
+
+    def running_hwnds(self):
+        """HWNDs whose automation is still running"""
+        with self.lock:
+            return [hwnd for hwnd, client in self.clients.items() if not client.finished.is_set()]
+
+    def is_running(self):
+        return not self.stop_event.is_set()
+
+    def get_stats(self):
+        """Get session metrics
+
+        Returns:
+            dict: client counts, CPU use (see CpuMonitor), capture gate and
+            scheduler counters (None when not in use)
+        """
+        with self.lock:
+            clients = len(self.clients)
+        return {
+            'clients': clients,
+            'running': len(self.running_hwnds()),
+            'cpu': self.cpu_monitor.get_stats(),
+            'captures': self.gate.get_stats() if self.gate else None,
+            'scheduler': self.scheduler.get_stats() if self.scheduler else None
+        }
+
+    def stage_snapshot(self):
+        """Per-client stage timing summaries (see StageTimer.snapshot)
+
+        Returns:
+            dict: hwnd → stage name → summary; empty unless stage_timing is on
+        """
+        with self.lock:
+            clients = list(self.clients.items())
+        return {hwnd: client.automation.timer.snapshot() for hwnd, client in clients
+                if client.automation.timer.enabled}
+
+    def log_stats(self):
+        """Print CPU and capture metrics"""
+        stats = self.get_stats()
+        cpu = stats['cpu']
+        print(f"📊 RR-All CPU: avg {cpu['avg']:.0f}% / peak {cpu['peak']:.0f}% "
+              f"of one core ({cpu['cpus']} CPUs, {cpu['samples']} samples)")
+        captures = stats['captures']
+        if captures:
+            print(f"📊 Captures: {captures['captures']} total, peak {captures['peak_active']}"
+                  f"/{captures['max_concurrent']} concurrent, {captures['waited']} waited "
+                  f"(avg {captures['avg_wait'] * 1000:.1f}ms, max {captures['max_wait'] * 1000:.1f}ms)")
+        self.log_func(f"CPU avg {cpu['avg']:.0f}% / peak {cpu['peak']:.0f}%", "system")
+
+    def refresh_windows(self):
+        """Start clients for new windows and drop the ones that were closed"""
+        try:
+            current = set(get_window_registry(self.instance_name).hwnds())
+        except Exception as e:
+            print(f"⚠️  Window scan failed: {e}")
+            return
+
+        for hwnd in current - self.seen:
+            self.log_func(f"New window detected: HWND={hwnd}", "system")
+            self.add_client(hwnd)
+
+        with self.lock:
+            closed = [hwnd for hwnd in self.clients if hwnd not in current]
+        for hwnd in closed:
+            self.log_func(f"Window closed: HWND={hwnd}", "system")
+            self.stop_client(hwnd)
+            with self.lock:
+                client = self.clients.pop(hwnd, None)
+                if client is not None:
+                    self.closed.append(client)
+
+    def _watch(self):
+        """Track the window list until stopped or every client has finished"""
+        while not self.stop_event.wait(self.WINDOW_POLL_INTERVAL):
+            self.refresh_windows()
+            if not self.running_hwnds():
+                self.log_func("All Realm Raid-All clients finished", "system")
+                break
+
+        self.stop_event.set()
+        with self.lock:
+            clients = list(self.clients.values()) + self.closed
+        # Closed clients may still be unwinding; none may touch the pool after shutdown
+        for client in clients:
+            client.finished.wait()
+            if client.thread is not None:
+                client.thread.join()
+        if self.scheduler is not None:
+            self.scheduler.join()
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        self.cpu_monitor.stop()
+        self.log_stats()
+        _session_ended(self)
+
+
+def _session_ended(session):
+    global _rr_all_session
+    if _rr_all_session is session:
+        _rr_all_session = None
+
+
+def run_rr_all_mode(log_func, config_path, coords_path, ref_path, engine=None, detection_workers=None,
+                    stagger=None, max_captures=None):
+    """Start Realm Raid on every window matching the configured instance name
+
+    Args:
+        engine: 'threads' or 'scheduler'; defaults to [GLOBAL] rr_all_engine
+            in config.ini, then 'threads'
+        detection_workers: Worker processes for grid classification; defaults
+            to [GLOBAL] detection_workers in config.ini, then 0 (in-process)
+        stagger: Seconds over which client start phases are spread; defaults
+            to [GLOBAL] rr_all_stagger, then 1.0
+        max_captures: Concurrent capture cap (0 = none); defaults to
+            [GLOBAL] max_concurrent_captures, then 2
+    """
+    global _rr_all_session
+
+    if _rr_all_session is not None:
         log_func("Realm Raid-All is already running", "error")
         return False
 
     cfg = configparser.ConfigParser()
     cfg.read(config_path, encoding='utf-8')
     instance_name = cfg.get("GLOBAL", "instance", fallback="")
+    engine = engine or cfg.get("GLOBAL", "rr_all_engine", fallback="threads")
+    if detection_workers is None:
+        detection_workers = cfg.getint("GLOBAL", "detection_workers", fallback=0)
+    if stagger is None:
+        stagger = cfg.getfloat("GLOBAL", "rr_all_stagger", fallback=1.0)
+    if max_captures is None:
+        max_captures = cfg.getint("GLOBAL", "max_concurrent_captures", fallback=2)
+
+    if engine not in RR_ALL_ENGINES:
+        log_func(f"Unknown RR-All engine '{engine}', using threads", "error")
+        engine = "threads"
 
     if not instance_name:
         log_func("Error: No instance name configured in config.ini", "error")
         return False
 
-    windows = gw.getWindowsWithTitle(instance_name)
+    windows = get_window_registry(instance_name).list()
     if not windows:
         log_func(f"No windows found matching: '{instance_name}'", "error")
         log_func("Please make sure the game is running and not minimized", "error")
         return False
 
-    log_func(f"Found {len(windows)} window(s) — starting Realm Raid-All", "system")
-
-    _rr_stop_event.clear()
-    _rr_all_instances.clear()
-    _rr_all_threads.clear()
-
-    for win in windows:
-        hwnd = win._hWnd
-        instance = RealmRaidAutomation(log_func, config_path, coords_path, hwnd, ref_path)
-        thread = threading.Thread(
-            target=instance.run,
-            daemon=True,
-            name=f"RR-All-{hwnd}"
-        )
-        _rr_all_instances[hwnd] = instance
-        _rr_all_threads[hwnd] = thread
-        log_func(f"Launching automation for HWND={hwnd}", "system")
-        thread.start()
-
-    _rr_all_running = True
-
-    monitor = threading.Thread(target=_monitor_threads, daemon=True, name="RR-All-Monitor")
-    monitor.start()
+    log_func(f"Found {len(windows)} window(s) — starting Realm Raid-All ({engine})", "system")
+
+    _rr_all_session = RRAllSession(
+        log_func, config_path, coords_path, ref_path, instance_name,
+        engine=engine, detection_workers=detection_workers,
+        stagger=stagger, max_captures=max_captures
+    )
+    _rr_all_session.start([win._hWnd for win in windows])
     return True
 
 
-def _monitor_threads():
-    """Wait for all automation threads to finish, then clean up."""
-    for thread in list(_rr_all_threads.values()):
-        thread.join()
-    _cleanup()
+def stop_rr_all_mode():
+    """Stop every RR-All client"""
+    session = _rr_all_session
+    if session is None or not session.is_running():
+        return False
+    session.stop()
+    return True
 
 
-def _cleanup():
-    global _rr_all_running, _rr_all_instances, _rr_all_threads
-    _rr_all_running = False
-    _rr_all_instances.clear()
-    _rr_all_threads.clear()
+def stop_rr_all_client(hwnd):
+    """Stop RR-All on one window, leaving the other clients running"""
+    session = _rr_all_session
+    return session.stop_client(hwnd) if session is not None else False
 
 
-def stop_rr_all_mode():
-    global _rr_all_running
+def add_rr_all_client(hwnd):
+    """(Re)start RR-All on one window of the running session"""
+    session = _rr_all_session
+    return session.add_client(hwnd) if session is not None else False
 
-    if not _rr_all_running:
-        return False
 
-    for instance in list(_rr_all_instances.values()):
-        instance.running = False
+def get_rr_all_session():
+    """The running RRAllSession, or None"""
+    return _rr_all_session
 
-    _rr_all_running = False
-    _rr_stop_event.set()
-    return True
+
+def get_rr_all_stage_snapshot():
+    """Per-client stage timing summaries of the running session (empty if none)"""
+    session = _rr_all_session
+    return session.stage_snapshot() if session is not None else {}
 
 
 def is_rr_all_running():
-    return _rr_all_running
+    session = _rr_all_session
+    return session is not None and session.is_running()
@@ -2,13 +2,15 @@ import time
 import threading
 import configparser
 import ctypes
-from ctypes import wintypes
 import win32api
 import win32con
-import pygetwindow as gw
 from datetime import datetime
+from cogs.gdi_context import get_client_size
+from cogs.stage_timer import LatencyHistogram
+from cogs.window_registry import get_window_registry
 
 _stop_event = threading.Event()
+_dispatcher = None
 
 def parse_coord(coord_str):
     """Parse coordinate string like '370, 150' to tuple"""
@@ -16,11 +18,166 @@ def parse_coord(coord_str):
     return (int(parts[0].strip()), int(parts[1].strip()))
 
 def click_in_window(hwnd, rel_x, rel_y):
-    lParam = win32api.MAKELONG(rel_x, rel_y)
+    post_click(hwnd, win32api.MAKELONG(rel_x, rel_y))
+
+def post_click(hwnd, lParam, hold=0.02):
     win32api.PostMessage(hwnd, win32con.WM_LBUTTONDOWN, win32con.MK_LBUTTON, lParam)
-    time.sleep(0.02)
+    time.sleep(hold)
     win32api.PostMessage(hwnd, win32con.WM_LBUTTONUP, None, lParam)
 
+
+class SoloClickPlan:
+    """Click point of one client, scaled for one client size"""
+
+    __slots__ = ('hwnd', 'client_size', 'x', 'y', 'lparam')
+
+    def __init__(self, hwnd, client_size, base_point, reference_size):
+        """
+        Args:
+            hwnd: Client window handle
+            client_size: (width, height) of the CLIENT area (coords.ini and
+                WM_LBUTTONDOWN are client-relative; the window size would
+                include borders and shift clicks down-right)
+            base_point: (x, y) click in reference coordinates
+            reference_size: (width, height) the base point was taken at
+        """
+        self.hwnd = hwnd
+        self.client_size = client_size
+        self.x = int(base_point[0] * client_size[0] / reference_size[0])
+        self.y = int(base_point[1] * client_size[1] / reference_size[1])
+        self.lparam = win32api.MAKELONG(self.x, self.y)
+
+
+class SoloClickPlanner:
+    """Per-HWND click plans kept in step with the window registry
+
+    Plans are only looked at again when the registry version changes, and
+    a client's plan is only recomputed when its client size changed, so a
+    steady tick is a list walk with no Win32 calls besides the clicks.
+    Minimized clients (zero client area) get no plan until restored.
+
+    The registry only says when to look: client sizes are measured with
+    measure(), by default GetClientRect on the calling thread, which
+    solo_click_loop makes DPI-unaware so sizes are in the same space as
+    WM_LBUTTONDOWN coordinates.
+    """
+
+    def __init__(self, registry, base_point, reference_size, measure=get_client_size):
+        self.registry = registry
+        self.measure = measure
+        self.base_point = base_point
+        self.reference_size = reference_size
+        self.plans = {}
+        self.active = []
+        self.version = None
+        self.rebuilt = 0
+
+    def current(self):
+        """Plans for every clickable client
+
+        Returns:
+            tuple: (plans, list of plans that are new or were rescaled)
+        """
+        version = self.registry.version
+        if version == self.version:
+            return self.active, []
+
+        plans = {}
+        changed = []
+        for info in self.registry.list():
+            if info.isMinimized:
+                continue
+            size = self.measure(info.hwnd)
+            if not size or not size[0] or not size[1]:
+                continue
+            plan = self.plans.get(info.hwnd)
+            if plan is None or plan.client_size != size:
+                plan = SoloClickPlan(info.hwnd, size, self.base_point, self.reference_size)
+                changed.append(plan)
+                self.rebuilt += 1
+            plans[info.hwnd] = plan
+
+        self.plans = plans
+        self.active = list(plans.values())
+        self.version = version
+        return self.active, changed
+
+
+class SoloClickDispatcher:
+    """Clicks every client in one round: all button-downs, one hold, all button-ups
+
+    Posting is asynchronous, so a round costs one hold plus N short
+    PostMessage calls instead of N holds, and the last client is clicked
+    microseconds after the first rather than N x 20ms later.
+
+    Jitter is kept in LatencyHistograms: 'spread' is the time from the
+    first to the last button-down of a round, 'hold' the actual down-to-up
+    time, and 'period' how far each round started from its scheduled tick.
+    """
+
+    def __init__(self, hold=0.02):
+        self.hold = hold
+        self.rounds = 0
+        self.clicks = 0
+        self.errors = 0
+        self.histograms = {name: LatencyHistogram() for name in ('spread', 'hold', 'period')}
+        self._lock = threading.Lock()
+
+    def dispatch(self, plans, late=0.0):
+        """Click every plan once
+
+        Args:
+            plans: SoloClickPlans to click
+            late: Seconds this round started after its scheduled tick
+
+        Returns:
+            list: (plan, exception) for clicks that could not be posted
+        """
+        failed = []
+        pressed = []
+        start = time.perf_counter()
+        for plan in plans:
+            try:
+                win32api.PostMessage(plan.hwnd, win32con.WM_LBUTTONDOWN, win32con.MK_LBUTTON, plan.lparam)
+                pressed.append(plan)
+            except Exception as e:
+                failed.append((plan, e))
+        spread = time.perf_counter() - start
+
+        if pressed:
+            time.sleep(max(0.0, self.hold - spread))
+        released = time.perf_counter()
+        for plan in pressed:
+            try:
+                win32api.PostMessage(plan.hwnd, win32con.WM_LBUTTONUP, None, plan.lparam)
+            except Exception as e:
+                failed.append((plan, e))
+
+        with self._lock:
+            self.rounds += 1
+            self.clicks += len(pressed)
+            self.errors += len(failed)
+            self.histograms['spread'].record(spread)
+            self.histograms['hold'].record(released - start)
+            self.histograms['period'].record(late)
+        return failed
+
+    def get_stats(self):
+        """Round counts plus spread / hold / period summaries (ms)"""
+        with self._lock:
+            stats = {name: histogram.summary() for name, histogram in self.histograms.items()}
+            stats.update(rounds=self.rounds, clicks=self.clicks, errors=self.errors)
+        return stats
+
+    def log_stats(self, log_action):
+        stats = self.get_stats()
+        if not stats['rounds']:
+            return
+        spread, period = stats['spread'], stats['period']
+        log_action(f"SOLO clicks: {stats['clicks']} in {stats['rounds']} rounds, "
+                   f"spread p50 {spread['p50_ms']:.2f}ms / p99 {spread['p99_ms']:.2f}ms, "
+                   f"tick lateness p99 {period['p99_ms']:.1f}ms", "system")
+
 def solo_click_loop(log_action, config_path, coords_path):
     _stop_event.clear()
     # Use DPI-unaware context so GetClientRect and WM_LBUTTONDOWN coordinates are always
@@ -60,50 +217,39 @@ def solo_click_loop(log_action, config_path, coords_path):
     log_action(f"SOLO mode thread started at {start_time}", "system")
     log_action(f"SOLO click loop started at {start_time}", "system")
 
-    try:
-        windows = gw.getWindowsWithTitle(instance_name)
-        if not windows:
-            log_action("No windows found to determine click position", "error")
-            return
-
-        win = windows[0]
-        hwnd = win._hWnd
-
-        # Use GetClientRect so the scale ratio matches the CLIENT-relative
-        # coordinate space used by WM_LBUTTONDOWN and coords.ini.
-        # pygetwindow .width/.height returns WINDOW size (includes borders/title bar),
-        # which inflates the scale factor and shifts all clicks down-right.
-        _client_rect = wintypes.RECT()
-        ctypes.windll.user32.GetClientRect(hwnd, ctypes.byref(_client_rect))
-        actual_width  = _client_rect.right  - _client_rect.left
-        actual_height = _client_rect.bottom - _client_rect.top
-
-        # Calculate scaling factors
-        scale_x = actual_width / reference_width
-        scale_y = actual_height / reference_height
+    # Cached window list kept current by window notifications, so the click
+    # loop below never re-enumerates the desktop
+    registry = get_window_registry(instance_name)
 
-        # Scale coordinates
-        rel_x = int(base_x * scale_x)
-        rel_y = int(base_y * scale_y)
+    planner = SoloClickPlanner(registry, (base_x, base_y), (reference_width, reference_height))
 
-        log_action(f"Click position set to {rel_x}x{rel_y} (scaled from {base_x}x{base_y})", "system")
-
-    except Exception as e:
-        log_action(f"Error determining click position: {e}", "error")
+    plans, changed = planner.current()
+    if not plans:
+        log_action("No windows found to determine click position", "error")
         return
 
-    # Main click loop
+    global _dispatcher
+    dispatcher = _dispatcher = SoloClickDispatcher()
+
+    # Main click loop: rounds are scheduled on a fixed grid so the click
+    # time does not drift with the number of clients
+    next_tick = time.perf_counter()
     while not _stop_event.is_set():
-        windows = gw.getWindowsWithTitle(instance_name)
-        for win in windows:
-            try:
-                hwnd = win._hWnd
-                click_in_window(hwnd, rel_x, rel_y)
-            except Exception as e:
-                log_action(f"Error clicking window: {e}", "error")
+        for plan in changed:
+            log_action(f"HWND={plan.hwnd}: click position set to {plan.x}x{plan.y} "
+                       f"(client {plan.client_size[0]}x{plan.client_size[1]}, "
+                       f"scaled from {base_x}x{base_y})", "system")
+        for plan, e in dispatcher.dispatch(plans, late=time.perf_counter() - next_tick):
+            log_action(f"Error clicking window HWND={plan.hwnd}: {e}", "error")
+        next_tick += interval
+        now = time.perf_counter()
+        if next_tick < now:
+            next_tick = now
         # Use event wait so Stop is responsive during the interval sleep
-        _stop_event.wait(interval)
+        _stop_event.wait(next_tick - now)
+        plans, changed = planner.current()
 
+    dispatcher.log_stats(log_action)
     stop_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     log_action(f"SOLO mode stopped at {stop_time}", "system")
 
@@ -114,3 +260,7 @@ def run_solo_mode(log_action, config_path, coords_path):
 def stop_solo_mode():
     _stop_event.set()
     return True
+
+def get_solo_click_stats():
+    """Click jitter statistics of the current (or last) Solo run, or None"""
+    return _dispatcher.get_stats() if _dispatcher else None
@@ -0,0 +1,94 @@
+from cogs.capture_backend import sample_frame_pixels
+
+
+class PixelSamples:
+    """Colors read for a batch of named probe points
+
+    ``colors`` is an (N, 3) uint8 RGB array in the order of ``names``;
+    indexing by name returns that probe's color as an RGB tuple.
+    """
+
+    def __init__(self, names, colors):
+        self.names = list(names)
+        self.colors = colors
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    def __getitem__(self, name):
+        return tuple(int(c) for c in self.colors[self._index[name]])
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __len__(self):
+        return len(self.names)
+
+
+class PixelSampler:
+    """Reads many named probe points with a single capture
+
+    Replaces one get_pixel_color() round trip per point: every sample() call
+    does one batched backend read, so the forced-refresh wait and the DC work
+    are paid once per batch.
+    """
+
+    def __init__(self, capture_backend, probes=None):
+        """
+        Args:
+            capture_backend: CaptureBackend to read pixels from
+            probes: dict of probe name → (x, y) client coordinate
+        """
+        self.capture_backend = capture_backend
+        self.probes = dict(probes or {})
+        self.batches = 0
+        self.points_read = 0
+
+    def add_probe(self, name, point):
+        """Register (or move) a named probe point"""
+        self.probes[name] = point
+
+    def sample(self, hwnd, names=None, force_refresh=True):
+        """Read the named probes (all probes if names is None) in one batch
+
+        Returns:
+            PixelSamples: colors per probe, or None if the read failed
+        """
+        names = list(self.probes) if names is None else list(names)
+        colors = self.sample_points(hwnd, [self.probes[name] for name in names], force_refresh)
+        if colors is None:
+            return None
+        return PixelSamples(names, colors)
+
+    def sample_points(self, hwnd, points, force_refresh=True):
+        """Read raw (x, y) points in one batch
+
+        Returns:
+            numpy.ndarray: (N, 3) uint8 RGB rows, or None if the read failed
+        """
+        colors = self.capture_backend.get_pixels(hwnd, points, force_refresh)
+        self.batches += 1
+        self.points_read += len(points)
+        return colors
+
+    def sample_frame(self, frame, names=None):
+        """Read the named probes from an already captured BGR frame
+
+        Returns:
+            PixelSamples: colors per probe, or None if a probe is outside the frame
+        """
+        names = list(self.probes) if names is None else list(names)
+        colors = sample_frame_pixels(frame, [self.probes[name] for name in names])
+        if colors is None:
+            return None
+        return PixelSamples(names, colors)
+
+    def get_stats(self):
+        """Get sampling counters
+
+        Returns:
+            dict: batches read and total points read
+        """
+        return {
+            'batches': self.batches,
+            'points_read': self.points_read,
+            'points_per_batch': self.points_read / self.batches if self.batches else 0.0
+        }
@@ -0,0 +1,29 @@
+import cv2
+import numpy as np
+
+# Grayscale levels a downsampled cell must move before a region counts as changed
+DEFAULT_CHANGE_THRESHOLD = 3
+
+
+def region_signature(region, size=8):
+    """Cheap fingerprint of a BGR (or grayscale) region
+
+    The region is converted to grayscale and area-averaged down to at most
+    size x size cells, so the signature ignores pixel noise but still moves
+    when a button, overlay or dialog is drawn over the region.
+
+    Returns:
+        numpy.ndarray: int16 array of at most size x size gray levels
+    """
+    gray = region if region.ndim == 2 else cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
+    h, w = gray.shape[:2]
+    if h > size or w > size:
+        gray = cv2.resize(gray, (min(w, size), min(h, size)), interpolation=cv2.INTER_AREA)
+    return gray.astype(np.int16)
+
+
+def signatures_differ(a, b, threshold=DEFAULT_CHANGE_THRESHOLD):
+    """Check if two region signatures differ by more than threshold in any cell"""
+    if a is None or b is None or a.shape != b.shape:
+        return True
+    return int(np.abs(a - b).max()) > threshold
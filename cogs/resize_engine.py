@@ -0,0 +1,313 @@
+import ctypes
+import threading
+import time
+from ctypes import wintypes
+
+SW_RESTORE = 9
+SWP_NOMOVE = 0x0002
+SWP_NOZORDER = 0x0004
+SWP_NOACTIVATE = 0x0010
+SWP_ASYNCWINDOWPOS = 0x4000
+
+
+def _load_resize_api():
+    """Private user32 handle with 64-bit safe prototypes (None off Windows)"""
+    if not hasattr(ctypes, 'WinDLL'):
+        return None
+
+    user32 = ctypes.WinDLL('user32', use_last_error=True)
+    user32.IsIconic.argtypes = [wintypes.HWND]
+    user32.IsIconic.restype = wintypes.BOOL
+    user32.ShowWindowAsync.argtypes = [wintypes.HWND, ctypes.c_int]
+    user32.ShowWindowAsync.restype = wintypes.BOOL
+    user32.GetClientRect.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.RECT)]
+    user32.GetClientRect.restype = wintypes.BOOL
+    user32.GetWindowRect.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.RECT)]
+    user32.GetWindowRect.restype = wintypes.BOOL
+    user32.SetWindowPos.argtypes = [wintypes.HWND, wintypes.HWND, ctypes.c_int, ctypes.c_int,
+                                    ctypes.c_int, ctypes.c_int, wintypes.UINT]
+    user32.SetWindowPos.restype = wintypes.BOOL
+    return user32
+
+
+class Win32ResizeBackend:
+    """Resizes real windows without waiting for them
+
+    SetWindowPos gets SWP_ASYNCWINDOWPOS and restores use ShowWindowAsync,
+    so each call only posts the request to the game's UI thread; a busy or
+    hung client cannot hold up the others. Sizes are whatever the calling
+    thread's DPI context reports (resize_all_clients makes it DPI-unaware).
+    """
+
+    name = 'win32'
+
+    def __init__(self):
+        self.user32 = _load_resize_api()
+
+    def is_minimized(self, hwnd):
+        return bool(self.user32.IsIconic(hwnd))
+
+    def restore(self, hwnd):
+        self.user32.ShowWindowAsync(hwnd, SW_RESTORE)
+
+    def get_client_size(self, hwnd):
+        rect = wintypes.RECT()
+        if not self.user32.GetClientRect(hwnd, ctypes.byref(rect)):
+            return None
+        return rect.right - rect.left, rect.bottom - rect.top
+
+    def get_window_size(self, hwnd):
+        rect = wintypes.RECT()
+        if not self.user32.GetWindowRect(hwnd, ctypes.byref(rect)):
+            return None
+        return rect.right - rect.left, rect.bottom - rect.top
+
+    def set_window_size(self, hwnd, width, height):
+        """Ask for a new WINDOW size (position and z-order kept)"""
+        flags = SWP_NOMOVE | SWP_NOZORDER | SWP_NOACTIVATE | SWP_ASYNCWINDOWPOS
+        return bool(self.user32.SetWindowPos(hwnd, None, 0, 0, width, height, flags))
+
+
+class FakeResizeBackend:
+    """In-memory windows that apply resizes late and in steps, for tests off Windows
+
+    A resize reaches its final size over `steps` intermediate sizes spread
+    across `latency` seconds, and a restore lands after `latency`, the way
+    a busy game client would. Windows given a max_client size never grow
+    past it, to exercise the off-by-N path.
+    """
+
+    name = 'fake'
+
+    def __init__(self, latency=0.05, steps=3):
+        self.latency = latency
+        self.steps = steps
+        self.windows = {}
+        self.calls = {'set_window_size': 0, 'restore': 0, 'get_client_size': 0}
+        self._lock = threading.Lock()
+
+    def add_window(self, hwnd, client_width, client_height, border=(16, 39), minimized=False,
+                   max_client=None, latency=None):
+        self.windows[hwnd] = {
+            'client': (client_width, client_height),
+            'border': border,
+            'minimized': minimized,
+            'max_client': max_client,
+            'latency': self.latency if latency is None else latency,
+        }
+
+    def _later(self, delay, action):
+        timer = threading.Timer(delay, action)
+        timer.daemon = True
+        timer.start()
+
+    def is_minimized(self, hwnd):
+        with self._lock:
+            window = self.windows.get(hwnd)
+            return bool(window and window['minimized'])
+
+    def restore(self, hwnd):
+        self.calls['restore'] += 1
+        window = self.windows[hwnd]
+
+        def restored():
+            with self._lock:
+                window['minimized'] = False
+
+        self._later(window['latency'], restored)
+
+    def get_client_size(self, hwnd):
+        self.calls['get_client_size'] += 1
+        with self._lock:
+            window = self.windows.get(hwnd)
+            if window is None:
+                return None
+            return (0, 0) if window['minimized'] else window['client']
+
+    def get_window_size(self, hwnd):
+        with self._lock:
+            window = self.windows.get(hwnd)
+            if window is None:
+                return None
+            (width, height), (border_w, border_h) = window['client'], window['border']
+            return width + border_w, height + border_h
+
+    def set_window_size(self, hwnd, width, height):
+        self.calls['set_window_size'] += 1
+        window = self.windows.get(hwnd)
+        if window is None:
+            return False
+        border_w, border_h = window['border']
+        target_w, target_h = width - border_w, height - border_h
+        if window['max_client']:
+            target_w = min(target_w, window['max_client'][0])
+            target_h = min(target_h, window['max_client'][1])
+        start_w, start_h = window['client']
+
+        for step in range(1, self.steps + 1):
+            size = (start_w + (target_w - start_w) * step // self.steps,
+                    start_h + (target_h - start_h) * step // self.steps)
+
+            def apply(size=size):
+                with self._lock:
+                    window['client'] = size
+
+            self._later(window['latency'] * step / self.steps, apply)
+        return True
+
+
+class ResizeResult:
+    """What happened to one window during a batch resize"""
+
+    __slots__ = ('hwnd', 'before', 'after', 'target', 'issued', 'settled', 'error')
+
+    def __init__(self, hwnd, target):
+        self.hwnd = hwnd
+        self.target = target
+        self.before = None
+        self.after = None
+        self.issued = False      # a SetWindowPos was sent
+        self.settled = False     # client size stopped changing before the timeout
+        self.error = None
+
+    @property
+    def exact(self):
+        return self.after == self.target
+
+
+class ResizeEngine:
+    """Resizes a batch of windows to one CLIENT size in parallel
+
+    Every restore and every SetWindowPos is issued up front, then a single
+    loop polls all pending windows together until each client size has
+    settled, with one overall timeout for the whole batch. Twelve clients
+    cost about as much wall time as the slowest one instead of the sum of
+    fixed per-window sleeps.
+
+    A window at the target size is settled after stable_polls unchanged
+    polls; one that is off target must hold its size for settle_time, so a
+    resize still in progress is not reported as off by N.
+    """
+
+    def __init__(self, backend=None, poll_interval=0.01, stable_polls=3, settle_time=0.25, timeout=3.0):
+        """
+        Args:
+            backend: Win32ResizeBackend (default) or FakeResizeBackend
+            poll_interval: Seconds between verification polls
+            stable_polls: Unchanged polls needed to accept the target size
+            settle_time: Seconds an off-target size must hold to be accepted
+            timeout: Seconds allowed for the whole batch (restore + resize)
+        """
+        self.backend = backend or Win32ResizeBackend()
+        self.poll_interval = poll_interval
+        self.stable_polls = stable_polls
+        self.settle_time = settle_time
+        self.timeout = timeout
+
+    def resize(self, hwnds, target_client_width, target_client_height):
+        """Bring every hwnd to the target CLIENT size, blocking until done
+
+        Windows already at the target are left alone.
+
+        Returns:
+            list: ResizeResult per hwnd, in input order
+        """
+        steps = self.resize_steps(hwnds, target_client_width, target_client_height)
+        try:
+            while True:
+                time.sleep(next(steps))
+        except StopIteration as done:
+            return done.value
+
+    def resize_steps(self, hwnds, target_client_width, target_client_height):
+        """Step generator form of resize() for callers that must not block
+
+        Yields the seconds to wait before the next poll, so an automation
+        step generator can `yield from` it and stay stoppable.
+
+        Returns:
+            list: ResizeResult per hwnd, in input order
+        """
+        target = (target_client_width, target_client_height)
+        deadline = time.perf_counter() + self.timeout
+        results = [ResizeResult(hwnd, target) for hwnd in hwnds]
+
+        # 1. Restore minimized windows (a minimized client area is 0x0)
+        minimized = []
+        for result in results:
+            try:
+                if self.backend.is_minimized(result.hwnd):
+                    self.backend.restore(result.hwnd)
+                    minimized.append(result)
+            except Exception as e:
+                result.error = e
+        yield from self._wait(minimized, lambda result: not self.backend.is_minimized(result.hwnd), deadline)
+
+        # 2. Issue every resize
+        pending = []
+        for result in results:
+            if result.error:
+                continue
+            try:
+                client = self.backend.get_client_size(result.hwnd)
+                window = self.backend.get_window_size(result.hwnd)
+                if client is None or window is None:
+                    raise RuntimeError("window no longer exists")
+                result.before = result.after = client
+                if client == target:
+                    result.settled = True
+                    continue
+                # Borders stay the same, so the WINDOW size that gives the
+                # target CLIENT size is target + (window - client)
+                width = target[0] + window[0] - client[0]
+                height = target[1] + window[1] - client[1]
+                if not self.backend.set_window_size(result.hwnd, width, height):
+                    raise RuntimeError("SetWindowPos failed")
+                result.issued = True
+                pending.append(result)
+            except Exception as e:
+                result.error = e
+
+        # 3. Verify all of them together
+        yield from self._settle(pending, deadline)
+        return results
+
+    def _wait(self, results, done, deadline):
+        """Poll until done(result) holds for every result or the deadline passes"""
+        waiting = list(results)
+        while waiting and time.perf_counter() < deadline:
+            waiting = [result for result in waiting if not done(result)]
+            if waiting:
+                yield self.poll_interval
+
+    def _settle(self, pending, deadline):
+        stable = {result.hwnd: 0 for result in pending}
+        since = {}
+        waiting = list(pending)
+        while waiting:
+            still = []
+            now = time.perf_counter()
+            for result in waiting:
+                size = self.backend.get_client_size(result.hwnd)
+                if size is None:
+                    result.error = RuntimeError("window closed during resize")
+                    continue
+                if size != result.after:
+                    stable[result.hwnd] = 0
+                    since[result.hwnd] = now
+                else:
+                    stable[result.hwnd] += 1
+                result.after = size
+                if size == result.target:
+                    done = stable[result.hwnd] >= self.stable_polls
+                else:
+                    # Includes the old size, before the window took the request
+                    done = now - since.get(result.hwnd, now) >= self.settle_time and size != result.before
+                if done:
+                    result.settled = True
+                else:
+                    still.append(result)
+            waiting = still
+            if not waiting or time.perf_counter() >= deadline:
+                break
+            yield self.poll_interval
@@ -0,0 +1,167 @@
+import heapq
+import itertools
+import threading
+import time
+import traceback
+
+
+class StepScheduler:
+    """Drives many automation step generators from a single thread
+
+    Each task is a generator that yields the wall-clock seconds it wants to
+    sleep (see RealmRaidAutomation.drive()). Tasks wait in a heap ordered by
+    wake-up time; the scheduler thread sleeps until the earliest one is due,
+    runs it up to its next yield and files it back. Capture and detection
+    work of different clients is interleaved instead of running in parallel
+    threads, so many clients share one core and no client waits longer than
+    the longest single step of the others.
+    """
+
+    # Longest idle wait, so tasks added while sleeping start promptly
+    MAX_IDLE = 0.1
+
+    def __init__(self, stop_event, name="RR-Scheduler", persistent=False):
+        """
+        Args:
+            stop_event: threading.Event that stops every task when set
+            name: Name of the scheduler thread
+            persistent: Keep running with no tasks (until stop_event), so
+                tasks can be added later
+        """
+        self.stop_event = stop_event
+        self.name = name
+        self.persistent = persistent
+        self._heap = []          # (wake_time, seq, key)
+        self._tasks = {}         # key → (generator, on_stop, on_done, stop_event)
+        self._started = set()    # keys that have run their first step
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._thread = None
+        self.steps = 0
+        self.max_lateness = 0.0
+
+    def add(self, key, steps, on_stop=None, on_done=None, delay=0.0, stop_event=None):
+        """Schedule a step generator to start after delay seconds
+
+        A task that is stopped (its own stop_event or the scheduler's)
+        before its first step is finished without ever running.
+
+        Args:
+            key: Task name (e.g. the window HWND)
+            steps: Step generator
+            on_stop: Callable run when stop_event is set, so the task winds down
+            on_done: Callable run after the task has finished
+            delay: Start offset, used to spread clients' phases apart
+            stop_event: threading.Event that stops only this task
+        """
+        with self._lock:
+            self._tasks[key] = (steps, on_stop, on_done, stop_event)
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), key))
+
+    def wake(self, key):
+        """Run a task's next step now instead of at its scheduled time"""
+        with self._lock:
+            if key not in self._tasks:
+                return
+            self._heap = [entry for entry in self._heap if entry[2] != key]
+            heapq.heapify(self._heap)
+            heapq.heappush(self._heap, (time.monotonic(), next(self._seq), key))
+
+    def start(self):
+        """Run the scheduler on its own daemon thread"""
+        self._thread = threading.Thread(target=self.run, daemon=True, name=self.name)
+        self._thread.start()
+        return self._thread
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def task_count(self):
+        with self._lock:
+            return len(self._tasks)
+
+    def run(self):
+        """Step tasks until every one has finished (persistent: until stop_event)"""
+        while True:
+            if self.stop_event.is_set() and not self._stopping:
+                self._stop_all()
+
+            with self._lock:
+                idle = not self._heap
+                if not idle:
+                    wake_time, _, key = self._heap[0]
+            if idle:
+                if not self.persistent or self.stop_event.is_set():
+                    break
+                self.stop_event.wait(self.MAX_IDLE)
+                continue
+
+            # Once stopping, run every task straight through its shutdown
+            delay = 0 if self._stopping else wake_time - time.monotonic()
+            if delay > 0:
+                self.stop_event.wait(min(delay, self.MAX_IDLE))
+                continue
+
+            with self._lock:
+                wake_time, _, key = heapq.heappop(self._heap)
+                steps, _, _, task_stop = self._tasks[key]
+                started = key in self._started
+                self._started.add(key)
+
+            if not started and (self._stopping or (task_stop is not None and task_stop.is_set())):
+                # Stopped while waiting out its start delay: never start it
+                steps.close()
+                self._finish(key)
+                continue
+
+            self.max_lateness = max(self.max_lateness, time.monotonic() - wake_time)
+            self.steps += 1
+            try:
+                delay = steps.send(None)
+            except StopIteration:
+                self._finish(key)
+                continue
+            except Exception as e:
+                print(f"❌ Task {key} crashed: {e}")
+                traceback.print_exc()
+                self._finish(key)
+                continue
+
+            with self._lock:
+                heapq.heappush(self._heap, (time.monotonic() + max(0.0, delay), next(self._seq), key))
+
+    def _stop_all(self):
+        self._stopping = True
+        with self._lock:
+            pending = [key for key in self._tasks if key not in self._started]
+            self._heap = [entry for entry in self._heap if entry[2] in self._started]
+            heapq.heapify(self._heap)
+            callbacks = [task[1] for key, task in self._tasks.items()
+                         if task[1] and key in self._started]
+        # Tasks still in their start delay are finished, not stepped
+        for key in pending:
+            self._tasks[key][0].close()
+            self._finish(key)
+        for on_stop in callbacks:
+            on_stop()
+
+    def _finish(self, key):
+        with self._lock:
+            _, _, on_done, _ = self._tasks.pop(key)
+            self._started.discard(key)
+        if on_done:
+            on_done()
+
+    def get_stats(self):
+        """Get scheduler counters
+
+        Returns:
+            dict: steps run, tasks left and the worst wake-up lateness in seconds
+        """
+        return {
+            'steps': self.steps,
+            'tasks': self.task_count(),
+            'max_lateness': self.max_lateness
+        }
@@ -0,0 +1,384 @@
+import configparser
+import os
+import random
+import threading
+import time
+
+import numpy as np
+
+from cogs.capture_backend import CaptureBackend
+from cogs.grid_matcher import GRID_KEYS
+from cogs.template_registry import get_template_registry
+
+TEMPLATE_FILES = {'ko': 'rr_ko.png', 'fail': 'rr_fail.png', 'froglet': 'rr_froglet.png'}
+
+
+class SimulatorLayout:
+    """Screen coordinates, colors and templates the simulator draws with
+
+    Read from the same coords.ini and template directory as the automation,
+    so what the simulator draws is exactly what the automation looks for.
+    """
+
+    def __init__(self, coords_path, ref_path, width=1136, height=640):
+        """
+        Args:
+            coords_path: Path to coords.ini
+            ref_path: Template directory (cogs/ref)
+            width: Client width in pixels (the reference resolution)
+            height: Client height in pixels
+        """
+        self.width = width
+        self.height = height
+
+        cfg = configparser.ConfigParser()
+        cfg.read(coords_path, encoding='utf-8')
+        rr = cfg['REALM RAID']
+
+        def coord(value):
+            x, y = value.split(',')
+            return int(x.strip()), int(y.strip())
+
+        def bgr(value):
+            hex_str = value.strip().lstrip('#')
+            r, g, b = (int(hex_str[i:i+2], 16) for i in (0, 2, 4))
+            return b, g, r
+
+        self.cells = {key: coord(rr[f'click_{key}_1']) for key in GRID_KEYS}
+        self.join_buttons = {key: coord(rr[f'click_{key}_2']) for key in GRID_KEYS}
+        self.check_end = coord(rr['check_end'])
+        self.click_end = coord(rr['click_end'])
+        self.click_refresh = coord(rr['click_refresh'])
+        self.click_confirm = coord(rr['click_confirm'])
+        self.froglet_click = coord(cfg['SOLO']['click_solo'])
+        self.colors = {
+            'btn': bgr(rr['btn_color']),
+            'cd': bgr(rr['cd_color']),
+            'fail': bgr(rr['fail_color']),
+            'success': bgr(rr['success_color']),
+        }
+
+        registry = get_template_registry()
+        self.templates = {key: registry.get(os.path.join(ref_path, filename))
+                          for key, filename in TEMPLATE_FILES.items()}
+
+        # Dark textured backgrounds: template matching needs texture, and no
+        # pixel in [20, 60] is within tolerance of any palette color
+        rng = np.random.default_rng(0)
+        self.lobby_background = rng.integers(20, 60, size=(height, width, 3), dtype=np.uint8)
+        self.battle_background = rng.integers(20, 60, size=(height, width, 3), dtype=np.uint8)
+
+
+class SimulatedWindow:
+    """One simulated game client showing the Realm Raid page
+
+    The UI is a small state machine driven by the clicks it receives:
+
+    - lobby: the 3x3 grid (KO / fail / froglet templates drawn on their
+      cells) and the refresh button (btn, or cd while refresh is on cooldown)
+    - a clicked available cell expands and shows its join button
+    - join starts a battle while tickets last; otherwise nothing happens
+    - a battle ends after battle_time (froglet battles after loading_time
+      and froglet_clicks clicks) on the end screen, whose check_end pixel
+      is the success or fail color
+    - clicking the end screen returns to the lobby with the cell KO / failed
+    - refresh opens a dialog whose confirm button loads a new page; during
+      the refresh cooldown the confirm button is greyed (cd) and lights up
+      when the cooldown ends
+
+    Every change happens a configurable latency after the click, on
+    simulation time, which runs speed times faster than the wall clock.
+    """
+
+    def __init__(self, hwnd, layout, title="Onmyoji", speed=1.0, tickets=30, layout_states=None,
+                 win_rate=0.8, froglet_chance=0.1, battle_time=8.0, loading_time=3.0,
+                 froglet_clicks=3, refresh_cooldown=0.0, latency=0.3, seed=None):
+        """
+        Args:
+            hwnd: Fake window handle
+            layout: SimulatorLayout
+            title: Window title (for window enumeration)
+            speed: Simulation speed multiplier (1.0 = real time)
+            tickets: Battles that can be joined before the join button stops working
+            layout_states: dict of grid key → 'available' / 'froglet' / 'ko' / 'fail'
+                for the first page (default: random page)
+            win_rate: Chance a normal battle ends in success
+            froglet_chance: Chance a cell of a new page is a froglet
+            battle_time: Mean seconds of a normal battle
+            loading_time: Seconds before a froglet battle accepts clicks
+            froglet_clicks: Clicks needed to finish a froglet battle
+            refresh_cooldown: Seconds the refresh stays on cooldown after a refresh
+            latency: Seconds between a click and the screen reacting to it
+            seed: Random seed (defaults to hwnd, so each client differs but repeats)
+        """
+        self.hwnd = hwnd
+        self.layout = layout
+        self.title = title
+        self.speed = speed
+        self.tickets = tickets
+        self.win_rate = win_rate
+        self.froglet_chance = froglet_chance
+        self.battle_time = battle_time
+        self.loading_time = loading_time
+        self.froglet_clicks = froglet_clicks
+        self.refresh_cooldown = refresh_cooldown
+        self.latency = latency
+        self.rng = random.Random(hwnd if seed is None else seed)
+        self.width = layout.width
+        self.height = layout.height
+        self.closed = False
+
+        self.lock = threading.RLock()
+        self._start = None
+        self._events = []          # (sim time, seq, tag, callable), applied in order
+        self._seq = 0
+        self._version = 0
+        self._frame = None
+        self._frame_version = -1
+
+        self.screen = 'lobby'      # lobby / dialog / battle / end
+        self.expanded = None
+        self.battle = None         # dict for the running battle
+        self.refresh_ready_at = 0.0
+
+        self.clicks = []           # (sim time, x, y)
+        self.pages = []            # sim seconds each finished page took
+        self.page_started = 0.0
+        self.battles = {'success': 0, 'fail': 0}
+        self.grid = dict(layout_states) if layout_states else self._new_page_states()
+
+    def sim_time(self):
+        """Simulation seconds since the first capture or click"""
+        if self._start is None:
+            self._start = time.monotonic()
+        return (time.monotonic() - self._start) * self.speed
+
+    def _after(self, delay, action, tag=None):
+        """Schedule action; a tag that is already pending is not scheduled twice"""
+        if tag and any(event[2] == tag for event in self._events):
+            return
+        self._seq += 1
+        self._events.append((self.sim_time() + delay, self._seq, tag, action))
+        self._events.sort(key=lambda event: event[:2])
+
+    def _advance(self):
+        """Apply every scheduled change that is due"""
+        now = self.sim_time()
+        while self._events and self._events[0][0] <= now:
+            _, _, _, action = self._events.pop(0)
+            action()
+            self._version += 1
+
+    def _new_page_states(self):
+        return {key: 'froglet' if self.rng.random() < self.froglet_chance else 'available'
+                for key in GRID_KEYS}
+
+    def _load_new_page(self):
+        self.grid = self._new_page_states()
+        self.page_started = self.sim_time()
+        self.screen = 'lobby'
+        self.expanded = None
+
+    def _finish_battle(self):
+        key = self.battle['key']
+        result = self.battle['result']
+        self.grid[key] = 'ko' if result == 'success' else 'fail'
+        self.battles[result] += 1
+        self.battle = None
+        self.screen = 'lobby'
+        if all(state in ('ko', 'fail') for state in self.grid.values()):
+            self.pages.append(self.sim_time() - self.page_started)
+
+    def _start_battle(self, key):
+        froglet = self.grid[key] == 'froglet'
+        self.expanded = None
+        self.screen = 'battle'
+        self.battle = {
+            'key': key,
+            'froglet': froglet,
+            'clicks': 0,
+            'ready_at': self.sim_time() + (self.loading_time if froglet else 0.0),
+            'result': 'success' if froglet or self.rng.random() < self.win_rate else 'fail'
+        }
+        if not froglet:
+            self._after(self.battle_time * self.rng.uniform(0.8, 1.2), self._end_battle)
+
+    def _end_battle(self):
+        if self.screen == 'battle':
+            self.screen = 'end'
+
+    @staticmethod
+    def _hit(x, y, point, radius=30):
+        return abs(x - point[0]) <= radius and abs(y - point[1]) <= radius
+
+    def click(self, x, y):
+        """Handle a left click (button up) at client (x, y)"""
+        with self.lock:
+            self._advance()
+            now = self.sim_time()
+            self.clicks.append((now, x, y))
+            layout = self.layout
+
+            if self.screen == 'battle':
+                battle = self.battle
+                if (battle['froglet'] and now >= battle['ready_at']
+                        and self._hit(x, y, layout.froglet_click)):
+                    battle['clicks'] += 1
+                    if battle['clicks'] >= self.froglet_clicks:
+                        self._after(self.latency, self._end_battle, 'end')
+
+            elif self.screen == 'end':
+                self._after(self.latency, self._finish_battle, 'leave')
+
+            elif self.screen == 'dialog':
+                if self._hit(x, y, layout.click_confirm):
+                    self._after(self.latency, self._confirm_refresh, 'refresh')
+
+            elif self.screen == 'lobby':
+                self._click_lobby(x, y, now)
+
+    def _click_lobby(self, x, y, now):
+        layout = self.layout
+        if self.expanded and self._hit(x, y, layout.join_buttons[self.expanded]):
+            if self.tickets > 0:
+                self.tickets -= 1
+                self._after(self.latency, lambda key=self.expanded: self._start_battle(key), 'join')
+            return
+
+        for key, point in layout.cells.items():
+            if self._hit(x, y, point):
+                if self.grid[key] in ('available', 'froglet'):
+                    # Clicking the open cell again collapses it
+                    target = None if self.expanded == key else key
+                    self._after(self.latency, lambda target=target: setattr(self, 'expanded', target), 'expand')
+                return
+
+        if self._hit(x, y, layout.click_refresh) and now >= self.refresh_ready_at:
+            self._after(self.latency, lambda: setattr(self, 'screen', 'dialog'), 'dialog')
+        elif self._hit(x, y, layout.click_confirm) and self.refresh_cooldown_panel(now) == 'btn':
+            self._after(self.latency, self._confirm_refresh, 'refresh')
+
+    def _confirm_refresh(self):
+        self._load_new_page()
+        self.refresh_ready_at = self.sim_time() + self.refresh_cooldown
+
+    def refresh_cooldown_panel(self, now):
+        """Label of the lobby's confirm button: None, or cd / btn around a cooldown"""
+        if self.refresh_cooldown <= 0 or not self.refresh_ready_at:
+            return None
+        return 'cd' if now < self.refresh_ready_at else 'btn'
+
+    def _patch(self, frame, point, label, radius=12):
+        x, y = point
+        frame[max(0, y - radius):y + radius + 1, max(0, x - radius):x + radius + 1] = self.layout.colors[label]
+
+    def render(self):
+        """Current screen as a read-only BGR frame (re-drawn only after a change)"""
+        with self.lock:
+            self._advance()
+            now = self.sim_time()
+            panel = self.refresh_cooldown_panel(now) if self.screen == 'lobby' else None
+            refresh_label = 'cd' if now < self.refresh_ready_at else 'btn'
+            # Cooldowns change the picture without an event
+            version = (self._version, self.screen, self.expanded, refresh_label, panel)
+            if version == self._frame_version:
+                return self._frame
+
+            layout = self.layout
+            if self.screen in ('battle', 'end'):
+                frame = layout.battle_background.copy()
+                if self.screen == 'end':
+                    self._patch(frame, layout.check_end, self.battle['result'])
+            else:
+                frame = layout.lobby_background.copy()
+                for key, state in self.grid.items():
+                    if state == 'available':
+                        continue
+                    template = layout.templates[state]
+                    th, tw = template.shape[:2]
+                    x, y = layout.cells[key]
+                    frame[y - th // 2:y - th // 2 + th, x - tw // 2:x - tw // 2 + tw] = template[:, :, None]
+                if self.expanded:
+                    self._patch(frame, layout.join_buttons[self.expanded], 'btn')
+                self._patch(frame, layout.click_refresh, refresh_label)
+                if self.screen == 'dialog':
+                    self._patch(frame, layout.click_confirm, 'btn')
+                elif panel:
+                    self._patch(frame, layout.click_confirm, panel)
+
+            frame.flags.writeable = False
+            self._frame = frame
+            self._frame_version = version
+            return frame
+
+    def close(self):
+        """Close the window: is_window() turns False and captures fail"""
+        self.closed = True
+
+
+class SimulatorCaptureBackend(CaptureBackend):
+    """Fake window / capture backend over a set of SimulatedWindows
+
+    Captures render the simulated screen and clicks drive it, so the real
+    RealmRaidAutomation state machine runs end-to-end without a game.
+    Delays are shortened by the windows' speed, like the replay backend.
+    """
+
+    name = 'sim'
+    is_live = False
+
+    def __init__(self, windows, speed=1.0):
+        """
+        Args:
+            windows: SimulatedWindow or list of them (one backend may serve several clients)
+            speed: Simulation speed multiplier, must match the windows' speed
+        """
+        if isinstance(windows, SimulatedWindow):
+            windows = [windows]
+        self.windows = {window.hwnd: window for window in windows}
+        self.speed = speed
+        self.captures = 0
+
+    def window(self, hwnd):
+        window = self.windows.get(hwnd)
+        if window is None or window.closed:
+            return None
+        return window
+
+    def capture_frame(self, hwnd):
+        window = self.window(hwnd)
+        if window is None:
+            print(f"  ❌ Simulated window {hwnd} is gone")
+            return None
+        self.captures += 1
+        return window.render()
+
+    def post_button(self, hwnd, x, y, down):
+        window = self.window(hwnd)
+        if window is not None and not down:
+            window.click(x, y)
+
+    def is_window(self, hwnd):
+        return self.window(hwnd) is not None
+
+    def scale_delay(self, seconds):
+        return seconds / self.speed
+
+    def get_client_size(self, hwnd):
+        """Client (width, height) of a simulated window"""
+        window = self.windows[hwnd]
+        return window.width, window.height
+
+
+def create_simulated_clients(count, coords_path, ref_path, speed=1.0, first_hwnd=1001, **window_options):
+    """Build count simulated windows sharing one layout
+
+    Returns:
+        list: (SimulatedWindow, SimulatorCaptureBackend) per client
+    """
+    layout = SimulatorLayout(coords_path, ref_path)
+    clients = []
+    for index in range(count):
+        window = SimulatedWindow(first_hwnd + index, layout, speed=speed, **window_options)
+        clients.append((window, SimulatorCaptureBackend(window, speed=speed)))
+    return clients
@@ -0,0 +1,193 @@
+import threading
+import time
+
+
+class LatencyHistogram:
+    """HDR-style latency histogram with fixed relative precision
+
+    Values are recorded in microseconds into log-linear buckets: every
+    power-of-two range is split into linear buckets keeping the top
+    SUB_BITS bits of the value, so any value is stored within 1/128 (under
+    1%) of its true value whatever its magnitude. Recording is a handful of
+    integer operations; buckets are kept in a sparse dict.
+    """
+
+    SUB_BITS = 8
+    SUB_BUCKETS = 1 << SUB_BITS
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def record(self, seconds):
+        """Add one latency given in seconds"""
+        value = int(seconds * 1_000_000)
+        if value < 0:
+            value = 0
+        shift = value.bit_length() - self.SUB_BITS
+        index = (shift << self.SUB_BITS) + (value >> shift) if shift > 0 else value
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value
+        if self.min_us is None or value < self.min_us:
+            self.min_us = value
+        if value > self.max_us:
+            self.max_us = value
+
+    def bucket_value(self, index):
+        """Lowest microsecond value stored in bucket index"""
+        shift, sub = divmod(index, self.SUB_BUCKETS)
+        return sub << shift
+
+    def percentile(self, percent):
+        """Latency in microseconds below which percent of the samples fall"""
+        if not self.count:
+            return 0
+        target = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                return min(self.bucket_value(index), self.max_us)
+        return self.max_us
+
+    def merge(self, other):
+        """Add another histogram's samples to this one"""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None and (self.min_us is None or other.min_us < self.min_us):
+            self.min_us = other.min_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def summary(self):
+        """Count, mean, p50/p90/p99, max and total, in milliseconds"""
+        return {
+            'count': self.count,
+            'mean_ms': self.total_us / self.count / 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(50) / 1000,
+            'p90_ms': self.percentile(90) / 1000,
+            'p99_ms': self.percentile(99) / 1000,
+            'max_ms': self.max_us / 1000,
+            'total_s': self.total_us / 1_000_000,
+        }
+
+
+class _NullStage:
+    """Stage used while timing is disabled: does nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('timer', 'name', 'start')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timer.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class StageSequence:
+    """Times consecutive steps of one operation (e.g. one match)
+
+    enter() closes the running step and opens the next; close() ends the
+    last one and records the whole operation as '<prefix>.total'.
+    """
+
+    def __init__(self, timer, prefix):
+        self.timer = timer
+        self.prefix = prefix
+        self.step = None
+        self.start = self.step_start = time.perf_counter() if timer.enabled else 0.0
+
+    def enter(self, step):
+        if not self.timer.enabled:
+            return
+        now = time.perf_counter()
+        if self.step:
+            self.timer.record(f"{self.prefix}.{self.step}", now - self.step_start)
+        self.step, self.step_start = step, now
+
+    def close(self):
+        if not self.timer.enabled:
+            return
+        self.enter(None)
+        self.timer.record(f"{self.prefix}.total", time.perf_counter() - self.start)
+
+
+class StageTimer:
+    """Per-client latency histograms keyed by stage name
+
+    With enabled False, stage() hands out a shared no-op context manager and
+    record() returns at once, so instrumented hot paths cost one attribute
+    check. Histograms live in memory; snapshot() copies their summaries and
+    may be called from any thread.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """Context manager recording the time spent inside it under name"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def sequence(self, prefix):
+        """StageSequence recording '<prefix>.<step>' stages"""
+        return StageSequence(self, prefix)
+
+    def record(self, name, seconds):
+        """Add one latency (in seconds) to a stage"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def snapshot(self):
+        """Summary of every stage so far
+
+        Returns:
+            dict: stage name → summary (see LatencyHistogram.summary)
+        """
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+
+    def dump(self, title="Stage timings"):
+        """Print the snapshot as a table"""
+        snapshot = self.snapshot()
+        if not snapshot:
+            return
+        print(f"\n📊 {title}")
+        print(f"   {'stage':<30}{'count':>7}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'total':>9}")
+        for name, s in snapshot.items():
+            print(f"   {name:<30}{s['count']:>7}{s['mean_ms']:>7.1f}ms{s['p50_ms']:>7.1f}ms"
+                  f"{s['p90_ms']:>7.1f}ms{s['p99_ms']:>7.1f}ms{s['max_ms']:>7.1f}ms{s['total_s']:>8.1f}s")
@@ -0,0 +1,106 @@
+import os
+import threading
+import cv2
+import numpy as np
+
+
+def decode_grayscale(path):
+    """Decode an image file to grayscale - UNICODE PATH SAFE
+
+    cv2.imread() fails silently with non-ASCII paths (Chinese, etc.), so the
+    file is read by Python and decoded from a buffer.
+    """
+    with open(path, 'rb') as f:
+        data = np.frombuffer(f.read(), np.uint8)
+
+    image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError(f"Failed to decode template: {path}")
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+class TemplateRegistry:
+    """Process-wide cache of decoded grayscale template images
+
+    Each file is decoded once, on first request, and the read-only array is
+    shared by every caller. A request re-stats the file and decodes it again
+    only if its modification time or size changed, so edited templates are
+    picked up without a restart. Safe to use from several automation threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}   # absolute path → ((mtime_ns, size), image)
+        self.loads = 0
+        self.hits = 0
+
+    def get(self, path):
+        """Get the grayscale template stored at path
+
+        Returns:
+            numpy.ndarray: Read-only grayscale image shared by all callers
+
+        Raises:
+            FileNotFoundError: The file does not exist
+            ValueError: The file is not a decodable image
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+
+            image = decode_grayscale(path)
+            image.flags.writeable = False
+            self._entries[path] = (version, image)
+            self.loads += 1
+            return image
+
+    def get_many(self, directory, filenames):
+        """Get several templates from one directory
+
+        Args:
+            directory: Template directory
+            filenames: dict of template key → file name
+
+        Returns:
+            dict: template key → read-only grayscale image
+        """
+        return {key: self.get(os.path.join(directory, filename))
+                for key, filename in filenames.items()}
+
+    def clear(self):
+        """Forget every cached template (the next get() decodes again)"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """Get cache counters
+
+        Returns:
+            dict: files cached, decodes performed and requests served from cache
+        """
+        with self._lock:
+            return {
+                'templates': len(self._entries),
+                'loads': self.loads,
+                'hits': self.hits
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_template_registry():
+    """Get the process-wide TemplateRegistry, creating it on first use"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = TemplateRegistry()
+    return _registry
@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+import numpy as np
+
+try:
+    import win32api
+    import win32con
+    import win32gui
+    import win32process
+except ImportError:
+    win32api = win32con = win32gui = win32process = None
+
+# Every automation instance in the process saves into the same file
+_file_lock = threading.Lock()
+
+
+def client_key(hwnd):
+    """Stable name for the game client behind hwnd
+
+    HWNDs change every time the game starts, so profiles are keyed by the
+    client's executable path and window title instead. Falls back to the
+    HWND when the process cannot be queried.
+    """
+    if win32gui is None:
+        return f"hwnd:{hwnd}"
+    try:
+        title = win32gui.GetWindowText(hwnd)
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        handle = win32api.OpenProcess(
+            win32con.PROCESS_QUERY_LIMITED_INFORMATION, False, pid
+        )
+        try:
+            exe = win32process.GetModuleFileNameEx(handle, 0)
+        finally:
+            win32api.CloseHandle(handle)
+        return f"{exe}|{title}"
+    except Exception:
+        return f"hwnd:{hwnd}"
+
+
+class TimingProfile:
+    """Learned per-client latency of each UI transition
+
+    Every completed wait records how long the transition took (in automation
+    seconds, so replay speed does not skew it). Once a transition has
+    MIN_SAMPLES samples its wait budget becomes the BUDGET_PERCENTILE
+    latency times BUDGET_MARGIN, clamped between MIN_BUDGET_FACTOR and
+    MAX_BUDGET_FACTOR times the hardcoded constant. Samples and their
+    percentiles are saved to a JSON file shared by all clients.
+
+    Clients of one game install share a key (same exe and title), so
+    save() merges the samples recorded since the last save into the stored
+    entry instead of replacing it; clients running in parallel add to one
+    profile rather than overwriting each other.
+    """
+
+    TRANSITIONS = ('expand', 'join', 'lobby_return', 'refresh', 'confirm')
+    MAX_SAMPLES = 200
+    MIN_SAMPLES = 5
+    BUDGET_PERCENTILE = 95
+    BUDGET_MARGIN = 1.5
+    MIN_BUDGET_FACTOR = 0.5
+    MAX_BUDGET_FACTOR = 3.0
+
+    def __init__(self, path, key):
+        """
+        Args:
+            path: JSON file holding the profiles of every client
+            key: This client's name in the file (see client_key())
+        """
+        self.path = path
+        self.key = key
+        self.samples = {transition: [] for transition in self.TRANSITIONS}
+        # Samples recorded since the last save, merged into the file by save()
+        self.unsaved = {transition: [] for transition in self.TRANSITIONS}
+        self.load()
+
+    def load(self):
+        """Load this client's samples from disk (missing or bad file = empty)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            stored = data.get('clients', {}).get(self.key, {})
+        except (OSError, ValueError):
+            return
+
+        for transition in self.TRANSITIONS:
+            samples = stored.get(transition, {}).get('samples', [])
+            self.samples[transition] = [float(s) for s in samples][-self.MAX_SAMPLES:]
+
+    def save(self):
+        """Merge this client's new samples and percentiles into the profile file"""
+        with _file_lock:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+
+            entry = data.setdefault('clients', {}).setdefault(self.key, {})
+            for transition, new in self.unsaved.items():
+                stored = [float(s) for s in entry.get(transition, {}).get('samples', [])]
+                merged = (stored + new)[-self.MAX_SAMPLES:]
+                if merged:
+                    self.samples[transition] = merged
+                    entry[transition] = dict(self.percentiles(transition), samples=merged)
+                new.clear()
+
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def record(self, transition, seconds):
+        """Add one observed latency for transition"""
+        value = round(float(seconds), 3)
+        samples = self.samples.setdefault(transition, [])
+        samples.append(value)
+        del samples[:-self.MAX_SAMPLES]
+        self.unsaved.setdefault(transition, []).append(value)
+
+    def percentiles(self, transition):
+        """p50/p90/p95 latency of transition (empty dict without samples)"""
+        samples = self.samples.get(transition)
+        if not samples:
+            return {}
+        p50, p90, p95 = np.percentile(samples, (50, 90, 95))
+        return {'count': len(samples), 'p50': round(float(p50), 3),
+                'p90': round(float(p90), 3), 'p95': round(float(p95), 3)}
+
+    def budget(self, transition, default):
+        """Wait budget for transition, or default until enough samples exist"""
+        samples = self.samples.get(transition)
+        if not samples or len(samples) < self.MIN_SAMPLES:
+            return default
+        learned = float(np.percentile(samples, self.BUDGET_PERCENTILE)) * self.BUDGET_MARGIN
+        # A floor relative to the hand-tuned constant: a budget far below it
+        # turns a slow click into a timeout (three in a row end the run)
+        return min(max(learned, default * self.MIN_BUDGET_FACTOR), default * self.MAX_BUDGET_FACTOR)
@@ -1,19 +1,19 @@
-import pygetwindow as gw
 import configparser
-import win32gui
+from cogs.window_registry import get_window_registry
 
 class WindowFetcher:
-    def __init__(self, config_path):
+    def __init__(self, config_path, registry=None):
         self.config_path = config_path
         self.config = configparser.ConfigParser()
         self.config.read(self.config_path, encoding='utf-8') 
         self.instance_name = self.config.get('GLOBAL', 'instance', fallback='')
+        # Cached, event-driven window list shared with the automation modes
+        self.registry = registry or get_window_registry(self.instance_name)
     
     def get_all_windows(self):
-        """Get all windows matching the EXACT instance name"""
+        """Get all windows matching the EXACT instance name (from the registry cache)"""
         try:
-            all_windows = gw.getAllWindows()
-            windows = [win for win in all_windows 
+            windows = [win for win in self.registry.list() 
                       if win.title == self.instance_name 
                       and win.visible 
                       and win._hWnd]
@@ -128,17 +128,14 @@ class WindowFetcher:
     
     def get_window_by_hwnd(self, hwnd):
         """Get window object by HWND"""
-        try:
-            windows = self.get_all_windows()
-            for win in windows:
-                if win._hWnd == hwnd:
-                    return win
-            return None
-        except Exception:
+        win = self.registry.get(hwnd)
+        if win is None or win.title != self.instance_name:
             return None
+        return win
     
     def refresh_windows(self):
         """Force refresh of window list (sorted)"""
+        self.registry.refresh()
         return self.get_all_windows_sorted()
     
     def get_window_count(self):
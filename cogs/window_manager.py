@@ -1,19 +1,23 @@
 import configparser
-import pygetwindow as gw
 import time
 import ctypes
-from ctypes import wintypes
+from cogs.resize_engine import ResizeEngine
+from cogs.window_registry import get_window_registry
 
-def resize_all_clients(log_action, config_path=None, *, action_label="Resizing client windows"):
+def resize_all_clients(log_action, config_path=None, *, action_label="Resizing client windows", engine=None):
     """Resize windows to target CLIENT width (not window width)
 
+    All windows are resized in parallel by a ResizeEngine: every request
+    is issued up front and the sizes are verified together.
+
     Args:
         log_action: Logging callback function
         config_path: Path to config.ini (optional, defaults to 'config.ini')
         action_label: Label for the action in logs
+        engine: ResizeEngine to use (defaults to one on the live desktop)
     """
     # DPI_AWARENESS_CONTEXT_UNAWARE: all Win32 calls (GetClientRect, GetWindowRect,
-    # SetWindowPos via pygetwindow.resizeTo) operate in virtual 96-DPI space so that
+    # SetWindowPos) operate in virtual 96-DPI space so that
     # target_client_width from config.ini (a virtual pixel value) compares and is applied
     # correctly on any monitor DPI or screen scaling factor.
     try:
@@ -39,8 +43,8 @@ def resize_all_clients(log_action, config_path=None, *, action_label="Resizing c
             log_action("Error: No instance name configured in config.ini", 'error')
             return False
 
-        # Use getWindowsWithTitle for PARTIAL matching (substring search)
-        windows = gw.getWindowsWithTitle(instance_name)
+        # Cached window list (PARTIAL title match, like getWindowsWithTitle)
+        windows = get_window_registry(instance_name).list()
         
         if not windows:
             log_action(f"No windows found with title containing: '{instance_name}'", 'error')
@@ -60,72 +64,42 @@ def resize_all_clients(log_action, config_path=None, *, action_label="Resizing c
         )
         log_action(f"Found {len(windows)} window(s) matching: '{instance_name}'", 'system')
 
+        engine = engine or ResizeEngine()
+        titles = {window._hWnd: window.title for window in windows}
+        start = time.perf_counter()
+        results = engine.resize(list(titles), target_client_width, target_client_height)
+        elapsed = time.perf_counter() - start
+
         resized_count = 0
-        user32 = ctypes.windll.user32
-        
-        for window in windows:
-            try:
-                if window.isMinimized:
-                    window.restore()
-                    time.sleep(0.1)
+        for result in results:
+            title = titles[result.hwnd]
+            if result.error:
+                log_action(f"Error resizing window '{title}': {result.error}", 'error')
+                continue
 
-                hwnd = window._hWnd
-                
-                # Get current CLIENT rect
-                client_rect = wintypes.RECT()
-                user32.GetClientRect(hwnd, ctypes.byref(client_rect))
-                current_client_w = client_rect.right - client_rect.left
-                current_client_h = client_rect.bottom - client_rect.top
-                
-                # Get current WINDOW rect
-                window_rect = wintypes.RECT()
-                user32.GetWindowRect(hwnd, ctypes.byref(window_rect))
-                current_window_w = window_rect.right - window_rect.left
-                current_window_h = window_rect.bottom - window_rect.top
-                
-                # Calculate border sizes
-                border_total_w = current_window_w - current_client_w
-                border_total_h = current_window_h - current_client_h
-                
-                # Calculate required WINDOW size to achieve target CLIENT size
-                target_window_w = target_client_width + border_total_w
-                target_window_h = target_client_height + border_total_h
-                
+            resized_count += 1
+            actual_client_w, actual_client_h = result.after
+            if not result.issued:
                 log_action(
-                    f"'{window.title[:30]}...': CLIENT {current_client_w}x{current_client_h} → "
-                    f"{target_client_width}x{target_client_height}", 
+                    f"'{title[:30]}...': CLIENT already {actual_client_w}x{actual_client_h}", 
                     'info'
                 )
-                
-                # Resize using pygetwindow (sets WINDOW size)
-                window.resizeTo(target_window_w, target_window_h)
-                time.sleep(0.2)
-                
-                # Verify actual CLIENT size achieved
-                user32.GetClientRect(hwnd, ctypes.byref(client_rect))
-                actual_client_w = client_rect.right - client_rect.left
-                actual_client_h = client_rect.bottom - client_rect.top
-                
-                resized_count += 1
-                
-                if actual_client_w == target_client_width and actual_client_h == target_client_height:
-                    log_action(
-                        f"✓ Window resized: CLIENT {actual_client_w}x{actual_client_h} (exact)", 
-                        'success'
-                    )
-                else:
-                    log_action(
-                        f"⚠ Window resized: CLIENT {actual_client_w}x{actual_client_h} "
-                        f"(off by {actual_client_w - target_client_width}x{actual_client_h - target_client_height})", 
-                        'error'
-                    )
-
-            except Exception as e:
-                log_action(f"Error resizing window '{window.title}': {str(e)}", 'error')
-                continue
+            elif result.exact:
+                log_action(
+                    f"✓ Window resized: CLIENT {result.before[0]}x{result.before[1]} → "
+                    f"{actual_client_w}x{actual_client_h} (exact)", 
+                    'success'
+                )
+            else:
+                log_action(
+                    f"⚠ Window resized: CLIENT {actual_client_w}x{actual_client_h} "
+                    f"(off by {actual_client_w - target_client_width}x{actual_client_h - target_client_height}"
+                    f"{'' if result.settled else ', still changing at timeout'})", 
+                    'error'
+                )
 
         if resized_count > 0:
-            log_action(f"Successfully resized {resized_count} window(s)", 'success')
+            log_action(f"Successfully resized {resized_count} window(s) in {elapsed:.2f}s", 'success')
             return True
         else:
             log_action("No windows were resized", 'error')
@@ -0,0 +1,496 @@
+import contextlib
+import ctypes
+import sys
+import threading
+from ctypes import wintypes
+
+# Changes a window source reports to the registry
+CREATED = 'created'        # window created, shown or renamed
+DESTROYED = 'destroyed'    # window destroyed or hidden
+MOVED = 'moved'            # window moved, resized, minimized or restored
+
+EVENT_SYSTEM_MINIMIZESTART = 0x0016
+EVENT_SYSTEM_MINIMIZEEND = 0x0017
+EVENT_OBJECT_CREATE = 0x8000
+EVENT_OBJECT_DESTROY = 0x8001
+EVENT_OBJECT_SHOW = 0x8002
+EVENT_OBJECT_HIDE = 0x8003
+EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+EVENT_OBJECT_NAMECHANGE = 0x800C
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+WM_QUIT = 0x0012
+
+EVENT_KINDS = {
+    EVENT_OBJECT_CREATE: CREATED,
+    EVENT_OBJECT_SHOW: CREATED,
+    EVENT_OBJECT_NAMECHANGE: CREATED,
+    EVENT_OBJECT_DESTROY: DESTROYED,
+    EVENT_OBJECT_HIDE: DESTROYED,
+    EVENT_OBJECT_LOCATIONCHANGE: MOVED,
+    EVENT_SYSTEM_MINIMIZESTART: MOVED,
+    EVENT_SYSTEM_MINIMIZEEND: MOVED,
+}
+
+
+class WindowInfo:
+    """Cached snapshot of one top-level window
+
+    Carries the pygetwindow attributes the rest of the app reads (_hWnd,
+    title, left, top, width, height, visible, isMinimized) so it can stand
+    in for a gw window object, plus the client size.
+    """
+
+    __slots__ = ('hwnd', 'title', 'left', 'top', 'width', 'height',
+                 'client_width', 'client_height', 'visible', 'isMinimized')
+
+    def __init__(self, hwnd, title, left=0, top=0, width=0, height=0,
+                 client_width=0, client_height=0, visible=True, minimized=False):
+        self.hwnd = hwnd
+        self.title = title
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.client_width = client_width
+        self.client_height = client_height
+        self.visible = visible
+        self.isMinimized = minimized
+
+    @property
+    def _hWnd(self):
+        return self.hwnd
+
+    @property
+    def client_size(self):
+        return self.client_width, self.client_height
+
+    def __repr__(self):
+        return (f"WindowInfo(hwnd={self.hwnd}, title={self.title!r}, "
+                f"pos=({self.left}, {self.top}), client={self.client_width}x{self.client_height})")
+
+
+class WindowSource:
+    """Where a WindowRegistry reads windows from"""
+
+    name = 'base'
+
+    def enumerate(self, match):
+        """WindowInfo for every visible top-level window whose title passes match"""
+        raise NotImplementedError
+
+    def query(self, hwnd):
+        """Fresh WindowInfo for hwnd, or None if it no longer exists"""
+        raise NotImplementedError
+
+    def watch(self, callback):
+        """Start calling callback(kind, hwnd) on window changes
+
+        Returns:
+            bool: False if this source cannot notify (the registry polls instead)
+        """
+        return False
+
+    def unwatch(self):
+        pass
+
+
+def _load_window_api():
+    """Private user32/kernel32 handles with 64-bit safe prototypes (None off Windows)"""
+    if not hasattr(ctypes, 'WinDLL'):
+        return None, None, None
+
+    user32 = ctypes.WinDLL('user32', use_last_error=True)
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+
+    enum_proc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    user32.EnumWindows.argtypes = [enum_proc, wintypes.LPARAM]
+    user32.EnumWindows.restype = wintypes.BOOL
+    user32.GetWindowTextLengthW.argtypes = [wintypes.HWND]
+    user32.GetWindowTextLengthW.restype = ctypes.c_int
+    user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+    user32.GetWindowTextW.restype = ctypes.c_int
+    user32.IsWindowVisible.argtypes = [wintypes.HWND]
+    user32.IsWindowVisible.restype = wintypes.BOOL
+    user32.IsIconic.argtypes = [wintypes.HWND]
+    user32.IsIconic.restype = wintypes.BOOL
+    user32.GetWindowRect.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.RECT)]
+    user32.GetWindowRect.restype = wintypes.BOOL
+    user32.GetClientRect.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.RECT)]
+    user32.GetClientRect.restype = wintypes.BOOL
+    user32.GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT]
+    user32.GetMessageW.restype = wintypes.BOOL
+    user32.TranslateMessage.argtypes = [ctypes.POINTER(wintypes.MSG)]
+    user32.DispatchMessageW.argtypes = [ctypes.POINTER(wintypes.MSG)]
+    user32.PostThreadMessageW.argtypes = [wintypes.DWORD, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+    user32.PostThreadMessageW.restype = wintypes.BOOL
+    user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+    user32.UnhookWinEvent.restype = wintypes.BOOL
+    if hasattr(user32, 'SetThreadDpiAwarenessContext'):   # Windows 10 1607+
+        user32.SetThreadDpiAwarenessContext.argtypes = [ctypes.c_void_p]
+        user32.SetThreadDpiAwarenessContext.restype = ctypes.c_void_p
+    kernel32.GetCurrentThreadId.restype = wintypes.DWORD
+    return user32, kernel32, enum_proc
+
+
+class Win32WindowSource(WindowSource):
+    """Live desktop windows, updated from SetWinEventHook notifications
+
+    The hooks run out of context on a dedicated thread with its own message
+    loop; Windows queues the events there, so the callback costs the game
+    processes nothing. Every read is made in the DPI-unaware context, like
+    the click threads, whichever thread calls it (the GUI thread is
+    per-monitor aware), so cached geometry is always in the same virtual
+    96-DPI space.
+    """
+
+    name = 'win32'
+
+    def __init__(self):
+        self.user32, self.kernel32, self._enum_proc_type = _load_window_api()
+        self._callback = None
+        self._thread = None
+        self._thread_id = None
+        self._proc = None
+        self._hooked = False
+
+    @contextlib.contextmanager
+    def _dpi_unaware(self):
+        """Run the block DPI-unaware, then restore the thread's previous context"""
+        set_context = getattr(self.user32, 'SetThreadDpiAwarenessContext', None)
+        previous = set_context(ctypes.c_void_p(-1)) if set_context else None
+        try:
+            yield
+        finally:
+            if previous:
+                set_context(ctypes.c_void_p(previous))
+
+    def _title(self, hwnd):
+        length = self.user32.GetWindowTextLengthW(hwnd)
+        if length <= 0:
+            return ''
+        buffer = ctypes.create_unicode_buffer(length + 1)
+        self.user32.GetWindowTextW(hwnd, buffer, length + 1)
+        return buffer.value
+
+    def _info(self, hwnd, title):
+        rect = wintypes.RECT()
+        if not self.user32.GetWindowRect(hwnd, ctypes.byref(rect)):
+            return None
+        client = wintypes.RECT()
+        self.user32.GetClientRect(hwnd, ctypes.byref(client))
+        return WindowInfo(
+            hwnd, title, rect.left, rect.top, rect.right - rect.left, rect.bottom - rect.top,
+            client.right - client.left, client.bottom - client.top,
+            visible=bool(self.user32.IsWindowVisible(hwnd)),
+            minimized=bool(self.user32.IsIconic(hwnd))
+        )
+
+    def enumerate(self, match):
+        if self.user32 is None:
+            return []
+        hwnds = []
+
+        def found(hwnd, _):
+            if self.user32.IsWindowVisible(hwnd):
+                hwnds.append(hwnd)
+            return True
+
+        windows = []
+        with self._dpi_unaware():
+            self.user32.EnumWindows(self._enum_proc_type(found), 0)
+            for hwnd in hwnds:
+                title = self._title(hwnd)
+                if match(title):
+                    info = self._info(hwnd, title)
+                    if info:
+                        windows.append(info)
+        return windows
+
+    def query(self, hwnd):
+        if self.user32 is None:
+            return None
+        with self._dpi_unaware():
+            return self._info(hwnd, self._title(hwnd))
+
+    def watch(self, callback):
+        if self.user32 is None:
+            return False
+        self._callback = callback
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._pump, args=(ready,), daemon=True, name='WindowEvents')
+        self._thread.start()
+        ready.wait(2.0)
+        return self._hooked
+
+    def unwatch(self):
+        if self._thread and self._thread_id:
+            self.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def _pump(self, ready):
+        """Install the hooks and run the message loop that delivers them"""
+        self._thread_id = self.kernel32.GetCurrentThreadId()
+        proc_type = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                       wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        self.user32.SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE,
+                                                proc_type, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+        self.user32.SetWinEventHook.restype = wintypes.HANDLE
+        # Keep a reference: Windows calls this pointer for as long as the hooks live
+        self._proc = proc_type(self._on_event)
+        flags = WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS
+        ranges = [
+            (EVENT_OBJECT_CREATE, EVENT_OBJECT_HIDE),
+            (EVENT_OBJECT_LOCATIONCHANGE, EVENT_OBJECT_NAMECHANGE),
+            (EVENT_SYSTEM_MINIMIZESTART, EVENT_SYSTEM_MINIMIZEEND),
+        ]
+        hooks = [self.user32.SetWinEventHook(low, high, None, self._proc, 0, 0, flags) for low, high in ranges]
+        self._hooked = all(hooks)
+        ready.set()
+
+        if self._hooked:
+            msg = wintypes.MSG()
+            while self.user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                self.user32.TranslateMessage(ctypes.byref(msg))
+                self.user32.DispatchMessageW(ctypes.byref(msg))
+
+        for hook in hooks:
+            if hook:
+                self.user32.UnhookWinEvent(hook)
+
+    def _on_event(self, hook, event, hwnd, id_object, id_child, event_thread, event_time):
+        if id_object != OBJID_WINDOW or id_child != CHILDID_SELF or not hwnd:
+            return
+        kind = EVENT_KINDS.get(event)
+        if kind is None:
+            return
+        try:
+            self._callback(kind, hwnd)
+        except Exception as e:
+            print(f"⚠️  Window event error: {e}", file=sys.stderr)
+
+
+class FakeWindowSource(WindowSource):
+    """In-memory windows for tests and benchmarks off Windows
+
+    open/move/close/minimize change the fake desktop and notify the
+    registry at once, like the WinEvent hooks would. With event_driven
+    False, watch() refuses so the registry falls back to polling.
+    """
+
+    name = 'fake'
+
+    def __init__(self, event_driven=True):
+        self.event_driven = event_driven
+        self.windows = {}
+        self.enumerations = 0
+        self.queries = 0
+        self._callback = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _copy(info):
+        return WindowInfo(info.hwnd, info.title, info.left, info.top, info.width, info.height,
+                          info.client_width, info.client_height, info.visible, info.isMinimized)
+
+    def enumerate(self, match):
+        self.enumerations += 1
+        with self._lock:
+            windows = list(self.windows.values())
+        return [self._copy(info) for info in windows if info.visible and match(info.title)]
+
+    def query(self, hwnd):
+        self.queries += 1
+        with self._lock:
+            info = self.windows.get(hwnd)
+        return self._copy(info) if info else None
+
+    def watch(self, callback):
+        if not self.event_driven:
+            return False
+        self._callback = callback
+        return True
+
+    def unwatch(self):
+        self._callback = None
+
+    def _notify(self, kind, hwnd):
+        if self._callback:
+            self._callback(kind, hwnd)
+
+    def open(self, hwnd, title, left=0, top=0, client_width=1136, client_height=640, border=(16, 39)):
+        """Create a visible window with the given client size"""
+        info = WindowInfo(hwnd, title, left, top, client_width + border[0], client_height + border[1],
+                          client_width, client_height)
+        with self._lock:
+            self.windows[hwnd] = info
+        self._notify(CREATED, hwnd)
+        return info
+
+    def move(self, hwnd, left=None, top=None, client_width=None, client_height=None):
+        """Move and/or resize a window (client size kept unless given)"""
+        with self._lock:
+            info = self.windows[hwnd]
+            border_w, border_h = info.width - info.client_width, info.height - info.client_height
+            info.left = info.left if left is None else left
+            info.top = info.top if top is None else top
+            info.client_width = info.client_width if client_width is None else client_width
+            info.client_height = info.client_height if client_height is None else client_height
+            info.width, info.height = info.client_width + border_w, info.client_height + border_h
+        self._notify(MOVED, hwnd)
+
+    def minimize(self, hwnd, minimized=True):
+        with self._lock:
+            self.windows[hwnd].isMinimized = minimized
+        self._notify(MOVED, hwnd)
+
+    def rename(self, hwnd, title):
+        with self._lock:
+            self.windows[hwnd].title = title
+        self._notify(CREATED, hwnd)
+
+    def close(self, hwnd):
+        with self._lock:
+            self.windows.pop(hwnd, None)
+        self._notify(DESTROYED, hwnd)
+
+
+class WindowRegistry:
+    """HWND-indexed cache of the windows whose title contains a name
+
+    The desktop is enumerated once on start(); after that the source's
+    create/destroy/move notifications update single entries, so lookups
+    are dict reads and nothing re-enumerates per tick. Sources that cannot
+    notify are re-enumerated every poll_interval on a background thread
+    instead. version goes up on every change, so callers can cheaply tell
+    whether anything they derived from the windows is stale.
+    """
+
+    def __init__(self, title, source=None, poll_interval=1.0):
+        """
+        Args:
+            title: Substring the window title must contain (like gw.getWindowsWithTitle)
+            source: WindowSource (defaults to the live desktop)
+            poll_interval: Seconds between re-enumerations when the source cannot notify
+        """
+        self.title = title
+        self.source = source or Win32WindowSource()
+        self.poll_interval = poll_interval
+        self.windows = {}
+        self.version = 0
+        self.event_driven = False
+        self.started = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._poller = None
+
+    def matches(self, title):
+        return bool(self.title) and self.title in title
+
+    def start(self):
+        """Enumerate once and start following changes"""
+        if self.started:
+            return self
+        self.started = True
+        self.refresh()
+        self.event_driven = self.source.watch(self._on_event)
+        if not self.event_driven:
+            self._stop_event.clear()
+            self._poller = threading.Thread(target=self._poll, daemon=True, name='WindowPoller')
+            self._poller.start()
+        print(f"🪟 Window registry for '{self.title}': {len(self.windows)} window(s), "
+              f"{'event-driven' if self.event_driven else f'polling every {self.poll_interval:g}s'} "
+              f"({self.source.name})", file=sys.stderr)
+        return self
+
+    def stop(self):
+        if not self.started:
+            return
+        self.started = False
+        if self.event_driven:
+            self.source.unwatch()
+        self._stop_event.set()
+        if self._poller:
+            self._poller.join(timeout=self.poll_interval + 1.0)
+            self._poller = None
+
+    def refresh(self):
+        """Re-enumerate the desktop (full scan)
+
+        Returns:
+            list: WindowInfo for every matching window
+        """
+        try:
+            found = {info.hwnd: info for info in self.source.enumerate(self.matches) if info.visible}
+        except Exception as e:
+            print(f"⚠️  Window enumeration failed: {e}", file=sys.stderr)
+            return self.list()
+        with self._lock:
+            if self._changed(found):
+                self.version += 1
+            self.windows = found
+        return list(found.values())
+
+    def _changed(self, found):
+        if found.keys() != self.windows.keys():
+            return True
+        return any(_geometry(info) != _geometry(self.windows[hwnd]) for hwnd, info in found.items())
+
+    def _poll(self):
+        while not self._stop_event.wait(self.poll_interval):
+            self.refresh()
+
+    def _on_event(self, kind, hwnd):
+        """Apply one source notification to the cache"""
+        if kind == MOVED and hwnd not in self.windows:
+            return
+        info = None if kind == DESTROYED else self.source.query(hwnd)
+        if info is not None and not (info.visible and self.matches(info.title)):
+            info = None
+        with self._lock:
+            if info is None:
+                if self.windows.pop(hwnd, None) is not None:
+                    self.version += 1
+            else:
+                old = self.windows.get(hwnd)
+                self.windows[hwnd] = info
+                if old is None or _geometry(old) != _geometry(info):
+                    self.version += 1
+
+    def get(self, hwnd):
+        """WindowInfo for hwnd, or None if it is not a matching window"""
+        return self.windows.get(hwnd)
+
+    def list(self):
+        with self._lock:
+            return list(self.windows.values())
+
+    def hwnds(self):
+        with self._lock:
+            return list(self.windows)
+
+    def count(self):
+        return len(self.windows)
+
+
+def _geometry(info):
+    return (info.title, info.left, info.top, info.width, info.height,
+            info.client_width, info.client_height, info.isMinimized)
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_window_registry(title):
+    """The started, process-wide WindowRegistry for a window title"""
+    registry = _registries.get(title)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.get(title)
+            if registry is None:
+                registry = _registries[title] = WindowRegistry(title).start()
+    return registry
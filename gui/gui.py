@@ -15,6 +15,7 @@ from cogs.mode_manager import ModeManager
 from cogs.window_fetcher import WindowFetcher
 from cogs.window_settings_manager import WindowSettingsManager
 from cogs.sleep_manager import SleepManager
+from cogs.metrics_ring import MetricsAggregator
 
 def make_dpi_aware():
     """Make the application DPI-aware on Windows"""
@@ -201,6 +202,7 @@ class ClientControlGUI:
         self.create_control_tab()
         self.create_settings_tab()
         self.create_clients_tab()
+        self.create_metrics_tab()
         self.create_logs_tab()
         self.create_coord_tab()
         
@@ -226,6 +228,9 @@ class ClientControlGUI:
         
         # Set up periodic automation status check
         self.check_automation_status()
+        
+        # Set up periodic metrics refresh
+        self.update_metrics()
 
     def create_control_tab(self):
         self.control_tab = ttk.Frame(self.notebook)
@@ -377,6 +382,62 @@ class ClientControlGUI:
         
         ttk.Button(self.client_list_frame, text="Refresh List", command=self.refresh_client_list, style='info.TButton').pack(pady=5)
 
+    def create_metrics_tab(self):
+        """Live per-client figures read from the automation metrics ring"""
+        self.metrics_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.metrics_tab, text="Metrics")
+        self.metrics = MetricsAggregator()
+        
+        metrics_frame = ttk.LabelFrame(self.metrics_tab, text="Client Metrics", padding=10)
+        metrics_frame.pack(fill='both', expand=True, padx=5, pady=5)
+        
+        columns = ('HWND', 'Match/h', 'Avg', 'FPS', 'Detect', 'Sleep')
+        self.metrics_tree = ttk.Treeview(metrics_frame, columns=columns, show='headings')
+        for column, width in zip(columns, (55, 45, 40, 35, 45, 40)):
+            self.metrics_tree.heading(column, text=column)
+            self.metrics_tree.column(column, width=width, anchor='e')
+        # Slow: average match well above the farm median; stale: no events lately
+        self.metrics_tree.tag_configure('slow', foreground='yellow')
+        self.metrics_tree.tag_configure('stale', foreground='red')
+        self.metrics_tree.pack(fill='both', expand=True)
+        
+        self.metrics_label = ttk.Label(metrics_frame, text="No data yet", font=('Consolas', 8))
+        self.metrics_label.pack(pady=(5, 0))
+        
+        ttk.Button(metrics_frame, text="Reset", command=self.metrics.reset, style='info.TButton').pack(pady=5)
+
+    def update_metrics(self):
+        """Drain the metrics ring and redraw the Metrics tab once per second"""
+        self.metrics.update()
+        
+        if self.notebook.select() == str(self.metrics_tab):
+            rows = sorted(self.metrics.rows(), key=lambda row: row['hwnd'])
+            durations = sorted(row['avg_match_s'] for row in rows if row['avg_match_s'])
+            median = durations[len(durations) // 2] if durations else 0.0
+            
+            self.metrics_tree.delete(*self.metrics_tree.get_children())
+            for row in rows:
+                tags = ()
+                if row['idle_s'] > 30:
+                    tags = ('stale',)
+                elif median and row['avg_match_s'] > 1.5 * median:
+                    tags = ('slow',)
+                self.metrics_tree.insert('', 'end', tags=tags, values=(
+                    row['hwnd'],
+                    f"{row['matches_per_hour']:.0f}",
+                    f"{row['avg_match_s']:.0f}s",
+                    f"{row['capture_fps']:.1f}",
+                    f"{row['detect_ms']:.0f}ms",
+                    f"{row['sleep_pct']:.0f}%",
+                ))
+            
+            total = sum(row['matches'] for row in rows)
+            self.metrics_label.config(
+                text=f"{len(rows)} client(s), {total} matches, {self.metrics.dropped} dropped"
+            )
+        
+        self.root.after(1000, self.update_metrics)
+
     def create_logs_tab(self):
         self.logs_tab = ttk.Frame(self.notebook)
         self.notebook.add(self.logs_tab, text="Logs")
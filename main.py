@@ -2,6 +2,7 @@
 import os
 import sys
 import ctypes
+import multiprocessing
 import tkinter as tk
 from pathlib import Path
 
@@ -135,4 +136,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Detection worker processes re-launch the frozen exe
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
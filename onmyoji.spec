@@ -17,13 +17,33 @@ a = Analysis(
         
         # Cogs modules - ALL your modules listed
         'cogs',
+        'cogs.capture_backend',
+        'cogs.capture_gate',
+        'cogs.color_palette',
         'cogs.coord_finder',
+        'cogs.cpu_monitor',
+        'cogs.detection_pool',
+        'cogs.frame_cache',
+        'cogs.gdi_context',
+        'cogs.geometry_cache',
+        'cogs.grid_matcher',
+        'cogs.metrics_ring',
         'cogs.mode_manager',
         'cogs.mode_rr',
+        'cogs.mode_rr_all',
         'cogs.mode_solo',
+        'cogs.pixel_sampler',
+        'cogs.region_watch',
+        'cogs.resize_engine',
+        'cogs.rr_scheduler',
+        'cogs.rr_simulator',
+        'cogs.stage_timer',
         'cogs.target_window_manager',
+        'cogs.template_registry',
+        'cogs.timing_profile',
         'cogs.window_fetcher',
         'cogs.window_manager',
+        'cogs.window_registry',
         'cogs.window_settings_manager',
         'cogs.sleep_manager',
         'ttkbootstrap',